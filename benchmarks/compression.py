@@ -0,0 +1,300 @@
+"""
+Payload compression benchmark
+
+Encodes the payloads of lifecycle workflow histories with the agents data
+converter and compares their size and the encode/decode time per payload
+without compression, with zlib at several levels and, if the zstandard
+package is installed, with zstd.
+
+The histories are built like the ones LifecycleWorkflow writes: its
+input, every model activity input and response, the final result and the
+recorded hook events. Pass histories exported with
+`temporal workflow show --output json` to measure those instead.
+
+Usage:
+    python -m benchmarks.compression [--runs N] [--threshold BYTES] [HISTORY.json ...]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Iterator, List, Optional
+from unittest.mock import Mock
+
+from agents import ModelResponse, ModelSettings, Usage
+from google.protobuf.message import Message
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+from temporalio.api.common.v1 import Payload
+from temporalio.client import Client, WorkflowHistory
+from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
+
+from payload_codecs import CompressionCodec, zstandard
+from workflows.lifecycle_workflow import (
+    FinalResult,
+    WorkflowInput,
+    multiply_by_two,
+    random_number,
+)
+
+START_INSTRUCTIONS = (
+    "Generate a random number. If it's even, stop. If it's odd, hand off to "
+    "the multiplier agent."
+)
+MULTIPLY_INSTRUCTIONS = "Multiply the number by 2 and then return the final result."
+
+
+def _tool(tool) -> dict:
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "params_json_schema": tool.params_json_schema,
+        "strict_json_schema": True,
+    }
+
+
+def _output_schema() -> dict:
+    return {
+        "output_type_name": "FinalResult",
+        "is_wrapped": False,
+        "output_schema": FinalResult.model_json_schema(),
+        "strict_json_schema": True,
+    }
+
+
+def _model_input(instructions: str, items: list, tools: list, handoffs: list) -> dict:
+    return {
+        "model_name": "gpt-4o-mini",
+        "system_instructions": instructions,
+        "input": list(items),
+        "model_settings": ModelSettings(),
+        "tools": tools,
+        "output_schema": _output_schema(),
+        "handoffs": handoffs,
+        "tracing": 0,
+        "previous_response_id": None,
+        "prompt": None,
+    }
+
+
+def _call(run: int, turn: int, name: str, arguments: dict) -> ResponseFunctionToolCall:
+    return ResponseFunctionToolCall(
+        id=f"fc_{run:08d}{turn}",
+        call_id=f"call_{run:08d}{turn}",
+        name=name,
+        arguments=json.dumps(arguments),
+        type="function_call",
+        status="completed",
+    )
+
+
+def _response(run: int, turn: int, output, input_tokens: int) -> ModelResponse:
+    return ModelResponse(
+        output=[output],
+        usage=Usage(
+            requests=1,
+            input_tokens=input_tokens,
+            output_tokens=20,
+            total_tokens=input_tokens + 20,
+        ),
+        response_id=f"resp_{run:08d}{turn}",
+    )
+
+
+def lifecycle_history(run: int) -> List[Any]:
+    """The values one LifecycleWorkflow run stores in its history."""
+    max_number = 10 + run % 90
+    number = 1 + 2 * (run % (max_number // 2))
+    handoff = {
+        "tool_name": "transfer_to_multiply_agent",
+        "tool_description": (
+            "Handoff to the Multiply Agent agent to handle the request. "
+        ),
+        "input_json_schema": {},
+        "agent_name": "Multiply Agent",
+        "strict_json_schema": True,
+    }
+    items: list = [
+        {
+            "role": "user",
+            "content": f"Generate a random number between 0 and {max_number}.",
+        }
+    ]
+    final_message = ResponseOutputMessage(
+        id=f"msg_{run:08d}3",
+        content=[
+            ResponseOutputText(
+                text=json.dumps({"number": number * 2}),
+                annotations=[],
+                type="output_text",
+            )
+        ],
+        role="assistant",
+        status="completed",
+        type="message",
+    )
+    start_agent = (START_INSTRUCTIONS, [_tool(random_number)], [handoff])
+    multiply_agent = (MULTIPLY_INSTRUCTIONS, [_tool(multiply_by_two)], [])
+    # (agent, model output, output of the tool it calls)
+    turns = [
+        (start_agent, _call(run, 0, "random_number", {"max": max_number}), str(number)),
+        (
+            start_agent,
+            _call(run, 1, "transfer_to_multiply_agent", {}),
+            json.dumps({"assistant": "Multiply Agent"}),
+        ),
+        (multiply_agent, _call(run, 2, "multiply_by_two", {"x": number}), str(number * 2)),
+        (multiply_agent, final_message, None),
+    ]
+    values: List[Any] = [WorkflowInput(max_number=max_number)]
+    events = []
+    for turn, (agent, output, tool_output) in enumerate(turns):
+        instructions, tools, handoffs = agent
+        values.append(_model_input(instructions, items, tools, handoffs))
+        values.append(_response(run, turn, output, input_tokens=60 + 40 * turn))
+        items.append(output.model_dump(exclude_unset=True))
+        if tool_output is not None:
+            items.append(
+                {
+                    "type": "function_call_output",
+                    "call_id": output.call_id,
+                    "output": tool_output,
+                }
+            )
+        events.append(
+            {
+                "seq": len(events) + 1,
+                "event": "agent_started",
+                "at": 1.7e9 + turn,
+                "usage": [1, 60 + 40 * turn, 20, 80 + 40 * turn],
+                "agent": "Start Agent" if agent is start_agent else "Multiply Agent",
+            }
+        )
+    values.append(FinalResult(number=number * 2))
+    values.append(events)
+    return values
+
+
+def history_payloads(message: Message) -> Iterator[Payload]:
+    """Every payload nested in a history proto."""
+    if isinstance(message, Payload):
+        yield message
+        return
+    for field, value in message.ListFields():
+        if field.type != field.TYPE_MESSAGE:
+            continue
+        if field.label != field.LABEL_REPEATED:
+            values = [value]
+        elif field.message_type.GetOptions().map_entry:
+            values = list(value.values())
+        else:
+            values = list(value)
+        for item in values:
+            if isinstance(item, Message):
+                yield from history_payloads(item)
+
+
+def load_histories(paths: List[str]) -> List[List[Payload]]:
+    histories = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            history = WorkflowHistory.from_json(path, f.read())
+        histories.append(
+            [p for event in history.events for p in history_payloads(event)]
+        )
+    return histories
+
+
+async def encode_histories(runs: int) -> List[List[Payload]]:
+    converter = Client(Mock(), plugins=[OpenAIAgentsPlugin()]).data_converter
+    return [await converter.encode(lifecycle_history(run)) for run in range(runs)]
+
+
+async def measure(codec: Optional[CompressionCodec], histories: List[List[Payload]]):
+    if codec is None:
+        return sum(p.ByteSize() for h in histories for p in h), 0.0, 0.0, 0
+    started = time.perf_counter()
+    encoded = [await codec.encode(history) for history in histories]
+    encode_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for history in encoded:
+        await codec.decode(history)
+    decode_seconds = time.perf_counter() - started
+    compressed = sum(
+        1
+        for history in encoded
+        for payload in history
+        if payload.metadata.get("encoding", b"").startswith(b"binary/z")
+    )
+    return (
+        sum(p.ByteSize() for h in encoded for p in h),
+        encode_seconds,
+        decode_seconds,
+        compressed,
+    )
+
+
+async def run(args) -> None:
+    if args.histories:
+        histories = load_histories(args.histories)
+        source = f"{len(histories)} exported histories"
+    else:
+        histories = await encode_histories(args.runs)
+        source = f"{args.runs} lifecycle workflow histories"
+    payload_count = sum(len(history) for history in histories)
+    print(f"{source}, {payload_count} payloads, threshold {args.threshold} bytes\n")
+
+    algorithms = [("zlib", (1, 6, 9))]
+    if zstandard is not None:
+        algorithms.append(("zstd", (1, 3, 9)))
+    else:
+        print("zstandard is not installed; skipping zstd\n")
+    configurations: List[tuple] = [("none", None)]
+    for algorithm, levels in algorithms:
+        for level in levels:
+            codec = CompressionCodec(algorithm, args.threshold, level)
+            configurations.append((f"{algorithm} -{level}", codec))
+
+    print(
+        f"{'codec':<10} {'bytes':>12} {'ratio':>7} {'compressed':>11} "
+        f"{'encode':>12} {'decode':>12}"
+    )
+    baseline = None
+    for name, codec in configurations:
+        size, encode_seconds, decode_seconds, compressed = await measure(codec, histories)
+        baseline = baseline or size
+        if codec is None:
+            timings = f"{'-':>12} {'-':>12}"
+        else:
+            timings = (
+                f"{encode_seconds / payload_count * 1e6:>9.1f} us "
+                f"{decode_seconds / payload_count * 1e6:>9.1f} us"
+            )
+        print(
+            f"{name:<10} {size:>12,} {baseline / size:>6.2f}x {compressed:>11,} {timings}"
+        )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "histories", nargs="*", help="Histories exported as JSON (default: synthesized)"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=500, help="Synthesized runs (default: 500)"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=int,
+        default=1024,
+        help="Smallest payload that is compressed, in bytes (default: 1024)",
+    )
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Import-time benchmark
+
+Measures cold start of the web process and of the workflow registry, each
+in a fresh interpreter, to show what lazy registry entries save.
+
+Usage:
+    python -m benchmarks.import_time [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "registry": "import workflows; workflows.get_registry()",
+    "registry, all workflows resolved": (
+        "import workflows; r = workflows.get_registry()\n"
+        "for path in r.paths(): r.get_by_import_path(path)"
+    ),
+    "web": "import web",
+    "web, first workflow lookup": (
+        "import web; web.registry.get_by_import_path('workflows.hello_world_workflow')"
+    ),
+}
+
+TIMER = """
+import time
+started = time.perf_counter()
+{statement}
+print(time.perf_counter() - started)
+"""
+
+
+def measure(statement: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", TIMER.format(statement=statement)],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (default: 5)")
+    args = parser.parse_args(argv)
+
+    print(f"{'scenario':<36} {'median':>10} {'min':>10}")
+    for name, statement in SCENARIOS.items():
+        timings = [measure(statement) for _ in range(args.runs)]
+        print(
+            f"{name:<36} {statistics.median(timings) * 1000:>8.1f}ms"
+            f" {min(timings) * 1000:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+WorkflowRun insert benchmark
+
+Drives POST /api/workflow_runs from several processes at once, each
+standing in for a web server worker. They all write to one SQLite file,
+and each runs a number of requests concurrently. Temporal is replaced by a
+client that starts nothing, so only the API and the database are measured.
+
+Every combination of SQLITE_PROFILE (default, performance) and
+WORKFLOW_RUN_BATCH_WRITES (off, on) runs on a fresh database. The report
+gives, for each, inserts per second, POST latency and the requests that
+failed, such as with "database is locked".
+
+Usage:
+    python -m benchmarks.inserts [--requests N] [--processes P] [--concurrency C]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CONFIGURATIONS = [
+    ("default", False),
+    ("default", True),
+    ("performance", False),
+    ("performance", True),
+]
+
+
+class NullTemporalClient:
+    """Stands in for the Temporal client: starting a workflow does nothing."""
+
+    async def start_workflow(self, *args, id: str, **kwargs):
+        return SimpleNamespace(id=id)
+
+
+def setup_web(database: str):
+    from django.conf import settings
+
+    import web
+
+    web.app._prepare(is_prod=False)
+    settings.DATABASES["default"]["NAME"] = database
+    return web
+
+
+def create_table(database: str) -> None:
+    from django.db import connection
+
+    web = setup_web(database)
+    with connection.schema_editor() as editor:
+        editor.create_model(web.WorkflowRun)
+
+
+async def post_runs(requests: int, concurrency: int) -> dict:
+    from django.test import AsyncClient
+
+    http = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: Counter = Counter()
+
+    async def post_one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await http.post(
+                    "/api/workflow_runs",
+                    {
+                        "workflow_path": "workflows.hello_world_workflow",
+                        "payload": {"prompt": "Write a haiku about inserts."},
+                    },
+                    content_type="application/json",
+                )
+                if response.status_code != 200:
+                    raise RuntimeError(f"HTTP {response.status_code}")
+            except Exception as e:
+                errors[f"{type(e).__name__}: {e}"] += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(post_one() for _ in range(requests)))
+    return {
+        "seconds": time.perf_counter() - started,
+        "latencies": latencies,
+        "errors": dict(errors),
+    }
+
+
+def serve_load(database: str, requests: int, concurrency: int) -> None:
+    """A load process: waits for "go" on stdin, then prints its results."""
+    import logging
+
+    web = setup_web(database)
+    # Failed requests are counted; their tracebacks would drown the report.
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    client = NullTemporalClient()
+
+    async def get_temporal_client():
+        return client
+
+    web.get_temporal_client = get_temporal_client
+    # The first request imports the workflow module; not part of the run.
+    asyncio.run(post_runs(1, 1))
+    print("ready", flush=True)
+    sys.stdin.readline()
+    print(json.dumps(asyncio.run(post_runs(requests, concurrency))), flush=True)
+
+
+def run_configuration(profile: str, batch_writes: bool, args) -> dict:
+    env = {
+        **os.environ,
+        "SQLITE_PROFILE": profile,
+        "WORKFLOW_RUN_BATCH_WRITES": "1" if batch_writes else "",
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "inserts.sqlite3")
+        command = [sys.executable, "-m", "benchmarks.inserts", "--database", database]
+        subprocess.run([*command, "--create"], cwd=ROOT, env=env, check=True)
+        per_process = args.requests // args.processes
+        workers = [
+            subprocess.Popen(
+                [
+                    *command,
+                    *("--requests", str(per_process)),
+                    *("--concurrency", str(args.concurrency)),
+                ],
+                cwd=ROOT,
+                env=env,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            for _ in range(args.processes)
+        ]
+        # The web app logs to stdout too.
+        for worker in workers:
+            for line in worker.stdout:
+                if line.strip() == "ready":
+                    break
+            else:
+                raise RuntimeError("A load process did not start")
+        for worker in workers:
+            worker.stdin.write("go\n")
+            worker.stdin.flush()
+        results = [
+            json.loads(
+                next(
+                    line
+                    for line in reversed(worker.communicate()[0].splitlines())
+                    if line.startswith("{")
+                )
+            )
+            for worker in workers
+        ]
+
+    latencies = sorted(l for result in results for l in result["latencies"])
+    errors: Counter = Counter()
+    for result in results:
+        errors.update(result["errors"])
+    seconds = max(result["seconds"] for result in results)
+    cuts = (
+        statistics.quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else latencies * 99
+    )
+    return {
+        "inserts_per_second": len(latencies) / seconds,
+        "p50_ms": cuts[49] * 1000 if cuts else None,
+        "p99_ms": cuts[98] * 1000 if cuts else None,
+        "failures": sum(errors.values()),
+        "errors": errors.most_common(3),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--requests", type=int, default=2000, help="Requests in total (default: 2000)"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=4, help="Load processes (default: 4)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=25,
+        help="Requests in flight per process (default: 25)",
+    )
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    parser.add_argument("--create", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.create:
+        create_table(args.database)
+        return
+    if args.database:
+        serve_load(args.database, args.requests, args.concurrency)
+        return
+
+    print(
+        f"{args.requests} POSTs from {args.processes} processes, "
+        f"{args.concurrency} in flight each\n"
+    )
+    print(
+        f"{'profile':<12} {'batching':<9} {'inserts/s':>10} {'p50':>10} "
+        f"{'p99':>10} {'failures':>9}"
+    )
+    reports: Dict[str, dict] = {}
+    for profile, batch_writes in CONFIGURATIONS:
+        report = run_configuration(profile, batch_writes, args)
+        reports[f"{profile}/{batch_writes}"] = report
+        print(
+            f"{profile:<12} {'on' if batch_writes else 'off':<9} "
+            f"{report['inserts_per_second']:>10.1f} "
+            f"{report['p50_ms'] or 0:>8.1f}ms {report['p99_ms'] or 0:>8.1f}ms "
+            f"{report['failures']:>9}"
+        )
+    for name, report in reports.items():
+        for error, count in report["errors"]:
+            print(f"{name}: {count} x {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""
+Load-generation benchmark
+
+Submits concurrent HelloWorldAgent, LifecycleWorkflow and
+AgentLifecycleWorkflow runs through the web app's POST /api/workflow_runs
+endpoint and waits for each to complete. A worker in a subprocess answers
+model calls with scripted responses, so no model is called.
+
+Reports throughput, start latency (the POST), end-to-end latency (POST to
+result) and the CPU time the worker used, and writes them to a JSON
+report. Pass an earlier report with --compare to see what changed.
+
+Starts a local Temporal dev server unless --target names one.
+
+Usage:
+    python -m benchmarks.load [--runs N] [--concurrency C] [--target HOST:PORT]
+        [--output REPORT.json] [--compare EARLIER.json]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from agents import ItemHelpers, Model, ModelResponse
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseTextDeltaEvent,
+)
+from temporalio.client import Client
+from temporalio.contrib.openai_agents import (
+    ModelActivityParameters,
+    OpenAIAgentsPlugin,
+    TestModelProvider,
+)
+
+from tests.openai_helper import ResponseBuilders
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PAYLOADS = {
+    "workflows.hello_world_workflow": {"prompt": "Write a haiku about load tests."},
+    "workflows.lifecycle_workflow": {"max_number": 10},
+    "workflows.agent_lifecycle_workflow": {"max_number": 10},
+}
+
+
+class ScriptedModel(Model):
+    """
+    Answers from the conversation so far instead of from a list of responses
+    like `StaticFakeModel`, so concurrent runs can share it: an agent with
+    tools calls its first tool once, then every agent returns its final
+    output.
+    """
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        called_tool = isinstance(input, list) and any(
+            isinstance(item, dict) and item.get("type") == "function_call_output"
+            for item in input
+        )
+        if tools and not called_tool:
+            return ResponseBuilders.tool_call('{"max": 10}', tools[0].name)
+        if output_schema is not None and not output_schema.is_plain_text():
+            return ResponseBuilders.output_message('{"number": 4}')
+        return ResponseBuilders.output_message(
+            "Requests arrive in waves / the worker answers each one / queues drain into calm"
+        )
+
+    async def stream_response(self, *args, **kwargs):
+        """Streams the scripted response's text as one delta, then completes it."""
+        response = await self.get_response(*args, **kwargs)
+        sequence_number = 0
+        for item in response.output:
+            text = ItemHelpers.extract_last_text(item)
+            if text:
+                yield ResponseTextDeltaEvent(
+                    content_index=0,
+                    delta=text,
+                    item_id="",
+                    logprobs=[],
+                    output_index=0,
+                    sequence_number=sequence_number,
+                    type="response.output_text.delta",
+                )
+                sequence_number += 1
+        yield ResponseCompletedEvent(
+            response=Response(
+                id="",
+                created_at=0,
+                model="scripted",
+                object="response",
+                output=response.output,
+                parallel_tool_calls=False,
+                tool_choice="auto",
+                tools=[],
+            ),
+            sequence_number=sequence_number,
+            type="response.completed",
+        )
+
+
+async def serve_worker(target: str, task_queue: str) -> None:
+    """The worker subprocess: runs until SIGTERM, then prints its CPU time."""
+    from temporalio.worker import Worker
+
+    from workflows.discovery import discover, load_activities, load_workflows
+
+    client = await Client.connect(
+        target,
+        plugins=[
+            OpenAIAgentsPlugin(
+                model_provider=TestModelProvider(ScriptedModel()),
+                model_params=ModelActivityParameters(
+                    start_to_close_timeout=timedelta(seconds=30)
+                ),
+            )
+        ],
+    )
+    manifest = discover()
+    stop_event = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop_event.set)
+    async with Worker(
+        client,
+        task_queue=task_queue,
+        workflows=load_workflows(manifest),
+        activities=load_activities(manifest),
+    ):
+        cpu_started = time.process_time()
+        print("ready", flush=True)
+        await stop_event.wait()
+        cpu_seconds = time.process_time() - cpu_started
+    print(json.dumps({"cpu_seconds": cpu_seconds}), flush=True)
+
+
+def setup_web(database: str):
+    """Prepare the web app on a fresh database of its own."""
+    from django.conf import settings
+    from django.db import connection
+
+    import web
+
+    web.app._prepare(is_prod=False)
+    settings.DATABASES["default"]["NAME"] = database
+    # The API only needs this table, created from the model whatever
+    # migrations exist locally.
+    with connection.schema_editor() as editor:
+        editor.create_model(web.WorkflowRun)
+    return web
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    if len(values) == 1:
+        cuts = values * 99
+    else:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 2),
+        "p90": round(cuts[89] * 1000, 2),
+        "p99": round(cuts[98] * 1000, 2),
+        "max": round(max(values) * 1000, 2),
+    }
+
+
+def summarize(samples: List[dict]) -> dict:
+    succeeded = [sample for sample in samples if sample["error"] is None]
+    return {
+        "runs": len(samples),
+        "failures": len(samples) - len(succeeded),
+        "start_latency_ms": percentiles([s["start_seconds"] for s in succeeded]),
+        "end_to_end_ms": percentiles([s["end_to_end_seconds"] for s in succeeded]),
+    }
+
+
+async def submit(http, temporal_client: Client, workflow_path: str) -> dict:
+    sample: Dict[str, Any] = {"workflow_path": workflow_path, "error": None}
+    started = time.perf_counter()
+    try:
+        response = await http.post(
+            "/api/workflow_runs",
+            {"workflow_path": workflow_path, "payload": PAYLOADS[workflow_path]},
+            content_type="application/json",
+        )
+        sample["start_seconds"] = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.content!r}")
+        handle_id = response.json()["handle_id"]
+        await temporal_client.get_workflow_handle(handle_id).result()
+        sample["end_to_end_seconds"] = time.perf_counter() - started
+    except Exception as e:
+        sample["error"] = f"{type(e).__name__}: {e}"
+    return sample
+
+
+async def generate_load(web, args) -> dict:
+    from django.test import AsyncClient
+
+    async with AsyncExitStack() as stack:
+        if args.target:
+            target = args.target
+        else:
+            from temporalio.testing import WorkflowEnvironment
+
+            env = await WorkflowEnvironment.start_local()
+            await stack.enter_async_context(env)
+            target = env.client.service_client.config.target_host
+        task_queue = f"load-{uuid.uuid4()}"
+        web.TEMPORAL_TARGET = target
+        web.TASK_QUEUE = task_queue
+
+        worker = await asyncio.create_subprocess_exec(
+            sys.executable,
+            *("-m", "benchmarks.load", "--worker"),
+            *("--target", target, "--task-queue", task_queue),
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+        )
+        try:
+            if (await worker.stdout.readline()).strip() != b"ready":
+                raise RuntimeError("The worker did not start")
+            http = AsyncClient()
+            temporal_client = await web.get_temporal_client()
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def run_one(workflow_path: str) -> dict:
+                async with semaphore:
+                    return await submit(http, temporal_client, workflow_path)
+
+            paths = itertools.islice(itertools.cycle(args.workflows), args.runs)
+            started = time.perf_counter()
+            samples = await asyncio.gather(*(run_one(path) for path in paths))
+            wall_seconds = time.perf_counter() - started
+        finally:
+            if worker.returncode is None:
+                worker.send_signal(signal.SIGTERM)
+            output = await worker.stdout.read()
+            await worker.wait()
+    cpu_seconds = json.loads(output.splitlines()[-1])["cpu_seconds"] if output else None
+
+    completed = sum(1 for sample in samples if sample["error"] is None)
+    errors = sorted({sample["error"] for sample in samples if sample["error"]})
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_second": round(completed / wall_seconds, 2),
+        **summarize(samples),
+        "worker_cpu_seconds": cpu_seconds,
+        "worker_cpu_ms_per_run": (
+            round(cpu_seconds / completed * 1000, 2) if cpu_seconds and completed else None
+        ),
+        "errors": errors[:10],
+        "workflows": {
+            path: summarize([s for s in samples if s["workflow_path"] == path])
+            for path in args.workflows
+        },
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict, earlier: Optional[dict]) -> None:
+    rows = [
+        ("throughput (runs/s)", ["throughput_per_second"]),
+        ("start p50 (ms)", ["start_latency_ms", "p50"]),
+        ("start p99 (ms)", ["start_latency_ms", "p99"]),
+        ("end-to-end p50 (ms)", ["end_to_end_ms", "p50"]),
+        ("end-to-end p90 (ms)", ["end_to_end_ms", "p90"]),
+        ("end-to-end p99 (ms)", ["end_to_end_ms", "p99"]),
+        ("worker CPU per run (ms)", ["worker_cpu_ms_per_run"]),
+        ("failures", ["failures"]),
+    ]
+
+    def lookup(data: dict, keys: List[str]):
+        for key in keys:
+            data = data.get(key) if isinstance(data, dict) else None
+        return data
+
+    print(f"{report['runs']} runs at concurrency {report['settings']['concurrency']}\n")
+    header = f"{'':<26} {'this run':>12}"
+    if earlier is not None:
+        header += f" {'earlier':>12} {'change':>9}"
+    print(header)
+    for label, keys in rows:
+        value = lookup(report, keys)
+        line = f"{label:<26} {value if value is not None else '-':>12}"
+        if earlier is not None:
+            before = lookup(earlier, keys)
+            change = (
+                f"{(value - before) / before * 100:+.1f}%"
+                if value is not None and before
+                else "-"
+            )
+            line += f" {before if before is not None else '-':>12} {change:>9}"
+        print(line)
+    for error in report["errors"]:
+        print(f"error: {error}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=300, help="Runs in total (default: 300)")
+    parser.add_argument(
+        "--concurrency", type=int, default=30, help="Runs in flight at once (default: 30)"
+    )
+    parser.add_argument(
+        "--workflows",
+        nargs="+",
+        default=list(PAYLOADS),
+        choices=list(PAYLOADS),
+        help="Workflow paths to submit, in turn (default: all)",
+    )
+    parser.add_argument("--target", help="Temporal server to use instead of a local one")
+    parser.add_argument(
+        "--output", default="load-report.json", help="Report path (default: load-report.json)"
+    )
+    parser.add_argument("--compare", help="Earlier report to compare with")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--task-queue", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        asyncio.run(serve_worker(args.target, args.task_queue))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        web = setup_web(os.path.join(directory, "load.sqlite3"))
+        results = asyncio.run(generate_load(web, args))
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "settings": {
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "workflows": args.workflows,
+            "target": args.target or "local",
+        },
+        **results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    earlier = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            earlier = json.load(f)
+    print_report(report, earlier)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Replay benchmark and determinism check
+
+`export` saves the histories of completed runs the web app knows about
+into a corpus directory, one JSON file per run, under its workflow path.
+Runs already in the corpus are skipped.
+
+`run` replays every history in the corpus with the SDK Replayer against
+the current workflows package, and reports replays per second and the
+histories the code no longer replays deterministically. It exits with
+status 1 when any does. `--processes N` splits the corpus over a pool of
+N processes.
+
+Usage:
+    python -m benchmarks.replay export [--corpus DIR] [--limit N]
+    python -m benchmarks.replay run [--corpus DIR] [--processes N]
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import dataclasses
+import multiprocessing
+import statistics
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from temporalio.client import WorkflowHistory
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CORPUS = ROOT / "histories"
+
+
+@dataclasses.dataclass
+class ReplayReport:
+    histories: int = 0
+    seconds: float = 0.0
+    # Workflow type -> seconds per replay.
+    timings: Dict[str, List[float]] = dataclasses.field(
+        default_factory=lambda: defaultdict(list)
+    )
+    # (history file, error) per history that failed to replay.
+    failures: List[Tuple[str, str]] = dataclasses.field(default_factory=list)
+
+    def merge(self, other: "ReplayReport") -> None:
+        self.histories += other.histories
+        self.seconds = max(self.seconds, other.seconds)
+        for workflow_type, timings in other.timings.items():
+            self.timings[workflow_type].extend(timings)
+        self.failures.extend(other.failures)
+
+
+# --- Export ---------------------------------------------------------------------
+
+
+async def export(corpus: Path, limit: Optional[int], concurrency: int) -> None:
+    import web
+
+    web.app._prepare(is_prod=False)
+    queryset = web.WorkflowRun.objects.filter(status__in=["", "COMPLETED"]).order_by("id")
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = defaultdict(int)
+
+    async def export_run(workflow_run) -> None:
+        path = corpus / workflow_run.workflow_path / f"{workflow_run.handle_id}.json"
+        if path.exists():
+            counts["already exported"] += 1
+            return
+        async with semaphore:
+            try:
+                # Also records the status of runs not seen finished yet.
+                output = await web.describe_run(workflow_run)
+                if output.status != "COMPLETED":
+                    counts["not completed"] += 1
+                    return
+                client = await web.get_temporal_client()
+                handle = client.get_workflow_handle(
+                    workflow_run.handle_id, run_id=output.run_id
+                )
+                history = await handle.fetch_history()
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"{workflow_run.handle_id}: {type(e).__name__}: {e}", file=sys.stderr)
+                return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(history.to_json(), encoding="utf-8")
+        counts["exported"] += 1
+
+    workflow_runs = [workflow_run async for workflow_run in queryset[:limit]]
+    await asyncio.gather(*(export_run(workflow_run) for workflow_run in workflow_runs))
+    print(
+        f"{len(workflow_runs)} runs: "
+        + ", ".join(f"{count} {name}" for name, count in sorted(counts.items()))
+    )
+
+
+# --- Replay ---------------------------------------------------------------------
+
+
+def corpus_files(corpus: Path) -> List[Path]:
+    return sorted(corpus.rglob("*.json"))
+
+
+def load_history(path: Path) -> WorkflowHistory:
+    return WorkflowHistory.from_json(path.stem, path.read_text(encoding="utf-8"))
+
+
+@contextmanager
+def agent_overrides() -> Iterator[None]:
+    """
+    Route agent runs through model activities, as OpenAIAgentsPlugin does
+    around a worker, with the worker's model parameters.
+
+    temporalio has no public way to apply the plugin to a Replayer, so this
+    is the one place that imports the overrides from the plugin's private
+    module. pyproject.toml pins the SDK version this was checked against.
+    """
+    try:
+        from temporalio.contrib.openai_agents._temporal_openai_agents import (
+            set_open_ai_agent_temporal_overrides,
+        )
+    except ImportError as e:
+        raise RuntimeError(
+            "This temporalio version moved the OpenAI Agents overrides; "
+            "update benchmarks.replay.agent_overrides"
+        ) from e
+
+    from run_worker import model_params
+
+    with set_open_ai_agent_temporal_overrides(model_params()):
+        yield
+
+
+def new_replayer():
+    """A replayer configured like the worker: its workflows, data converter and interceptors."""
+    from temporalio.contrib.openai_agents import OpenAIAgentsTracingInterceptor
+    from temporalio.contrib.pydantic import pydantic_data_converter
+    from temporalio.worker import Replayer
+
+    from payload_codecs import payload_codec
+    from workflows.discovery import discover, load_workflows
+
+    return Replayer(
+        workflows=load_workflows(discover()),
+        data_converter=dataclasses.replace(
+            pydantic_data_converter, payload_codec=payload_codec()
+        ),
+        interceptors=[OpenAIAgentsTracingInterceptor()],
+    )
+
+
+async def replay(paths: List[Path]) -> ReplayReport:
+    report = ReplayReport()
+    histories = {}
+    for path in paths:
+        history = load_history(path)
+        histories[history.run_id] = (path, history)
+
+    async def iterate():
+        for _, history in histories.values():
+            yield history
+
+    with agent_overrides():
+        replayer = new_replayer()
+        async with replayer.workflow_replay_iterator(iterate()) as results:
+            # Entering validates every workflow in the sandbox; that is not replay.
+            started = previous = time.perf_counter()
+            async for result in results:
+                now = time.perf_counter()
+                path, history = histories[result.history.run_id]
+                workflow_type = history.events[
+                    0
+                ].workflow_execution_started_event_attributes.workflow_type.name
+                report.timings[workflow_type].append(now - previous)
+                previous = now
+                report.histories += 1
+                if result.replay_failure is not None:
+                    error = result.replay_failure
+                    report.failures.append((str(path), f"{type(error).__name__}: {error}"))
+        report.seconds = time.perf_counter() - started
+    return report
+
+
+def replay_in_process(paths: List[Path]) -> ReplayReport:
+    return asyncio.run(replay(paths))
+
+
+def run(corpus: Path, processes: int) -> int:
+    paths = corpus_files(corpus)
+    if not paths:
+        print(f"No histories in {corpus}; export some first")
+        return 1
+
+    started = time.perf_counter()
+    if processes > 1:
+        report = ReplayReport()
+        chunks = [paths[i::processes] for i in range(processes) if paths[i::processes]]
+        # Forking a process that runs the Temporal runtime is not safe.
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=len(chunks), mp_context=context
+        ) as pool:
+            for chunk_report in pool.map(replay_in_process, chunks):
+                report.merge(chunk_report)
+    else:
+        report = replay_in_process(paths)
+    wall_seconds = time.perf_counter() - started
+
+    print(
+        f"{report.histories} histories in {report.seconds:.2f}s of replay "
+        f"({wall_seconds:.2f}s with startup), "
+        f"{report.histories / report.seconds:.1f} replays/s"
+        + (f" over {processes} processes" if processes > 1 else "")
+    )
+    print(f"\n{'workflow type':<32} {'replays':>8} {'mean':>10} {'p99':>10}")
+    for workflow_type, timings in sorted(report.timings.items()):
+        p99 = (
+            statistics.quantiles(timings, n=100, method="inclusive")[98]
+            if len(timings) > 1
+            else timings[0]
+        )
+        print(
+            f"{workflow_type:<32} {len(timings):>8} "
+            f"{statistics.mean(timings) * 1000:>8.2f}ms {p99 * 1000:>8.2f}ms"
+        )
+
+    if report.failures:
+        print(f"\n{len(report.failures)} histories do not replay deterministically:")
+        for path, error in report.failures:
+            print(f"  {path}: {error}")
+        return 1
+    print("\nNo nondeterminism")
+    return 0
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export histories of completed runs")
+    export_parser.add_argument(
+        "--limit", type=int, help="Most runs to look at (default: all)"
+    )
+    export_parser.add_argument(
+        "--concurrency", type=int, default=10, help="Runs fetched at once (default: 10)"
+    )
+
+    run_parser = commands.add_parser("run", help="Replay the corpus")
+    run_parser.add_argument(
+        "--processes", type=int, default=1, help="Replay processes (default: 1)"
+    )
+    for command_parser in (export_parser, run_parser):
+        command_parser.add_argument(
+            "--corpus",
+            type=Path,
+            default=DEFAULT_CORPUS,
+            help=f"Corpus directory (default: {DEFAULT_CORPUS.relative_to(ROOT)})",
+        )
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        asyncio.run(export(args.corpus, args.limit, args.concurrency))
+    else:
+        sys.exit(run(args.corpus, args.processes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Payload validation benchmark
+
+Compares ways of turning a JSON payload into a workflow input: calling the
+input class, which checks nothing but the argument names, the registry's
+precompiled validator, and building a TypeAdapter for every payload.
+
+Usage:
+    python -m benchmarks.validation [--number N]
+"""
+
+import argparse
+import timeit
+
+from pydantic import TypeAdapter
+
+from workflows import get_registry
+
+WORKFLOW_PATH = "workflows.hello_world_workflow"
+PAYLOAD = {"prompt": "Write a haiku about the sea."}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--number", type=int, default=100_000, help="Payloads per method (default: 100000)"
+    )
+    args = parser.parse_args(argv)
+
+    registry = get_registry()
+    input_type = registry.get_by_import_path(WORKFLOW_PATH).input
+    # Building a TypeAdapter is slow enough that fewer runs tell enough.
+    methods = [
+        ("input(**payload), unvalidated", lambda: input_type(**PAYLOAD), 1),
+        (
+            "registry.validate_input",
+            lambda: registry.validate_input(WORKFLOW_PATH, PAYLOAD),
+            1,
+        ),
+        (
+            "TypeAdapter built per payload",
+            lambda: TypeAdapter(input_type).validate_python(PAYLOAD),
+            100,
+        ),
+    ]
+
+    print(f"{'method':<32} {'per payload':>12} {'payloads/s':>12}")
+    for name, method, divisor in methods:
+        number = max(args.number // divisor, 1)
+        seconds = min(timeit.repeat(method, number=number, repeat=3)) / number
+        print(f"{name:<32} {seconds * 1e6:>10.2f}us {1 / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
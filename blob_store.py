@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import PayloadCodec
+
+BLOB_REF_ENCODING = b"binary/blob-ref"
+# Metadata key the original encoding of an offloaded payload is kept under.
+BLOB_ENCODING_KEY = "blob-encoding"
+
+CHUNK_SIZE = 256 * 1024
+
+
+class BlobStore:
+    """
+    Content-addressed blobs on the local filesystem, stored under the
+    sha256 of their content. Writing the same content twice keeps one
+    file.
+
+    With `use_mmap`, blobs are read through a memory map, which spares
+    copying large blobs through read buffers.
+    """
+
+    def __init__(self, root: str, use_mmap: bool = False) -> None:
+        self.root = Path(root)
+        self.use_mmap = use_mmap
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> Path:
+        if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+            raise ValueError(f"Not a sha256 digest: {digest!r}")
+        return self.root / digest[:2] / digest[2:]
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            return digest
+        path.parent.mkdir(exist_ok=True)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as f:
+            f.write(data)
+        # Readers never see a partially written blob.
+        os.replace(temporary, path)
+        return digest
+
+    def size(self, digest: str) -> int:
+        return self.path(digest).stat().st_size
+
+    def get(self, digest: str) -> bytes:
+        with open(self.path(digest), "rb") as f:
+            if self.use_mmap and os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[:]
+            return f.read()
+
+    def iter_chunks(self, digest: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self.path(digest), "rb") as f:
+            if self.use_mmap and os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in range(0, len(mapped), chunk_size):
+                        yield mapped[offset : offset + chunk_size]
+                return
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+
+_keep_references = contextvars.ContextVar("keep_blob_references", default=False)
+
+
+@contextmanager
+def keep_blob_references() -> Iterator[None]:
+    """
+    Within the block, offloaded payloads decode to a reference,
+    `{"$blob": <sha256>, "size": <bytes>}`, instead of being read back from
+    the store. Callers that can serve the blob themselves use it to skip
+    loading it.
+    """
+    token = _keep_references.set(True)
+    try:
+        yield
+    finally:
+        _keep_references.reset(token)
+
+
+def blob_reference(value: Any) -> Optional[Dict[str, Any]]:
+    """The reference `value` is, when decoded within `keep_blob_references`."""
+    if isinstance(value, dict) and value.keys() == {"$blob", "size"}:
+        return value
+    return None
+
+
+class BlobStoreCodec(PayloadCodec):
+    """
+    Moves payloads of at least `threshold` bytes into a blob store, leaving
+    a small reference payload in their place in workflow history.
+
+    The stored blob is the payload data as is, so a JSON payload can be
+    served straight from the store.
+    """
+
+    def __init__(self, store: BlobStore, threshold: int) -> None:
+        self.store = store
+        self.threshold = threshold
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        return [await self._encode(payload) for payload in payloads]
+
+    async def _encode(self, payload: Payload) -> Payload:
+        if len(payload.data) < self.threshold:
+            return payload
+        digest = await asyncio.to_thread(self.store.put, payload.data)
+        metadata = dict(payload.metadata)
+        metadata[BLOB_ENCODING_KEY] = metadata.get("encoding", b"")
+        metadata["encoding"] = BLOB_REF_ENCODING
+        reference = {"sha256": digest, "size": len(payload.data)}
+        return Payload(
+            metadata=metadata,
+            data=json.dumps(reference, separators=(",", ":")).encode(),
+        )
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        return [await self._decode(payload) for payload in payloads]
+
+    async def _decode(self, payload: Payload) -> Payload:
+        if payload.metadata.get("encoding") != BLOB_REF_ENCODING:
+            return payload
+        reference = json.loads(payload.data)
+        if _keep_references.get():
+            return Payload(
+                metadata={"encoding": b"json/plain"},
+                data=json.dumps(
+                    {"$blob": reference["sha256"], "size": reference["size"]}
+                ).encode(),
+            )
+        data = await asyncio.to_thread(self.store.get, reference["sha256"])
+        if len(data) != reference["size"]:
+            raise ValueError(f"Blob {reference['sha256']} is truncated")
+        metadata = dict(payload.metadata)
+        del metadata["encoding"]
+        encoding = metadata.pop(BLOB_ENCODING_KEY)
+        if encoding:
+            metadata["encoding"] = encoding
+        return Payload(metadata=metadata, data=data)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from temporalio.client import Client
+from temporalio.service import RPCError, RPCStatusCode
+
+logger = logging.getLogger(__name__)
+
+# Statuses of calls that failed because the connection is broken, rather
+# than because of the call itself.
+CONNECTION_ERROR_STATUSES = frozenset({RPCStatusCode.UNAVAILABLE})
+
+
+def is_connection_error(error: BaseException) -> bool:
+    return isinstance(error, RPCError) and error.status in CONNECTION_ERROR_STATUSES
+
+
+@dataclass
+class ClientPoolStats:
+    connects: int = 0
+    connect_failures: int = 0
+    reuses: int = 0
+    invalidations: int = 0
+    last_connect_seconds: float = 0.0
+    total_connect_seconds: float = 0.0
+
+
+@dataclass
+class _LoopState:
+    lock: asyncio.Lock
+    client: Optional[Client] = None
+    failures: int = 0
+    retry_at: float = 0.0
+    last_error: Optional[BaseException] = None
+
+
+class TemporalClientPool:
+    """
+    Process-wide holder of long-lived Temporal clients.
+
+    A client is connected lazily on first use, once per event loop, and is
+    reused by every later caller on that loop. A failed connect is retried
+    with exponential backoff; callers arriving before the next attempt is
+    due get the last connect error straight away instead of piling up
+    connect attempts against an unavailable server. Callers pass the errors
+    of their calls to `report_error`, and a client whose connection broke
+    is dropped, so the next caller connects again.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[Client]],
+        *,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30.0,
+    ) -> None:
+        self._connect = connect
+        self._backoff_seconds = backoff_seconds
+        self._max_backoff_seconds = max_backoff_seconds
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.stats = ClientPoolStats()
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(lock=asyncio.Lock())
+        return state
+
+    async def get(self) -> Client:
+        state = self._state()
+        if state.client is not None:
+            self.stats.reuses += 1
+            return state.client
+        async with state.lock:
+            # Another caller may have connected while we waited on the lock.
+            if state.client is not None:
+                self.stats.reuses += 1
+                return state.client
+            if state.last_error is not None and time.monotonic() < state.retry_at:
+                raise state.last_error
+            started = time.perf_counter()
+            try:
+                client = await self._connect()
+            except Exception as e:
+                state.failures += 1
+                state.last_error = e
+                delay = min(
+                    self._backoff_seconds * 2 ** (state.failures - 1),
+                    self._max_backoff_seconds,
+                )
+                state.retry_at = time.monotonic() + delay
+                self.stats.connect_failures += 1
+                logger.warning(
+                    "Temporal connect failed (attempt %d), retrying in %.1fs: %s",
+                    state.failures,
+                    delay,
+                    e,
+                )
+                raise
+            elapsed = time.perf_counter() - started
+            state.client = client
+            state.failures = 0
+            state.last_error = None
+            self.stats.connects += 1
+            self.stats.last_connect_seconds = elapsed
+            self.stats.total_connect_seconds += elapsed
+            logger.info("Temporal client connected in %.3fs", elapsed)
+            return client
+
+    def invalidate(self) -> None:
+        """Drop the client of the running loop so the next `get` reconnects."""
+        state = self._states.get(asyncio.get_running_loop())
+        if state is not None:
+            state.client = None
+
+    def report_error(self, error: BaseException) -> None:
+        """Drop the client of the running loop if `error` shows it is disconnected."""
+        if not is_connection_error(error):
+            return
+        state = self._states.get(asyncio.get_running_loop())
+        if state is None or state.client is None:
+            # Already dropped by another caller that saw the same failure.
+            return
+        state.client = None
+        self.stats.invalidations += 1
+        logger.warning("Temporal client dropped after a failed call: %s", error)
+
+    async def close(self) -> None:
+        """
+        Release every pooled client.
+
+        The SDK has no explicit close; dropping the last reference to a
+        client tears down its underlying connection.
+        """
+        for state in list(self._states.values()):
+            state.client = None
+        self._states.clear()
+        logger.info(
+            "Temporal client pool closed after %d connects and %d reuses",
+            self.stats.connects,
+            self.stats.reuses,
+        )
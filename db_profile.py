@@ -0,0 +1,60 @@
+import os
+from typing import Any, Dict
+
+# "performance" tunes SQLite for concurrent writers; "default" leaves
+# Django's settings as they are.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_SECONDS = float(os.getenv("SQLITE_BUSY_TIMEOUT_SECONDS", "5"))
+# Seconds a connection is kept between requests; unset keeps it for good.
+SQLITE_CONN_MAX_AGE = os.getenv("SQLITE_CONN_MAX_AGE")
+
+SQLITE_PROFILES = ("default", "performance")
+
+
+def performance_options(
+    mmap_size: int = SQLITE_MMAP_SIZE,
+    busy_timeout_seconds: float = SQLITE_BUSY_TIMEOUT_SECONDS,
+) -> Dict[str, Any]:
+    """
+    OPTIONS of the Django SQLite backend for many concurrent writers.
+
+    WAL lets readers carry on while a write commits, and with
+    synchronous=NORMAL a commit no longer waits for an fsync. IMMEDIATE
+    transactions take the write lock when they begin rather than on their
+    first write. A deferred transaction that has read cannot wait for the
+    lock once it needs to write, and fails with "database is locked" at
+    once. With IMMEDIATE, writers queue on the lock for up to the busy
+    timeout.
+    """
+    return {
+        "timeout": busy_timeout_seconds,
+        "transaction_mode": "IMMEDIATE",
+        "init_command": ";".join(
+            [
+                "PRAGMA journal_mode=WAL",
+                "PRAGMA synchronous=NORMAL",
+                f"PRAGMA mmap_size={mmap_size}",
+                "PRAGMA temp_store=MEMORY",
+            ]
+        ),
+    }
+
+
+def sqlite_profile(databases: Dict[str, Any], profile: str = SQLITE_PROFILE) -> Dict[str, Any]:
+    """`databases` with the default SQLite database set up for `profile`."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(
+            f"Unknown SQLite profile {profile!r}; use one of {', '.join(SQLITE_PROFILES)}"
+        )
+    if profile == "default":
+        return databases
+    default = dict(databases["default"])
+    default["OPTIONS"] = {**default.get("OPTIONS", {}), **performance_options()}
+    # Persistent connections spare opening one, and running the pragmas,
+    # for every request.
+    default["CONN_MAX_AGE"] = (
+        float(SQLITE_CONN_MAX_AGE) if SQLITE_CONN_MAX_AGE is not None else None
+    )
+    default["CONN_HEALTH_CHECKS"] = True
+    return {**databases, "default": default}
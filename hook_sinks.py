@@ -0,0 +1,196 @@
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from typing import Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class EventSink(Protocol):
+    def write(self, workflow_id: str, records: list[dict]) -> None: ...
+
+
+class JsonlEventSink:
+    """Appends one JSON line per record, tagged with its workflow id."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, workflow_id: str, records: list[dict]) -> None:
+        lines = "".join(
+            json.dumps({"workflow_id": workflow_id, **record}, separators=(",", ":"))
+            + "\n"
+            for record in records
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class SqliteEventSink:
+    """Inserts each batch of records into an `agent_events` table."""
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS agent_events ("
+            " workflow_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " event TEXT NOT NULL,"
+            " at REAL NOT NULL,"
+            " record TEXT NOT NULL,"
+            " PRIMARY KEY (workflow_id, seq))"
+        )
+        self._db.commit()
+
+    def write(self, workflow_id: str, records: list[dict]) -> None:
+        rows = [
+            (
+                workflow_id,
+                record["seq"],
+                record["event"],
+                record["at"],
+                json.dumps(record, separators=(",", ":")),
+            )
+            for record in records
+        ]
+        with self._lock:
+            # Records written again, e.g. by another worker process after
+            # a retried workflow task, are ignored.
+            self._db.executemany(
+                "INSERT OR IGNORE INTO agent_events VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def event_sink_from_path(path: str) -> EventSink:
+    """A SQLite sink for .sqlite3/.sqlite/.db paths, a JSONL file otherwise."""
+    if path.endswith((".sqlite3", ".sqlite", ".db")):
+        return SqliteEventSink(path)
+    return JsonlEventSink(path)
+
+
+class EventSinkWriter:
+    """
+    Writes agent hook records to a sink from a background thread.
+
+    Workflow code must not do I/O, so `submit` only queues the records and
+    never blocks. The thread writes them every `flush_interval` seconds, or
+    as soon as `batch_size` records are queued. At most `max_pending`
+    records are queued; when the sink falls behind the oldest are dropped.
+
+    A workflow task that fails and is retried, or a run that is replayed
+    after it left the worker cache, records its events again. Records are
+    therefore written once per run and `seq`: the writer keeps
+    the last `seq` it wrote for the `max_runs` most recent runs and skips
+    records at or below it.
+    """
+
+    def __init__(
+        self,
+        sink: EventSink,
+        max_pending: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_runs: int = 10000,
+    ) -> None:
+        self.sink = sink
+        self.dropped = 0
+        self.duplicates = 0
+        self._pending: deque[tuple[str, str, dict]] = deque(maxlen=max_pending)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_runs = max_runs
+        self._last_seq: OrderedDict[str, int] = OrderedDict()
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="hook-event-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, workflow_id: str, run_id: str, records: list[dict]) -> None:
+        with self._condition:
+            for record in records:
+                if len(self._pending) == self._pending.maxlen:
+                    self.dropped += 1
+                self._pending.append((workflow_id, run_id, record))
+            if len(self._pending) >= self._batch_size:
+                self._condition.notify()
+
+    def _is_new(self, run_id: str, seq: int) -> bool:
+        last = self._last_seq.get(run_id)
+        if last is not None and seq <= last:
+            return False
+        self._last_seq[run_id] = seq
+        self._last_seq.move_to_end(run_id)
+        while len(self._last_seq) > self._max_runs:
+            self._last_seq.popitem(last=False)
+        return True
+
+    def flush(self) -> None:
+        """Write every queued record now, on the calling thread."""
+        with self._write_lock:
+            with self._condition:
+                pending = list(self._pending)
+                self._pending.clear()
+            batches: OrderedDict[str, list[dict]] = OrderedDict()
+            for workflow_id, run_id, record in pending:
+                if self._is_new(run_id, record["seq"]):
+                    batches.setdefault(workflow_id, []).append(record)
+                else:
+                    self.duplicates += 1
+            for workflow_id, records in batches.items():
+                try:
+                    self.sink.write(workflow_id, records)
+                except Exception:
+                    logger.exception(
+                        "Writing %d hook events of %s failed", len(records), workflow_id
+                    )
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self._batch_size:
+                    self._condition.wait(self._flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write what is still queued and stop the thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+
+
+_event_writer: Optional[EventSinkWriter] = None
+
+
+def configure_event_sink(sink: Optional[EventSink]) -> Optional[EventSinkWriter]:
+    """
+    Set the sink that agent hooks in this process write their records to,
+    through an `EventSinkWriter`. The previous writer, if any, is closed.
+    """
+    global _event_writer
+    previous, _event_writer = (
+        _event_writer,
+        EventSinkWriter(sink) if sink is not None else None,
+    )
+    if previous is not None:
+        previous.close()
+    return _event_writer
+
+
+def get_event_writer() -> Optional[EventSinkWriter]:
+    return _event_writer
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from agents import (
+    AgentOutputSchemaBase,
+    FunctionTool,
+    Handoff,
+    Model,
+    ModelProvider,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    OpenAIProvider,
+    Tool,
+    TResponseInputItem,
+    Usage,
+)
+from openai import AsyncOpenAI
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+
+logger = logging.getLogger(__name__)
+
+_model_response = TypeAdapter(ModelResponse)
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    expired: int = 0
+    evictions: int = 0
+
+
+class ResponseCache:
+    """
+    SQLite backed store of model responses with a TTL and a maximum number
+    of entries; the least recently read entries are evicted first.
+    """
+
+    def __init__(
+        self, path: str, ttl_seconds: float = 86400, max_entries: int = 10000
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = ResponseCacheStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at"
+            " ON responses (accessed_at)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+            self.stats.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            evicted = self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self._db.commit()
+            self.stats.stores += 1
+            self.stats.evictions += evicted
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def _tool_key(tool: Tool) -> Any:
+    if isinstance(tool, FunctionTool):
+        return [
+            tool.name,
+            tool.description,
+            tool.params_json_schema,
+            tool.strict_json_schema,
+        ]
+    return to_jsonable_python(tool, fallback=repr)
+
+
+def response_cache_key(
+    model_name: Optional[str],
+    system_instructions: Optional[str],
+    input: str | list[TResponseInputItem],
+    model_settings: ModelSettings,
+    tools: list[Tool],
+    output_schema: Optional[AgentOutputSchemaBase],
+    handoffs: list[Handoff],
+) -> str:
+    if output_schema is None or output_schema.is_plain_text():
+        output_key = None
+    else:
+        output_key = [output_schema.name(), output_schema.json_schema()]
+    material = [
+        model_name,
+        system_instructions,
+        to_jsonable_python(input, fallback=repr),
+        model_settings.to_json_dict(),
+        [_tool_key(tool) for tool in tools],
+        output_key,
+        [
+            [h.tool_name, h.tool_description, h.input_json_schema, h.agent_name]
+            for h in handoffs
+        ],
+    ]
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class CachingModel(Model):
+    def __init__(
+        self, model: Model, cache: ResponseCache, model_name: Optional[str]
+    ) -> None:
+        self._model = model
+        self._cache = cache
+        self._model_name = model_name
+
+    async def get_response(
+        self,
+        system_instructions: Optional[str],
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: Optional[AgentOutputSchemaBase],
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: Optional[str],
+        prompt: Any = None,
+    ) -> ModelResponse:
+        # Responses chained to server side state or prompt templates are not
+        # fully described by the request, so they bypass the cache.
+        cacheable = previous_response_id is None and prompt is None
+        if cacheable:
+            key = response_cache_key(
+                self._model_name,
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+            )
+            cached = await asyncio.to_thread(self._cache.get, key)
+            if cached is not None:
+                response = _model_response.validate_json(cached)
+                # Nothing was spent on a cache hit.
+                return ModelResponse(
+                    output=response.output, usage=Usage(), response_id=None
+                )
+
+        response = await self._model.get_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            prompt=prompt,
+        )
+        if cacheable:
+            await asyncio.to_thread(
+                self._cache.put, key, _model_response.dump_json(response)
+            )
+        return response
+
+    def stream_response(self, *args, **kwargs):
+        return self._model.stream_response(*args, **kwargs)
+
+
+class CachingModelProvider(ModelProvider):
+    """
+    Model provider for `OpenAIAgentsPlugin` that answers repeated model
+    calls from a `ResponseCache`.
+
+    The cache sits inside the model activity, so a hit is recorded in the
+    workflow history like any other activity result and replays
+    deterministically.
+    """
+
+    def __init__(
+        self, cache: ResponseCache, model_provider: Optional[ModelProvider] = None
+    ) -> None:
+        self.cache = cache
+        # Same default as the plugin: let activity retries handle failures.
+        self._model_provider = model_provider or OpenAIProvider(
+            openai_client=AsyncOpenAI(max_retries=0)
+        )
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return CachingModel(
+            self._model_provider.get_model(model_name), self.cache, model_name
+        )
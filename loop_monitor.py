@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.25"))
+LOOP_LAG_REPORT_SECONDS = float(os.getenv("LOOP_LAG_REPORT_SECONDS", "60"))
+LOOP_SLOW_CALLBACK_SECONDS = float(os.getenv("LOOP_SLOW_CALLBACK_SECONDS", "0.1"))
+
+# Upper bounds of the lag histogram buckets, in seconds.
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+@dataclass
+class LoopLagStats:
+    samples: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+    slow_callbacks: int = 0
+    # One count per bucket in LAG_BUCKETS, plus one for larger lags.
+    bucket_counts: List[int] = field(
+        default_factory=lambda: [0] * (len(LAG_BUCKETS) + 1)
+    )
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.samples if self.samples else 0.0
+
+    def histogram(self) -> List[Tuple[float, int]]:
+        """Cumulative (upper bound, count) pairs, ending with +Inf."""
+        pairs = []
+        count = 0
+        bounds = LAG_BUCKETS + (float("inf"),)
+        for bound, bucket_count in zip(bounds, self.bucket_counts):
+            count += bucket_count
+            pairs.append((bound, count))
+        return pairs
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop it runs on wakes up a task sleeping
+    for `interval` seconds. That scheduling lag is the time other
+    callbacks held the loop.
+
+    A watchdog thread checks that the sampling task keeps waking up. When
+    the loop has been held for longer than `slow_callback` seconds, it logs
+    the stack of the loop thread, which points at the blocking callback
+    while it is still running.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: float = LOOP_LAG_INTERVAL_SECONDS,
+        report_interval: float = LOOP_LAG_REPORT_SECONDS,
+        slow_callback: float = LOOP_SLOW_CALLBACK_SECONDS,
+    ) -> None:
+        self.name = name
+        self.interval = interval
+        self.report_interval = report_interval
+        self.slow_callback = slow_callback
+        self.stats = LoopLagStats()
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._heartbeat = 0.0
+        self._thread_id: Optional[int] = None
+        self._loop: Optional["weakref.ref[asyncio.AbstractEventLoop]"] = None
+
+    def record(self, lag: float) -> None:
+        self.stats.samples += 1
+        self.stats.total_seconds += lag
+        self.stats.last_seconds = lag
+        self.stats.max_seconds = max(self.stats.max_seconds, lag)
+        for index, bound in enumerate(LAG_BUCKETS):
+            if lag <= bound:
+                break
+        else:
+            index = len(LAG_BUCKETS)
+        self.stats.bucket_counts[index] += 1
+
+    async def _sample(self) -> None:
+        reported_at = time.perf_counter()
+        try:
+            while True:
+                started = self._heartbeat = time.perf_counter()
+                await asyncio.sleep(self.interval)
+                now = time.perf_counter()
+                self.record(max(0.0, now - started - self.interval))
+                if now - reported_at >= self.report_interval:
+                    reported_at = now
+                    logger.info(
+                        "Loop %s lag: last %.1fms, mean %.1fms, max %.1fms over %d samples",
+                        self.name,
+                        self.stats.last_seconds * 1000,
+                        self.stats.mean_seconds * 1000,
+                        self.stats.max_seconds * 1000,
+                        self.stats.samples,
+                    )
+        finally:
+            self._stopped.set()
+
+    def _watch(self) -> None:
+        reported = None
+        check_every = max(self.slow_callback / 2, 0.01)
+        while not self._stopped.wait(check_every):
+            loop = self._loop()
+            if loop is None or loop.is_closed():
+                return
+            if not loop.is_running():
+                continue
+            heartbeat = self._heartbeat
+            blocked = time.perf_counter() - heartbeat - self.interval
+            if blocked < self.slow_callback or heartbeat == reported:
+                continue
+            reported = heartbeat
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                return
+            self.stats.slow_callbacks += 1
+            logger.warning(
+                "Loop %s blocked for over %.0fms in:\n%s",
+                self.name,
+                blocked * 1000,
+                "".join(traceback.format_stack(frame)),
+            )
+
+    def start(self) -> "LoopLagMonitor":
+        """Start sampling on the running loop and register the monitor."""
+        loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._loop = weakref.ref(loop)
+        self._heartbeat = time.perf_counter()
+        self._task = loop.create_task(self._sample())
+        if self.slow_callback > 0:
+            threading.Thread(
+                target=self._watch, name=f"loop-monitor-{self.name}", daemon=True
+            ).start()
+        monitors[self.name] = self
+        _loop_monitors[loop] = self
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# Monitors started in this process, by loop name.
+monitors: Dict[str, LoopLagMonitor] = {}
+_loop_monitors: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LoopLagMonitor]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def ensure_loop_monitor(name: str) -> LoopLagMonitor:
+    """
+    Return the monitor of the running loop, starting one named `name` if the
+    loop has none yet; the web server and an in-process worker share one.
+    """
+    monitor = _loop_monitors.get(asyncio.get_running_loop())
+    if monitor is None or monitor._stopped.is_set():
+        monitor = LoopLagMonitor(name).start()
+    return monitor
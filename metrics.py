@@ -0,0 +1,379 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from loop_monitor import LAG_BUCKETS, monitors
+from temporalio.runtime import (
+    BUFFERED_METRIC_KIND_COUNTER,
+    BUFFERED_METRIC_KIND_GAUGE,
+    MetricBuffer,
+    MetricBufferDurationFormat,
+    Runtime,
+    TelemetryConfig,
+)
+
+logger = logging.getLogger(__name__)
+
+SDK_METRICS_BUFFER_SIZE = int(os.getenv("SDK_METRICS_BUFFER_SIZE", "100000"))
+SDK_METRICS_DRAIN_SECONDS = float(os.getenv("SDK_METRICS_DRAIN_SECONDS", "5"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        '{}="{}"'.format(
+            key,
+            value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str) -> None:
+        super().__init__(name, help)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value: float, **labels: object) -> None:
+        """Mirror a total that is counted elsewhere."""
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(_labels(labels), 0)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, labels, value
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str) -> None:
+        super().__init__(name, help)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, **labels: object) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(_labels(labels), 0)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, labels, value
+
+
+class _HistogramSeries:
+    __slots__ = ("bucket_counts", "sum", "count")
+
+    def __init__(self, size: int) -> None:
+        self.bucket_counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series: Dict[Labels, _HistogramSeries] = {}
+
+    def _get_series(self, key: Labels) -> _HistogramSeries:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries(len(self.buckets))
+        return series
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._get_series(key)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.bucket_counts[index] += 1
+                    break
+            series.sum += value
+            series.count += 1
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe the duration of the block, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def load(
+        self,
+        bucket_counts: Sequence[int],
+        sum: float,
+        count: int,
+        **labels: object,
+    ) -> None:
+        """Replace a series with counts kept elsewhere, one per bucket."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._get_series(key)
+            series.bucket_counts = list(bucket_counts)
+            series.sum = sum
+            series.count = count
+
+    def count(self, **labels: object) -> int:
+        series = self._series.get(_labels(labels))
+        return series.count if series is not None else 0
+
+    def samples(self) -> Iterator[Tuple[str, Labels, float]]:
+        with self._lock:
+            series = [
+                (labels, list(s.bucket_counts), s.sum, s.count)
+                for labels, s in self._series.items()
+            ]
+        for labels, bucket_counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                yield (
+                    f"{self.name}_bucket",
+                    labels + (("le", _format_value(bound)),),
+                    cumulative,
+                )
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    """
+    In-process metrics, rendered in the Prometheus text format.
+
+    Collectors are called before every render, to copy stats that other
+    components keep themselves into metrics.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help: str, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get_or_create(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help)
+
+    def histogram(
+        self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, buckets=buckets)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception:
+                logger.exception("Metrics collector %r failed", collector)
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Where this process serves `registry`, e.g. "web /metrics" or
+# "0.0.0.0:9464". SDK metrics are only buffered when there is somewhere.
+endpoints: List[str] = []
+
+
+def add_endpoint(endpoint: str) -> None:
+    endpoints.append(endpoint)
+
+
+def has_endpoint() -> bool:
+    return bool(endpoints)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # One line per scrape would drown the worker's own logs.
+        pass
+
+
+def serve_metrics(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve `registry` at http://host:port/metrics from a daemon thread, for
+    processes without a web server of their own.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    ).start()
+    add_endpoint(f"{host}:{server.server_address[1]}")
+    logger.info("Serving metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
+def _collect_loop_lag() -> None:
+    lag = registry.histogram(
+        "event_loop_lag_seconds",
+        "Delay before a task sleeping on the event loop runs again",
+        buckets=LAG_BUCKETS,
+    )
+    slow_callbacks = registry.counter(
+        "event_loop_slow_callbacks_total",
+        "Times a callback held the event loop past the slow callback threshold",
+    )
+    for name, monitor in list(monitors.items()):
+        stats = monitor.stats
+        lag.load(stats.bucket_counts, stats.total_seconds, stats.samples, loop=name)
+        slow_callbacks.set(stats.slow_callbacks, loop=name)
+
+
+registry.add_collector(_collect_loop_lag)
+
+
+# --- Temporal SDK runtime metrics ------------------------------------------------
+
+_sdk_runtime: Optional[Runtime] = None
+_sdk_buffer: Optional[MetricBuffer] = None
+_sdk_lock = threading.Lock()
+
+
+def drain_sdk_metrics(target: MetricsRegistry = registry) -> int:
+    """Copy buffered Temporal SDK metric updates into `target`."""
+    if _sdk_buffer is None:
+        return 0
+    with _sdk_lock:
+        updates = _sdk_buffer.retrieve_updates()
+    for update in updates:
+        metric = update.metric
+        labels = dict(update.attributes)
+        help = metric.description or metric.name
+        if metric.kind == BUFFERED_METRIC_KIND_COUNTER:
+            target.counter(f"{metric.name}_total", help).inc(update.value, **labels)
+        elif metric.kind == BUFFERED_METRIC_KIND_GAUGE:
+            target.gauge(metric.name, help).set(update.value, **labels)
+        else:
+            target.histogram(metric.name, help).observe(update.value, **labels)
+    return len(updates)
+
+
+def _drain_sdk_metrics_forever() -> None:
+    while True:
+        time.sleep(SDK_METRICS_DRAIN_SECONDS)
+        try:
+            drain_sdk_metrics()
+        except Exception:
+            logger.exception("Draining Temporal SDK metrics failed")
+
+
+def sdk_runtime() -> Optional[Runtime]:
+    """
+    The Temporal runtime of this process, with its metrics recorded into a
+    buffer that is drained into `registry` instead of exported over the
+    network. Pass it as `runtime=` to `Client.connect`.
+
+    Without a metrics endpoint in the process nobody could read the
+    buffer, so it is None and clients use the SDK's default runtime.
+    """
+    global _sdk_runtime, _sdk_buffer
+    if not has_endpoint():
+        return None
+    with _sdk_lock:
+        if _sdk_runtime is None:
+            _sdk_buffer = MetricBuffer(
+                SDK_METRICS_BUFFER_SIZE,
+                duration_format=MetricBufferDurationFormat.SECONDS,
+            )
+            _sdk_runtime = Runtime(telemetry=TelemetryConfig(metrics=_sdk_buffer))
+            # The buffer drops updates once full, so drain it even when
+            # nobody scrapes.
+            threading.Thread(
+                target=_drain_sdk_metrics_forever, name="sdk-metrics", daemon=True
+            ).start()
+            registry.add_collector(drain_sdk_metrics)
+        return _sdk_runtime
@@ -0,0 +1,195 @@
+import asyncio
+import dataclasses
+import os
+import threading
+import zlib
+from typing import List, Optional, Sequence
+
+from temporalio.api.common.v1 import Payload
+from temporalio.client import ClientConfig, Plugin
+from temporalio.converter import PayloadCodec
+
+from blob_store import BlobStore, BlobStoreCodec
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+# Offload large payloads to a blob store in this directory, which the web
+# server and every worker must share. Unset disables offloading.
+BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH")
+BLOB_THRESHOLD_BYTES = int(os.getenv("BLOB_THRESHOLD_BYTES", str(256 * 1024)))
+BLOB_STORE_MMAP = os.getenv("BLOB_STORE_MMAP", "").lower() in ("1", "true", "yes")
+# "zlib" or "zstd" compresses payloads; unset leaves them as they are.
+PAYLOAD_COMPRESSION = os.getenv("PAYLOAD_COMPRESSION", "")
+PAYLOAD_COMPRESSION_THRESHOLD_BYTES = int(
+    os.getenv("PAYLOAD_COMPRESSION_THRESHOLD_BYTES", "1024")
+)
+PAYLOAD_COMPRESSION_LEVEL = os.getenv("PAYLOAD_COMPRESSION_LEVEL")
+# Calls with at least this many payload bytes are compressed or
+# decompressed on a thread, off the event loop.
+PAYLOAD_COMPRESSION_THREAD_THRESHOLD_BYTES = int(
+    os.getenv("PAYLOAD_COMPRESSION_THREAD_THRESHOLD_BYTES", str(256 * 1024))
+)
+
+COMPRESSION_ENCODINGS = {"zlib": b"binary/zlib", "zstd": b"binary/zstd"}
+DEFAULT_COMPRESSION_LEVELS = {"zlib": 6, "zstd": 3}
+
+
+class CompressionCodec(PayloadCodec):
+    """
+    Compresses payloads of at least `threshold` bytes with zlib or zstd.
+
+    A compressed payload is the whole original payload, metadata included,
+    compressed and tagged with a `binary/zlib` or `binary/zstd` encoding.
+    Other payloads pass through, so histories written before compression
+    was enabled still decode, and both algorithms decode whichever is
+    configured. Payloads that do not shrink are left uncompressed.
+
+    Calls carrying at least `thread_threshold` bytes run on a thread, like
+    the blob store's file I/O, so that large payloads do not hold up the
+    event loop of the worker or the web server. zlib and zstd release the
+    GIL while they work.
+    """
+
+    def __init__(
+        self,
+        algorithm: str = "zlib",
+        threshold: int = 1024,
+        level: Optional[int] = None,
+        thread_threshold: int = 256 * 1024,
+    ) -> None:
+        if algorithm not in COMPRESSION_ENCODINGS:
+            raise ValueError(f"Unknown compression algorithm {algorithm!r}")
+        if algorithm == "zstd" and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.level = DEFAULT_COMPRESSION_LEVELS[algorithm] if level is None else level
+        self.thread_threshold = thread_threshold
+        self._encoding = COMPRESSION_ENCODINGS[algorithm]
+        # A ZstdCompressor must not be used by two threads at once.
+        self._local = threading.local()
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.algorithm == "zlib":
+            return zlib.compress(data, self.level)
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(
+                level=self.level
+            )
+        return compressor.compress(data)
+
+    def _off_loop(self, payloads: Sequence[Payload]) -> bool:
+        return sum(len(payload.data) for payload in payloads) >= self.thread_threshold
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        if self._off_loop(payloads):
+            return await asyncio.to_thread(self._encode_all, payloads)
+        return self._encode_all(payloads)
+
+    def _encode_all(self, payloads: Sequence[Payload]) -> List[Payload]:
+        return [self._encode(payload) for payload in payloads]
+
+    def _encode(self, payload: Payload) -> Payload:
+        if len(payload.data) < self.threshold:
+            return payload
+        original = payload.SerializeToString()
+        compressed = self._compress(original)
+        if len(compressed) >= len(original):
+            return payload
+        return Payload(metadata={"encoding": self._encoding}, data=compressed)
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        if self._off_loop(payloads):
+            return await asyncio.to_thread(self._decode_all, payloads)
+        return self._decode_all(payloads)
+
+    def _decode_all(self, payloads: Sequence[Payload]) -> List[Payload]:
+        return [self._decode(payload) for payload in payloads]
+
+    def _decode(self, payload: Payload) -> Payload:
+        encoding = payload.metadata.get("encoding")
+        if encoding == COMPRESSION_ENCODINGS["zlib"]:
+            return Payload.FromString(zlib.decompress(payload.data))
+        if encoding == COMPRESSION_ENCODINGS["zstd"]:
+            if zstandard is None:
+                raise ValueError("Decoding zstd payloads needs the zstandard package")
+            data = zstandard.ZstdDecompressor().decompress(payload.data)
+            return Payload.FromString(data)
+        return payload
+
+
+class CompositeCodec(PayloadCodec):
+    """Applies `codecs` in order when encoding, in reverse when decoding."""
+
+    def __init__(self, codecs: Sequence[PayloadCodec]) -> None:
+        self.codecs = list(codecs)
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        encoded = list(payloads)
+        for codec in self.codecs:
+            encoded = await codec.encode(encoded)
+        return encoded
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        decoded = list(payloads)
+        for codec in reversed(self.codecs):
+            decoded = await codec.decode(decoded)
+        return decoded
+
+
+class PayloadCodecPlugin(Plugin):
+    """
+    Adds a payload codec to the data converter of a client and of the
+    workers that use it. List it after plugins that replace the data
+    converter, such as `OpenAIAgentsPlugin`.
+    """
+
+    def __init__(self, codec: PayloadCodec) -> None:
+        self.codec = codec
+
+    def configure_client(self, config: ClientConfig) -> ClientConfig:
+        config["data_converter"] = dataclasses.replace(
+            config["data_converter"], payload_codec=self.codec
+        )
+        return super().configure_client(config)
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    global _blob_store
+    if _blob_store is None and BLOB_STORE_PATH:
+        _blob_store = BlobStore(BLOB_STORE_PATH, use_mmap=BLOB_STORE_MMAP)
+    return _blob_store
+
+
+def payload_codec() -> Optional[PayloadCodec]:
+    """The payload codec configured by the environment, if any."""
+    codecs: List[PayloadCodec] = []
+    store = get_blob_store()
+    if store is not None:
+        # Offloading comes first, so blobs hold the plain payload data that
+        # the web server streams as is.
+        codecs.append(BlobStoreCodec(store, BLOB_THRESHOLD_BYTES))
+    if PAYLOAD_COMPRESSION:
+        codecs.append(
+            CompressionCodec(
+                PAYLOAD_COMPRESSION,
+                PAYLOAD_COMPRESSION_THRESHOLD_BYTES,
+                int(PAYLOAD_COMPRESSION_LEVEL) if PAYLOAD_COMPRESSION_LEVEL else None,
+                PAYLOAD_COMPRESSION_THREAD_THRESHOLD_BYTES,
+            )
+        )
+    if not codecs:
+        return None
+    return codecs[0] if len(codecs) == 1 else CompositeCodec(codecs)
+
+
+def codec_plugins() -> List[Plugin]:
+    codec = payload_codec()
+    return [PayloadCodecPlugin(codec)] if codec is not None else []
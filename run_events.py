@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RunEvent:
+    event: str
+    data: dict
+
+    def encode(self) -> str:
+        return f"event: {self.event}\ndata: {json.dumps(self.data, default=_json_default)}\n\n"
+
+
+@dataclass
+class RunSnapshot:
+    status: dict
+    # Data of events of the watcher's event type, or events of their own type.
+    events: List[Union[dict, RunEvent]] = field(default_factory=list)
+    done: bool = False
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+# Called with the number of events already seen for the run.
+Fetch = Callable[[int], Awaitable[RunSnapshot]]
+
+
+class RunWatcher:
+    """
+    Polls one workflow run and fans its events out to every subscriber.
+
+    Late subscribers are replayed the latest status and all events seen so
+    far. The poller stops once the run is done or the last
+    subscriber leaves.
+    """
+
+    def __init__(
+        self,
+        fetch: Fetch,
+        interval: float,
+        on_close: Callable[["RunWatcher"], None],
+        event: str = "agent",
+    ) -> None:
+        self._fetch = fetch
+        self._interval = interval
+        self._event = event
+        self._on_close = on_close
+        self._status: Optional[RunEvent] = None
+        self._events: List[RunEvent] = []
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.done = False
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        if self._status is not None:
+            queue.put_nowait(self._status)
+        for event in self._events:
+            queue.put_nowait(event)
+        if self.done:
+            queue.put_nowait(None)
+        self._subscribers.add(queue)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None and not self.done:
+            # Detach right away so a new subscriber starts a fresh watcher
+            # instead of joining one that is being cancelled.
+            self._on_close(self)
+            self._task.cancel()
+
+    def _publish(self, event: Optional[RunEvent]) -> None:
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                snapshot = await self._fetch(len(self._events))
+                if self._status is None or snapshot.status != self._status.data:
+                    self._status = RunEvent("status", snapshot.status)
+                    self._publish(self._status)
+                for data in snapshot.events:
+                    event = (
+                        data
+                        if isinstance(data, RunEvent)
+                        else RunEvent(self._event, data)
+                    )
+                    self._events.append(event)
+                    self._publish(event)
+                if snapshot.done:
+                    break
+                await asyncio.sleep(self._interval)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning("Run watcher stopped: %s", e)
+            self._publish(RunEvent("error", {"error": f"{type(e).__name__}: {e}"}))
+        finally:
+            self.done = True
+            self._publish(None)
+            self._on_close(self)
+
+
+class RunEventHub:
+    """Shares one `RunWatcher` between all subscribers of the same run."""
+
+    def __init__(
+        self, interval: float, keepalive: float = 15.0, event: str = "agent"
+    ) -> None:
+        self._interval = interval
+        self._keepalive = keepalive
+        self._event = event
+        self._watchers: Dict[Hashable, RunWatcher] = {}
+
+    def __len__(self) -> int:
+        return len(self._watchers)
+
+    def _watcher(self, key: Hashable, fetch: Fetch) -> RunWatcher:
+        watcher = self._watchers.get(key)
+        if watcher is None:
+
+            def on_close(closed: RunWatcher) -> None:
+                if self._watchers.get(key) is closed:
+                    del self._watchers[key]
+
+            watcher = self._watchers[key] = RunWatcher(
+                fetch, self._interval, on_close, event=self._event
+            )
+        return watcher
+
+    async def stream(self, key: Hashable, fetch: Fetch) -> AsyncIterator[str]:
+        """Yield the run's events encoded as server-sent events."""
+        watcher = self._watcher(key, fetch)
+        queue = watcher.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self._keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    yield RunEvent("end", {}).encode()
+                    return
+                yield event.encode()
+        finally:
+            watcher.unsubscribe(queue)
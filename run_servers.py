@@ -8,20 +8,34 @@ Usage:
 
 Options:
     -h, --host HOST     Host address to bind to (default: 127.0.0.1:8000)
+    --worker-mode MODE  Where the worker runs: "loop" shares the web
+                       server's event loop, "thread" gives it its own thread
+                       and loop, "process" runs supervised worker processes
+                       (default: loop, or process with --worker-processes)
+    --worker-processes N
+                       Run N supervised worker processes instead of an
+                       in-process worker; 0 starts one per CPU core
     --help             Show this help message and exit
 
 Examples:
     python run_servers.py
     python run_servers.py --host=0.0.0.0:8000
     python run_servers.py -h 192.168.1.100:3000
+    python run_servers.py --worker-mode=thread
+    python run_servers.py --worker-processes=4
 """
 
 import asyncio
 import argparse
+import os
+import signal
+import threading
 import uvicorn
 import sys
-from web import app
-from run_worker import temporal_worker
+from typing import Optional
+from loop_monitor import ensure_loop_monitor
+from web import app, temporal_clients
+from run_worker import WorkerSettings, temporal_worker, worker_supervisor
 
 interrupt_event = asyncio.Event()
 
@@ -34,6 +48,8 @@ def parse_args():
 Examples:
     python run_servers.py
     python run_servers.py --host=0.0.0.0:8080
+    python run_servers.py --worker-mode=thread
+    python run_servers.py --worker-processes=4
         """,
     )
     parser.add_argument(
@@ -41,30 +57,109 @@ Examples:
         default="127.0.0.1:8000",
         help="Host address and port to bind to (default: 127.0.0.1:8000)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--worker-processes",
+        type=int,
+        default=int(os.getenv("WORKER_PROCESSES", "1")),
+        help="Supervised worker processes; 1 runs the worker in-process "
+        "and 0 starts one per CPU core (default: 1)",
+    )
+    parser.add_argument(
+        "--worker-mode",
+        choices=["loop", "thread", "process"],
+        default=os.getenv("WORKER_MODE") or None,
+        help="Run the worker on the web server's event loop, on its own "
+        "thread and loop, or in supervised processes (default: loop, or "
+        "process when --worker-processes is not 1)",
+    )
+    args = parser.parse_args()
+    if args.worker_mode is None:
+        args.worker_mode = "loop" if args.worker_processes == 1 else "process"
+    return args
+
+
+class WorkerThread(threading.Thread):
+    """
+    Runs the temporal worker on a dedicated thread with its own event loop,
+    so slow workflow or activity code cannot stall web requests and the
+    other way round.
+    """
+
+    def __init__(self, settings: Optional[WorkerSettings] = None) -> None:
+        super().__init__(name="temporal-worker", daemon=True)
+        self._settings = settings
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+
+    def run(self) -> None:
+        asyncio.run(self._serve())
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._ready.set()
+        await temporal_worker(self._settings, stop_event=self._stop_event)
+
+    def stop(self) -> None:
+        """Ask the worker to shut down; safe to call from any thread."""
+        if self._ready.wait(timeout=5):
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+
+async def stop_worker_thread(worker_thread: WorkerThread) -> None:
+    # The worker loop cannot wait on interrupt_event directly, so relay it.
+    await interrupt_event.wait()
+    worker_thread.stop()
+
+
+def raise_keyboard_interrupt(signum, frame):
+    # SIGTERM takes the same shutdown path as Ctrl-C, which lets supervised
+    # worker processes drain.
+    raise KeyboardInterrupt
 
 
 async def web_server(host="127.0.0.1", port=8000):
     config = uvicorn.Config(app, host=host, port=port)
     server = uvicorn.Server(config)
-    await server.serve()
+    ensure_loop_monitor("web")
+    try:
+        await server.serve()
+    finally:
+        await temporal_clients.close()
 
 
 if __name__ == "__main__":
     args = parse_args()
+    signal.signal(signal.SIGTERM, raise_keyboard_interrupt)
     app._prepare()
     host, port = app._prestart(host=args.host)
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     
     tasks = []
+    worker_thread = None
     try:
         tasks.append(loop.create_task(web_server(host=host, port=port)))
-        tasks.append(loop.create_task(temporal_worker()))
+        if args.worker_mode == "loop":
+            tasks.append(loop.create_task(temporal_worker()))
+        elif args.worker_mode == "thread":
+            worker_thread = WorkerThread()
+            worker_thread.start()
+            tasks.append(loop.create_task(stop_worker_thread(worker_thread)))
+        else:
+            settings = WorkerSettings.from_env()
+            settings.processes = args.worker_processes
+            supervisor = worker_supervisor(settings)
+            tasks.append(loop.create_task(supervisor.run(interrupt_event)))
         loop.run_forever()
     except KeyboardInterrupt:
         print("Interrupted. Shutting down...")
         interrupt_event.set()
+        if worker_thread is not None:
+            # Let the worker finish in-flight tasks on its own loop.
+            worker_thread.stop()
+            worker_thread.join()
         
         # Cancel all tasks
         for task in tasks:
@@ -1,77 +1,380 @@
+"""
+Nano-Temporal Worker
+
+Runs the temporal worker that executes the workflows and activities.
+
+Usage:
+    python run_worker.py [OPTIONS]
+
+Every option defaults to the environment variable named in its help text,
+so deployments can be tuned without changing the command line.
+
+Examples:
+    python run_worker.py
+    python run_worker.py --max-concurrent-activities=200 --activity-pollers=10
+    python run_worker.py --poller-autoscaling --poller-max=50
+    python run_worker.py --processes=4
+"""
+
 from __future__ import annotations
 
+import argparse
 import asyncio
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import timedelta
+from typing import Optional
 
 from temporalio.client import Client
 from temporalio.contrib.openai_agents import ModelActivityParameters, OpenAIAgentsPlugin
 
+from hook_sinks import configure_event_sink, event_sink_from_path
+from llm_cache import CachingModelProvider, ResponseCache
+from loop_monitor import ensure_loop_monitor
+from metrics import has_endpoint, registry as metrics_registry, sdk_runtime, serve_metrics
+from payload_codecs import codec_plugins
+from supervisor import WorkerSupervisor
 
-from activities.get_weather_activity import get_weather
-from activities.image_activities import read_image_as_base64
-from activities.math_activities import (
-    multiply_by_two,
-    random_number,
-)
-from workflows.agent_lifecycle_workflow import (
-    AgentLifecycleWorkflow,
-)
-from workflows.dynamic_system_prompt_workflow import (
-    DynamicSystemPromptWorkflow,
-)
-from workflows.hello_world_workflow import HelloWorldAgent
-from workflows.lifecycle_workflow import LifecycleWorkflow
-from workflows.local_image_workflow import LocalImageWorkflow
-from workflows.non_strict_output_workflow import (
-    NonStrictOutputWorkflow,
+from workflows.discovery import discover, load_activities, load_workflows
+from temporalio.worker import (
+    PollerBehavior,
+    PollerBehaviorAutoscaling,
+    PollerBehaviorSimpleMaximum,
+    Worker,
+    UnsandboxedWorkflowRunner,
 )
-from workflows.previous_response_id_workflow import (
-    PreviousResponseIdWorkflow,
-)
-from workflows.remote_image_workflow import RemoteImageWorkflow
-from workflows.tools_workflow import ToolsWorkflow
-from temporalio.worker import Worker, UnsandboxedWorkflowRunner
 
+# Model response cache, disabled unless a database path is given.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+# JSONL file or SQLite database that agent hook events are flushed to.
+HOOK_EVENTS_PATH = os.getenv("HOOK_EVENTS_PATH")
+
+
+def model_params() -> ModelActivityParameters:
+    """How agent model calls run as activities; the replay benchmark uses it too."""
+    return ModelActivityParameters(start_to_close_timeout=timedelta(seconds=30))
+
+
+def model_provider():
+    if not LLM_CACHE_PATH:
+        return None
+    cache = ResponseCache(
+        LLM_CACHE_PATH,
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        max_entries=LLM_CACHE_MAX_ENTRIES,
+    )
+
+    def collect_cache_stats():
+        for name in ("hits", "misses", "stores", "expired", "evictions"):
+            metrics_registry.counter(
+                f"llm_cache_{name}_total", f"Model response cache {name}"
+            ).set(getattr(cache.stats, name))
+
+    metrics_registry.add_collector(collect_cache_stats)
+    return CachingModelProvider(cache)
+
+
+def _env_int(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
+@dataclass
+class WorkerSettings:
+    """
+    Connection and tuning knobs of the worker. `None` keeps the SDK
+    default.
+    """
+
+    target: str = "localhost:7233"
+    task_queue: str = "openai-agents-basic-task-queue-v2"
+    max_concurrent_workflow_tasks: Optional[int] = None
+    max_concurrent_activities: Optional[int] = None
+    workflow_task_pollers: Optional[int] = None
+    activity_task_pollers: Optional[int] = None
+    sticky_queue_schedule_to_start_timeout: float = 10.0
+    activity_executor_size: Optional[int] = None
+    poller_autoscaling: bool = False
+    poller_min: int = 1
+    poller_max: int = 100
+    graceful_shutdown_timeout: float = 0.0
+    processes: int = 1
+    # Port of the worker's own /metrics listener; supervised process N
+    # listens on metrics_port + N. None serves no metrics.
+    metrics_port: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> WorkerSettings:
+        return cls(
+            target=os.getenv("TEMPORAL_TARGET", cls.target),
+            task_queue=os.getenv("TEMPORAL_TASK_QUEUE", cls.task_queue),
+            max_concurrent_workflow_tasks=_env_int(
+                "WORKER_MAX_CONCURRENT_WORKFLOW_TASKS"
+            ),
+            max_concurrent_activities=_env_int("WORKER_MAX_CONCURRENT_ACTIVITIES"),
+            workflow_task_pollers=_env_int("WORKER_WORKFLOW_TASK_POLLERS"),
+            activity_task_pollers=_env_int("WORKER_ACTIVITY_TASK_POLLERS"),
+            sticky_queue_schedule_to_start_timeout=float(
+                os.getenv(
+                    "WORKER_STICKY_SCHEDULE_TO_START_TIMEOUT_SECONDS",
+                    cls.sticky_queue_schedule_to_start_timeout,
+                )
+            ),
+            activity_executor_size=_env_int("WORKER_ACTIVITY_EXECUTOR_SIZE"),
+            poller_autoscaling=_env_flag("WORKER_POLLER_AUTOSCALING"),
+            poller_min=_env_int("WORKER_POLLER_MIN", cls.poller_min),
+            poller_max=_env_int("WORKER_POLLER_MAX", cls.poller_max),
+            graceful_shutdown_timeout=float(
+                os.getenv(
+                    "WORKER_GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS",
+                    cls.graceful_shutdown_timeout,
+                )
+            ),
+            processes=int(os.getenv("WORKER_PROCESSES", cls.processes)),
+            metrics_port=_env_int("WORKER_METRICS_PORT"),
+        )
+
+    def poller_behavior(self, pollers: Optional[int]) -> Optional[PollerBehavior]:
+        if self.poller_autoscaling:
+            # The SDK grows the pollers while polls keep returning tasks
+            # (backlog) and shrinks them when polls come back empty.
+            initial = min(max(pollers or 5, self.poller_min), self.poller_max)
+            return PollerBehaviorAutoscaling(
+                minimum=self.poller_min, maximum=self.poller_max, initial=initial
+            )
+        if pollers is not None:
+            return PollerBehaviorSimpleMaximum(maximum=pollers)
+        return None
 
-async def temporal_worker():
+    def activity_executor(self) -> Optional[ThreadPoolExecutor]:
+        """Threads for synchronous activities; the caller shuts them down."""
+        if self.activity_executor_size is None:
+            return None
+        return ThreadPoolExecutor(max_workers=self.activity_executor_size)
+
+    def worker_options(
+        self, activity_executor: Optional[ThreadPoolExecutor] = None
+    ) -> dict:
+        options: dict = {
+            "task_queue": self.task_queue,
+            "max_concurrent_workflow_tasks": self.max_concurrent_workflow_tasks,
+            "max_concurrent_activities": self.max_concurrent_activities,
+            "sticky_queue_schedule_to_start_timeout": timedelta(
+                seconds=self.sticky_queue_schedule_to_start_timeout
+            ),
+            "graceful_shutdown_timeout": timedelta(
+                seconds=self.graceful_shutdown_timeout
+            ),
+        }
+        workflow_pollers = self.poller_behavior(self.workflow_task_pollers)
+        if workflow_pollers is not None:
+            options["workflow_task_poller_behavior"] = workflow_pollers
+        activity_pollers = self.poller_behavior(self.activity_task_pollers)
+        if activity_pollers is not None:
+            options["activity_task_poller_behavior"] = activity_pollers
+        if activity_executor is not None:
+            options["activity_executor"] = activity_executor
+        return options
+
+
+def parse_args(argv=None) -> WorkerSettings:
+    defaults = WorkerSettings.from_env()
+    parser = argparse.ArgumentParser(
+        description="Run the temporal worker",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python run_worker.py --target=temporal:7233 --task-queue=agents
+    python run_worker.py --poller-autoscaling --poller-max=50
+        """,
+    )
+    parser.add_argument(
+        "--target",
+        default=defaults.target,
+        help="Temporal server address (env: TEMPORAL_TARGET)",
+    )
+    parser.add_argument(
+        "--task-queue",
+        default=defaults.task_queue,
+        help="Task queue to poll (env: TEMPORAL_TASK_QUEUE)",
+    )
+    parser.add_argument(
+        "--max-concurrent-workflow-tasks",
+        type=int,
+        default=defaults.max_concurrent_workflow_tasks,
+        help="Workflow task slots (env: WORKER_MAX_CONCURRENT_WORKFLOW_TASKS)",
+    )
+    parser.add_argument(
+        "--max-concurrent-activities",
+        type=int,
+        default=defaults.max_concurrent_activities,
+        help="Activity slots (env: WORKER_MAX_CONCURRENT_ACTIVITIES)",
+    )
+    parser.add_argument(
+        "--workflow-pollers",
+        dest="workflow_task_pollers",
+        type=int,
+        default=defaults.workflow_task_pollers,
+        help="Workflow task pollers, or the initial count when autoscaling "
+        "(env: WORKER_WORKFLOW_TASK_POLLERS)",
+    )
+    parser.add_argument(
+        "--activity-pollers",
+        dest="activity_task_pollers",
+        type=int,
+        default=defaults.activity_task_pollers,
+        help="Activity task pollers, or the initial count when autoscaling "
+        "(env: WORKER_ACTIVITY_TASK_POLLERS)",
+    )
+    parser.add_argument(
+        "--sticky-schedule-to-start-timeout",
+        dest="sticky_queue_schedule_to_start_timeout",
+        type=float,
+        default=defaults.sticky_queue_schedule_to_start_timeout,
+        help="Seconds a workflow task waits on the sticky queue before moving "
+        "to the normal queue (env: WORKER_STICKY_SCHEDULE_TO_START_TIMEOUT_SECONDS)",
+    )
+    parser.add_argument(
+        "--activity-executor-size",
+        type=int,
+        default=defaults.activity_executor_size,
+        help="Threads for synchronous activities (env: WORKER_ACTIVITY_EXECUTOR_SIZE)",
+    )
+    parser.add_argument(
+        "--poller-autoscaling",
+        action="store_true",
+        default=defaults.poller_autoscaling,
+        help="Scale pollers with the observed backlog (env: WORKER_POLLER_AUTOSCALING)",
+    )
+    parser.add_argument(
+        "--poller-min",
+        type=int,
+        default=defaults.poller_min,
+        help="Fewest pollers when autoscaling (env: WORKER_POLLER_MIN)",
+    )
+    parser.add_argument(
+        "--poller-max",
+        type=int,
+        default=defaults.poller_max,
+        help="Most pollers when autoscaling (env: WORKER_POLLER_MAX)",
+    )
+    parser.add_argument(
+        "--graceful-shutdown-timeout",
+        type=float,
+        default=defaults.graceful_shutdown_timeout,
+        help="Seconds running activities may take to finish on shutdown "
+        "(env: WORKER_GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=defaults.processes,
+        help="Worker processes to run under a supervisor; 0 starts one per "
+        "CPU core (env: WORKER_PROCESSES)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=defaults.metrics_port,
+        help="Serve Prometheus metrics on this port; supervised process N "
+        "uses the port plus N (env: WORKER_METRICS_PORT)",
+    )
+    return WorkerSettings(**vars(parser.parse_args(argv)))
+
+
+async def temporal_worker(
+    settings: Optional[WorkerSettings] = None,
+    stop_event: Optional[asyncio.Event] = None,
+    process_index: int = 0,
+):
+    settings = settings or WorkerSettings.from_env()
+    # A worker inside the web server is scraped through its /metrics.
+    if settings.metrics_port is not None and not has_endpoint():
+        serve_metrics(settings.metrics_port + process_index)
+    ensure_loop_monitor("worker")
+    if HOOK_EVENTS_PATH:
+        configure_event_sink(event_sink_from_path(HOOK_EVENTS_PATH))
+    # Everything the workflows and activities packages define; the
+    # manifest spares scanning them again on every start.
+    manifest = discover()
     # Create client connected to server at the given address
     client = await Client.connect(
-        "localhost:7233",
+        settings.target,
         plugins=[
             OpenAIAgentsPlugin(
-                model_params=ModelActivityParameters(
-                    start_to_close_timeout=timedelta(seconds=30)
-                )
+                model_params=model_params(),
+                model_provider=model_provider(),
             ),
+            *codec_plugins(),
         ],
+        runtime=sdk_runtime(),
     )
 
-    worker = Worker(
-        client,
-        task_queue="openai-agents-basic-task-queue-v2",
-        workflows=[
-            HelloWorldAgent,
-            ToolsWorkflow,
-            AgentLifecycleWorkflow,
-            DynamicSystemPromptWorkflow,
-            NonStrictOutputWorkflow,
-            LocalImageWorkflow,
-            RemoteImageWorkflow,
-            LifecycleWorkflow,
-            PreviousResponseIdWorkflow,
-        ],
-        activities=[
-            get_weather,
-            multiply_by_two,
-            random_number,
-            read_image_as_base64,
-        ],
-        # workflow_runner=UnsandboxedWorkflowRunner(),
-        debug_mode=False,
+    activity_executor = settings.activity_executor()
+    try:
+        worker = Worker(
+            client,
+            workflows=load_workflows(manifest),
+            activities=load_activities(manifest),
+            # workflow_runner=UnsandboxedWorkflowRunner(),
+            debug_mode=False,
+            **settings.worker_options(activity_executor),
+        )
+        if stop_event is None:
+            await worker.run()
+        else:
+            # Leaving the context shuts the worker down gracefully.
+            async with worker:
+                await stop_event.wait()
+    finally:
+        if activity_executor is not None:
+            # The worker has stopped; let any thread still running finish.
+            await asyncio.to_thread(activity_executor.shutdown)
+        if HOOK_EVENTS_PATH:
+            # Writes the hook events still queued.
+            await asyncio.to_thread(configure_event_sink, None)
+
+
+def run_worker_process(settings: WorkerSettings, process_index: int = 0) -> None:
+    """Entry point of a supervised worker process; drains on SIGTERM/SIGINT."""
+
+    async def main():
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop_event.set)
+        await temporal_worker(
+            settings, stop_event=stop_event, process_index=process_index
+        )
+
+    asyncio.run(main())
+
+
+def worker_supervisor(settings: WorkerSettings) -> WorkerSupervisor:
+    return WorkerSupervisor(
+        run_worker_process,
+        args=(settings,),
+        processes=settings.processes or None,
+        # Leave the workers time to hit their own graceful shutdown timeout.
+        drain_timeout=settings.graceful_shutdown_timeout + 10,
+        pass_index=True,
     )
-    await worker.run()
 
 
 if __name__ == "__main__":
-    print("Starting temporal worker...")
-    asyncio.run(temporal_worker())
+    settings = parse_args()
+    if settings.processes == 1:
+        print("Starting temporal worker...")
+        asyncio.run(temporal_worker(settings))
+    else:
+        print("Starting temporal worker supervisor...")
+        asyncio.run(worker_supervisor(settings).serve())
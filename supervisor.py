@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Slot:
+    index: int
+    process: Optional[multiprocessing.process.BaseProcess] = None
+    started_at: float = 0.0
+    failures: int = 0
+    restart_at: float = 0.0
+
+
+class WorkerSupervisor:
+    """
+    Runs `target(*args)` in `processes` child processes and keeps them
+    alive.
+
+    A child that exits while the supervisor is running is restarted, with
+    an exponential backoff when it keeps crashing. On stop every child is
+    sent SIGTERM and given `drain_timeout` seconds to finish its in-flight
+    tasks before it is killed.
+
+    Children are started with the "spawn" method: the Temporal core runtime
+    holds threads that do not survive a fork. With `pass_index`, each child
+    also gets the index of its slot as a last argument, which stays the
+    same across restarts.
+    """
+
+    def __init__(
+        self,
+        target: Callable[..., Any],
+        args: Sequence[Any] = (),
+        processes: Optional[int] = None,
+        drain_timeout: float = 30.0,
+        restart_backoff: float = 1.0,
+        max_restart_backoff: float = 60.0,
+        stable_after: float = 60.0,
+        poll_interval: float = 0.5,
+        pass_index: bool = False,
+    ) -> None:
+        self._target = target
+        self._args = tuple(args)
+        self._drain_timeout = drain_timeout
+        self._restart_backoff = restart_backoff
+        self._max_restart_backoff = max_restart_backoff
+        self._stable_after = stable_after
+        self._poll_interval = poll_interval
+        self._pass_index = pass_index
+        self._context = multiprocessing.get_context("spawn")
+        self._slots: List[_Slot] = [
+            _Slot(index=i) for i in range(processes or os.cpu_count() or 1)
+        ]
+        self.restarts = 0
+
+    @property
+    def processes(self) -> List[multiprocessing.process.BaseProcess]:
+        return [slot.process for slot in self._slots if slot.process is not None]
+
+    def _start(self, slot: _Slot) -> None:
+        process = self._context.Process(
+            target=self._target,
+            args=(*self._args, slot.index) if self._pass_index else self._args,
+            name=f"temporal-worker-{slot.index}",
+            daemon=False,
+        )
+        process.start()
+        slot.process = process
+        slot.started_at = time.monotonic()
+        logger.info("Started %s (pid %s)", process.name, process.pid)
+
+    def _check(self, slot: _Slot) -> None:
+        now = time.monotonic()
+        process = slot.process
+        if process is not None and process.is_alive():
+            return
+        if process is not None:
+            if now - slot.started_at >= self._stable_after:
+                slot.failures = 0
+            slot.failures += 1
+            delay = min(
+                self._restart_backoff * 2 ** (slot.failures - 1),
+                self._max_restart_backoff,
+            )
+            logger.warning(
+                "%s exited with code %s, restarting in %.1fs",
+                process.name,
+                process.exitcode,
+                delay,
+            )
+            slot.process = None
+            slot.restart_at = now + delay
+        if now >= slot.restart_at:
+            self._start(slot)
+            self.restarts += 1
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None) -> None:
+        stop_event = stop_event or asyncio.Event()
+        for slot in self._slots:
+            self._start(slot)
+        try:
+            while not stop_event.is_set():
+                try:
+                    await asyncio.wait_for(stop_event.wait(), self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                if not stop_event.is_set():
+                    for slot in self._slots:
+                        self._check(slot)
+        finally:
+            await self.drain()
+
+    async def drain(self) -> None:
+        processes = [p for p in self.processes if p.is_alive()]
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + self._drain_timeout
+        while any(p.is_alive() for p in processes) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for process in processes:
+            if process.is_alive():
+                logger.warning("%s did not drain in time, killing it", process.name)
+                process.kill()
+            process.join()
+        logger.info("All %d worker processes stopped", len(processes))
+
+    async def serve(self) -> None:
+        """Run until SIGTERM or SIGINT, then drain the children."""
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop_event.set)
+        await self.run(stop_event)
@@ -1,10 +1,13 @@
 from temporalio.contrib.openai_agents import TestModel
-from agents import ModelResponse, Usage
+from agents import Model, ModelResponse, Usage
 from agents.items import TResponseOutputItem
 from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
     ResponseOutputMessage,
     ResponseOutputText,
     ResponseFunctionToolCall,
+    ResponseTextDeltaEvent,
 )
 
 
@@ -19,6 +22,44 @@ class StaticFakeModel(TestModel):
         super().__init__(lambda: next(self._responses))
 
 
+class StreamingFakeModel(Model):
+    """Streams `deltas` as text delta events, then completes the response."""
+
+    __test__ = False
+
+    def __init__(self, deltas: list[str]) -> None:
+        self.deltas = list(deltas)
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        return ResponseBuilders.output_message("".join(self.deltas))
+
+    async def stream_response(self, *args, **kwargs):
+        for i, delta in enumerate(self.deltas):
+            yield ResponseTextDeltaEvent(
+                content_index=0,
+                delta=delta,
+                item_id="",
+                logprobs=[],
+                output_index=0,
+                sequence_number=i,
+                type="response.output_text.delta",
+            )
+        yield ResponseCompletedEvent(
+            response=Response(
+                id="",
+                created_at=0,
+                model="fake",
+                object="response",
+                output=[ResponseBuilders.response_output_message("".join(self.deltas))],
+                parallel_tool_calls=False,
+                tool_choice="auto",
+                tools=[],
+            ),
+            sequence_number=len(self.deltas),
+            type="response.completed",
+        )
+
+
 class ResponseBuilders:
     @staticmethod
     def model_response(output: TResponseOutputItem) -> ModelResponse:
@@ -1,9 +1,53 @@
+import asyncio
+import json
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
-from datetime import datetime
-from temporalio.client import WorkflowExecutionStatus
+from datetime import datetime, timedelta, timezone
+from temporalio.client import (
+    WorkflowExecutionStatus,
+    WorkflowQueryFailedError,
+    WorkflowUpdateFailedError,
+)
+from temporalio.exceptions import ApplicationError
+from temporalio.service import RPCError, RPCStatusCode
 
-from web import WorkflowRun, get_temporal_client, WorkflowRunInput, WorkflowRunOutput
+import loop_monitor
+from blob_store import BlobStore
+from client_pool import TemporalClientPool
+from write_batcher import WriteBatcher
+
+from web import (
+    WorkflowRun,
+    describe_cache,
+    get_temporal_client,
+    WorkflowRunInput,
+    WorkflowRunOutput,
+    WORKFLOW_RUNS_MAX_BATCH_SIZE,
+    runs_started,
+)
+
+
+USAGE = {
+    "requests": 2,
+    "input_tokens": 20,
+    "output_tokens": 10,
+    "total_tokens": 30,
+    "agent_seconds": 1.5,
+}
+
+
+async def streamed_json(response):
+    return json.loads(b"".join([chunk async for chunk in response.streaming_content]))
+
+
+def events_desc(status):
+    desc = Mock()
+    desc.id = "test-handle-events"
+    desc.run_id = "run-654"
+    desc.raw_info.first_run_id = desc.run_id
+    desc.status = status
+    desc.start_time = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    return desc
 
 
 class TestWebApp:
@@ -12,21 +56,37 @@ class TestWebApp:
         assert response.status_code == 200
         assert "Temporal" in response.text
 
+    @pytest.mark.asyncio
     @pytest.mark.django_db
-    def test_get_workflow_runs_empty(self, client):
-        response = client.get("/api/workflow_runs")
+    async def test_get_workflow_runs_empty(self, async_client):
+        response = await async_client.get(
+            "/api/workflow_runs", {"workflow_path": "workflows.empty"}
+        )
         assert response.status_code == 200
-        assert response.json() == []
+        assert await streamed_json(response) == []
+        assert "X-Next-Cursor" not in response
 
+    @pytest.mark.asyncio
     @pytest.mark.django_db
-    def test_get_workflow_runs_with_data(self, client):
-        WorkflowRun.objects.create(
+    async def test_requests_start_loop_monitor(self, async_client):
+        await async_client.get("/api/workflow_runs", {"workflow_path": "workflows.empty"})
+
+        monitor = loop_monitor._loop_monitors[asyncio.get_running_loop()]
+        assert monitor.name == "web"
+        monitor.stop()
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_get_workflow_runs_with_data(self, async_client):
+        await WorkflowRun.objects.acreate(
             workflow_path="workflows.hello_world_workflow",
             handle_id="test-handle-123",
         )
-        response = client.get("/api/workflow_runs")
+        response = await async_client.get(
+            "/api/workflow_runs", {"workflow_path": "workflows.hello_world_workflow"}
+        )
         assert response.status_code == 200
-        data = response.json()
+        data = await streamed_json(response)
         assert len(data) == 1
         assert (
             data[0]["workflow_path"]
@@ -34,6 +94,63 @@ class TestWebApp:
         )
         assert data[0]["handle_id"] == "test-handle-123"
 
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_get_workflow_runs_paginates_with_cursor(self, async_client):
+        created = [
+            await WorkflowRun.objects.acreate(
+                workflow_path="workflows.paginated", handle_id=f"page-{i}"
+            )
+            for i in range(5)
+        ]
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"workflow_path": "workflows.paginated", "limit": 2}
+            if cursor is not None:
+                params["cursor"] = cursor
+            response = await async_client.get("/api/workflow_runs", params)
+            assert response.status_code == 200
+            seen.extend(item["id"] for item in await streamed_json(response))
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert seen == [run.id for run in created]
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_get_workflow_runs_created_range(self, async_client):
+        run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.ranged", handle_id="ranged-1"
+        )
+        before = (run.created_at - timedelta(seconds=1)).isoformat()
+        after = (run.created_at + timedelta(seconds=1)).isoformat()
+
+        response = await async_client.get(
+            "/api/workflow_runs",
+            {"workflow_path": "workflows.ranged", "created_after": before},
+        )
+        assert [item["id"] for item in await streamed_json(response)] == [run.id]
+
+        response = await async_client.get(
+            "/api/workflow_runs",
+            {"workflow_path": "workflows.ranged", "created_after": after},
+        )
+        assert await streamed_json(response) == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_get_workflow_runs_invalid_cursor(self, async_client):
+        response = await async_client.get(
+            "/api/workflow_runs", {"cursor": "not-a-cursor"}
+        )
+        assert response.status_code == 400
+
     @pytest.mark.asyncio
     @pytest.mark.django_db
     async def test_create_workflow_run_success(self, async_client):
@@ -68,6 +185,80 @@ class TestWebApp:
         )
         assert data["handle_id"] == "workflow-handle-123"
 
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_create_workflow_runs_with_batched_writes(self, async_client):
+        handles = [Mock(id=f"workflow-handle-batched-{i}") for i in range(5)]
+
+        with patch("web.get_temporal_client") as mock_client, patch(
+            "web.WORKFLOW_RUN_BATCH_WRITES", True
+        ), patch("web.workflow_run_writer", WriteBatcher(WorkflowRun)) as writer:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.start_workflow.side_effect = handles
+            mock_client.return_value = mock_temporal_client
+
+            responses = await asyncio.gather(
+                *(
+                    async_client.post(
+                        "/api/workflow_runs",
+                        {
+                            "workflow_path": "workflows.hello_world_workflow",
+                            "payload": {"prompt": "Hello, world!"},
+                        },
+                        content_type="application/json",
+                    )
+                    for _ in handles
+                )
+            )
+
+        assert [response.status_code for response in responses] == [200] * 5
+        assert {response.json()["handle_id"] for response in responses} == {
+            handle.id for handle in handles
+        }
+        assert writer.stats.inserts == 5
+        assert (
+            await WorkflowRun.objects.filter(
+                handle_id__startswith="workflow-handle-batched-"
+            ).acount()
+            == 5
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_metrics(self, async_client):
+        mock_handle = Mock()
+        mock_handle.id = "workflow-handle-metrics"
+        started = runs_started.value(workflow_path="workflows.hello_world_workflow")
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.start_workflow.return_value = mock_handle
+            mock_client.return_value = mock_temporal_client
+            await async_client.post(
+                "/api/workflow_runs",
+                {
+                    "workflow_path": "workflows.hello_world_workflow",
+                    "payload": {"prompt": "Hello, world!"},
+                },
+                content_type="application/json",
+            )
+
+        response = await async_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        text = response.content.decode()
+        assert (
+            'http_request_duration_seconds_count{method="POST",'
+            'route="api/workflow_runs",status="200"}' in text
+        )
+        assert 'temporal_client_rpc_duration_seconds_count{rpc="start_workflow"}' in text
+        assert "describe_cache_hits_total" in text
+        assert (
+            runs_started.value(workflow_path="workflows.hello_world_workflow")
+            == started + 1
+        )
+
     @pytest.mark.asyncio
     @pytest.mark.django_db
     async def test_create_workflow_run_invalid_payload(self, async_client):
@@ -81,6 +272,154 @@ class TestWebApp:
         )
         assert response.status_code == 422
 
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "workflow_path, payload, loc",
+        [
+            ("workflows.hello_world_workflow", {"prompt": 5}, ["payload", "prompt"]),
+            ("workflows.hello_world_workflow", {}, ["payload", "prompt"]),
+            (
+                "workflows.hello_world_workflow",
+                {"prompt": "hi", "extra": 1},
+                ["payload", "extra"],
+            ),
+            ("workflows.unknown", {}, ["workflow_path"]),
+        ],
+    )
+    async def test_create_workflow_run_rejects_payload_before_temporal(
+        self, async_client, workflow_path, payload, loc
+    ):
+        with patch("web.get_temporal_client") as mock_client:
+            response = await async_client.post(
+                "/api/workflow_runs",
+                {"workflow_path": workflow_path, "payload": payload},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 422
+        assert [error["loc"] for error in response.json()["detail"]] == [loc]
+        mock_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_create_workflow_runs_batch(self, async_client):
+        handles = []
+
+        async def start_workflow(run, workflow_input, id, task_queue):
+            handle = Mock()
+            handle.id = id
+            handles.append(handle)
+            return handle
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.start_workflow.side_effect = start_workflow
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.post(
+                "/api/workflow_runs/batch",
+                {
+                    "items": [
+                        {
+                            "workflow_path": "workflows.hello_world_workflow",
+                            "payload": {"prompt": "one"},
+                        },
+                        {
+                            "workflow_path": "workflows.hello_world_workflow",
+                            "payload": {"unexpected": "field"},
+                        },
+                        {
+                            "workflow_path": "workflows.unknown",
+                            "payload": {},
+                        },
+                        {
+                            "workflow_path": "workflows.hello_world_workflow",
+                            "payload": {"prompt": "two"},
+                        },
+                    ],
+                    "concurrency": 2,
+                },
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["index"] for item in data] == [0, 1, 2, 3]
+        assert data[0]["error"] is None
+        assert data[0]["workflow_run"]["handle_id"] == handles[0].id
+        assert data[1]["workflow_run"] is None
+        assert data[1]["error"].startswith("ValidationError")
+        assert data[2]["error"].startswith("KeyError")
+        assert data[3]["workflow_run"]["handle_id"] == handles[1].id
+        assert handles[0].id != handles[1].id
+        assert (
+            await WorkflowRun.objects.filter(
+                handle_id__in=[handle.id for handle in handles]
+            ).acount()
+            == 2
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_create_workflow_runs_batch_insert_failure(self, async_client):
+        # A row for the second id already exists, so the bulk insert fails.
+        await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="test-handle-batch-taken",
+        )
+        ids = iter(["test-handle-batch-free", "test-handle-batch-taken"])
+
+        async def start_workflow(run, workflow_input, id, task_queue):
+            handle = Mock()
+            handle.id = next(ids)
+            return handle
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.start_workflow.side_effect = start_workflow
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.post(
+                "/api/workflow_runs/batch",
+                {
+                    "items": [
+                        {
+                            "workflow_path": "workflows.hello_world_workflow",
+                            "payload": {"prompt": prompt},
+                        }
+                        for prompt in ("one", "two")
+                    ],
+                    "concurrency": 1,
+                },
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data[0]["workflow_run"]["handle_id"] == "test-handle-batch-free"
+        assert data[1]["workflow_run"] is None
+        assert data[1]["error"].startswith(
+            "Workflow test-handle-batch-taken started but was not recorded"
+        )
+        assert await WorkflowRun.objects.filter(
+            handle_id="test-handle-batch-free"
+        ).aexists()
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_create_workflow_runs_batch_too_large(self, async_client):
+        item = {"workflow_path": "workflows.hello_world_workflow", "payload": {}}
+        with patch("web.get_temporal_client") as mock_client:
+            response = await async_client.post(
+                "/api/workflow_runs/batch",
+                {"items": [item] * (WORKFLOW_RUNS_MAX_BATCH_SIZE + 1)},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 422
+        mock_client.assert_not_called()
+
     @pytest.mark.asyncio
     @pytest.mark.django_db
     async def test_describe_workflow_run_success(self, async_client):
@@ -96,10 +435,12 @@ class TestWebApp:
             "workflows.hello_world_workflow"
         )
         mock_desc.run_id = "run-123"
+        mock_desc.raw_info.first_run_id = mock_desc.run_id
         mock_desc.status = WorkflowExecutionStatus.COMPLETED
         mock_desc.start_time = datetime(2023, 1, 1, 12, 0, 0)
         mock_handle.describe = AsyncMock(return_value=mock_desc)
         mock_handle.result = AsyncMock(return_value={"result": "success"})
+        mock_handle.query = AsyncMock(return_value=USAGE)
 
         with patch("web.get_temporal_client") as mock_client:
             mock_temporal_client = AsyncMock()
@@ -117,6 +458,336 @@ class TestWebApp:
         )
         assert data["status"] == "COMPLETED"
         assert data["result_payload"] == {"result": "success"}
+        assert data["usage"] == USAGE
+        assert mock_handle.query.await_args.args == ("get_usage",)
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_describe_workflow_run_terminal_is_cached(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="test-handle-cached-321",
+        )
+
+        mock_handle = Mock()
+        mock_desc = Mock()
+        mock_desc.id = "test-handle-cached-321"
+        mock_desc.run_id = "run-321"
+        mock_desc.raw_info.first_run_id = mock_desc.run_id
+        mock_desc.status = WorkflowExecutionStatus.COMPLETED
+        mock_desc.start_time = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        mock_handle.describe = AsyncMock(return_value=mock_desc)
+        mock_handle.result = AsyncMock(return_value={"result": "cached"})
+        mock_handle.query = AsyncMock(return_value=USAGE)
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            first = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+            # Served from the in-memory layer.
+            second = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+            # Served from the columns stored on the row.
+            describe_cache.clear()
+            third = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+
+        assert first.json() == second.json() == third.json()
+        assert third.json()["result_payload"] == {"result": "cached"}
+        assert third.json()["usage"] == USAGE
+        mock_handle.describe.assert_awaited_once()
+        mock_handle.result.assert_awaited_once()
+        mock_handle.query.assert_awaited_once()
+
+        await workflow_run.arefresh_from_db()
+        assert workflow_run.status == "COMPLETED"
+        assert workflow_run.run_id == "run-321"
+        assert workflow_run.total_tokens == 30
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_describe_workflow_run_retries_usage_query(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="test-handle-usage-pending-654",
+        )
+
+        mock_handle = Mock()
+        mock_desc = Mock()
+        mock_desc.id = "test-handle-usage-pending-654"
+        mock_desc.run_id = "run-654"
+        mock_desc.raw_info.first_run_id = mock_desc.run_id
+        mock_desc.status = WorkflowExecutionStatus.COMPLETED
+        mock_desc.start_time = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        mock_handle.describe = AsyncMock(return_value=mock_desc)
+        mock_handle.result = AsyncMock(return_value={"result": "done"})
+        # No worker is polling at first.
+        mock_handle.query = AsyncMock(
+            side_effect=[
+                RPCError("no poller", RPCStatusCode.DEADLINE_EXCEEDED, b""),
+                USAGE,
+            ]
+        )
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            first = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+            await workflow_run.arefresh_from_db()
+            assert workflow_run.status == "COMPLETED"
+            assert workflow_run.usage_retry_at is not None
+
+            # The retry is not due yet, so the run is not queried.
+            second = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+            assert mock_handle.query.await_count == 1
+
+            await WorkflowRun.objects.filter(id=workflow_run.id).aupdate(
+                usage_retry_at=datetime(2023, 1, 1, tzinfo=timezone.utc)
+            )
+            third = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+            fourth = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+
+        assert first.json()["usage"] is second.json()["usage"] is None
+        assert second.json()["result_payload"] == {"result": "done"}
+        assert third.json()["usage"] == fourth.json()["usage"] == USAGE
+        mock_handle.describe.assert_awaited_once()
+        assert mock_handle.query.await_count == 2
+        mock_temporal_client.get_workflow_handle.assert_called_with(
+            "test-handle-usage-pending-654", run_id="run-654"
+        )
+
+        await workflow_run.arefresh_from_db()
+        assert workflow_run.usage_retry_at is None
+        assert workflow_run.total_tokens == 30
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_result_streams_from_blob_store(
+        self, async_client, tmp_path
+    ):
+        store = BlobStore(str(tmp_path))
+        result = json.dumps({"haiku": "long " * 1000}).encode()
+        digest = store.put(result)
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="test-handle-blob-456",
+        )
+
+        mock_handle = Mock()
+        mock_desc = Mock()
+        mock_desc.id = "test-handle-blob-456"
+        mock_desc.run_id = "run-456"
+        mock_desc.raw_info.first_run_id = mock_desc.run_id
+        mock_desc.status = WorkflowExecutionStatus.COMPLETED
+        mock_desc.start_time = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        mock_handle.describe = AsyncMock(return_value=mock_desc)
+        # What the blob store codec decodes an offloaded result to.
+        mock_handle.result = AsyncMock(
+            return_value={"$blob": digest, "size": len(result)}
+        )
+        mock_handle.query = AsyncMock(return_value=USAGE)
+
+        with patch("web.get_temporal_client") as mock_client, patch(
+            "web.get_blob_store", return_value=store
+        ):
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            described = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+            response = await async_client.get(
+                f"/api/workflow_runs/{workflow_run.id}/result"
+            )
+            body = b"".join([chunk async for chunk in response.streaming_content])
+
+        assert described.json()["result_payload"] is None
+        assert described.json()["result_blob"] == {"sha256": digest, "size": len(result)}
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/json"
+        assert response["Content-Length"] == str(len(result))
+        assert body == result
+
+        await workflow_run.arefresh_from_db()
+        assert workflow_run.result_blob == {"sha256": digest, "size": len(result)}
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_fan_out_results(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.fan_out_workflow",
+            handle_id="test-handle-fan-out-321",
+            status="COMPLETED",
+            run_id="run-321",
+            started_at=datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+            result_payload={
+                "chunks": ["fan-out-chunk-0", "fan-out-chunk-2"],
+                "completed": 3,
+                "failed": 1,
+            },
+        )
+        chunks = {
+            "fan-out-chunk-0": {
+                "results": ["a", None],
+                "errors": [{"index": 1, "error": "ValueError: no answer"}],
+            },
+            "fan-out-chunk-2": {"results": ["c"], "errors": []},
+        }
+
+        def get_workflow_handle(handle_id):
+            handle = Mock()
+            handle.result = AsyncMock(return_value=chunks[handle_id])
+            return handle
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(
+                side_effect=get_workflow_handle
+            )
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.get(
+                f"/api/workflow_runs/{workflow_run.id}/results"
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "results": ["a", None, "c"],
+            "errors": [{"index": 1, "error": "ValueError: no answer"}],
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_fan_out_results_of_other_workflow(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="test-handle-fan-out-322",
+        )
+
+        with patch("web.get_temporal_client") as mock_client:
+            response = await async_client.get(
+                f"/api/workflow_runs/{workflow_run.id}/results"
+            )
+
+        assert response.status_code == 404
+        mock_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_result_without_blob_store(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="test-handle-blob-457",
+            status="COMPLETED",
+            run_id="run-457",
+            started_at=datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+            result_blob={"sha256": "0" * 64, "size": 10},
+        )
+
+        with patch("web.get_temporal_client") as mock_client, patch(
+            "web.get_blob_store", return_value=None
+        ):
+            response = await async_client.get(
+                f"/api/workflow_runs/{workflow_run.id}/result"
+            )
+
+        assert response.status_code == 404
+        mock_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_result_inline(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="test-handle-inline-789",
+            status="COMPLETED",
+            run_id="run-789",
+            started_at=datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+            result_payload={"haiku": "short"},
+        )
+
+        response = await async_client.get(f"/api/workflow_runs/{workflow_run.id}/result")
+
+        assert response.status_code == 200
+        assert response.json() == {"haiku": "short"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_result_of_running_run(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="test-handle-running-790",
+        )
+        mock_handle = Mock()
+        mock_desc = Mock()
+        mock_desc.id = "test-handle-running-790"
+        mock_desc.run_id = "run-790"
+        mock_desc.raw_info.first_run_id = mock_desc.run_id
+        mock_desc.status = WorkflowExecutionStatus.RUNNING
+        mock_desc.start_time = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        mock_handle.describe = AsyncMock(return_value=mock_desc)
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.get(
+                f"/api/workflow_runs/{workflow_run.id}/result"
+            )
+
+        assert response.status_code == 409
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_runs_usage(self, async_client):
+        path = "workflows.usage_report"
+        for hour, tokens in [(9, 100), (10, 50), (10, None)]:
+            workflow_run = await WorkflowRun.objects.acreate(
+                workflow_path=path,
+                handle_id=f"usage-{hour}-{tokens}",
+                requests=None if tokens is None else 1,
+                input_tokens=None if tokens is None else tokens - 10,
+                output_tokens=None if tokens is None else 10,
+                total_tokens=tokens,
+                agent_seconds=None if tokens is None else 2.0,
+            )
+            await WorkflowRun.objects.filter(id=workflow_run.id).aupdate(
+                created_at=datetime(2025, 1, 1, hour, 30, tzinfo=timezone.utc)
+            )
+
+        with (
+            patch("web.INPUT_TOKEN_COST_PER_MILLION", "1000"),
+            patch("web.OUTPUT_TOKEN_COST_PER_MILLION", None),
+        ):
+            daily = await async_client.get(
+                "/api/workflow_runs/usage", {"workflow_path": path}
+            )
+        hourly = await async_client.get(
+            "/api/workflow_runs/usage", {"workflow_path": path, "bucket": "hour"}
+        )
+        invalid = await async_client.get("/api/workflow_runs/usage", {"bucket": "week"})
+
+        assert daily.status_code == 200
+        assert daily.json() == [
+            {
+                "workflow_path": path,
+                "bucket": "2025-01-01T00:00:00Z",
+                "runs": 2,
+                "requests": 2,
+                "input_tokens": 130,
+                "output_tokens": 20,
+                "total_tokens": 150,
+                "agent_seconds": 4.0,
+                "cost": 0.13,
+            }
+        ]
+        assert [(row["bucket"], row["total_tokens"], row["cost"]) for row in hourly.json()] == [
+            ("2025-01-01T09:00:00Z", 100, None),
+            ("2025-01-01T10:00:00Z", 50, None),
+        ]
+        assert invalid.status_code == 400
 
     @pytest.mark.asyncio
     @pytest.mark.django_db
@@ -131,6 +802,7 @@ class TestWebApp:
         mock_desc.id = "test-handle-running-456"
         mock_desc.workflow_type = "TestWorkflow"
         mock_desc.run_id = "run-456"
+        mock_desc.raw_info.first_run_id = mock_desc.run_id
         mock_desc.status = WorkflowExecutionStatus.RUNNING
         mock_desc.start_time = datetime(2023, 1, 1, 12, 0, 0)
         mock_handle.describe = AsyncMock(return_value=mock_desc)
@@ -147,6 +819,427 @@ class TestWebApp:
         assert data["status"] == "RUNNING"
         assert data["result_payload"] is None
 
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_describe_workflow_runs_batch(self, async_client):
+        completed = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="batch-completed",
+        )
+        broken = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="batch-broken",
+        )
+
+        def get_workflow_handle(handle_id):
+            handle = Mock()
+            if handle_id == "batch-broken":
+                handle.describe = AsyncMock(side_effect=RuntimeError("unavailable"))
+                return handle
+            desc = Mock()
+            desc.id = handle_id
+            desc.run_id = f"run-{handle_id}"
+            desc.raw_info.first_run_id = desc.run_id
+            desc.status = WorkflowExecutionStatus.COMPLETED
+            desc.start_time = datetime(2023, 1, 1, 12, 0, 0)
+            handle.describe = AsyncMock(return_value=desc)
+            handle.result = AsyncMock(return_value={"result": handle_id})
+            handle.query = AsyncMock(side_effect=WorkflowQueryFailedError("no usage"))
+            return handle
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(
+                side_effect=get_workflow_handle
+            )
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.post(
+                "/api/workflow_runs/describe",
+                {"ids": [completed.id, 999999, broken.id]},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["id"] for item in data] == [completed.id, 999999, broken.id]
+        assert data[0]["workflow_run"]["status"] == "COMPLETED"
+        assert data[0]["workflow_run"]["result_payload"] == {
+            "result": "batch-completed"
+        }
+        assert data[1]["error"] == "Not Found"
+        assert data[2]["workflow_run"] is None
+        assert data[2]["error"] == "RuntimeError: unavailable"
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_describe_workflow_runs_batch_too_large(self, async_client):
+        with patch("web.get_temporal_client") as mock_client:
+            response = await async_client.post(
+                "/api/workflow_runs/describe",
+                {"ids": list(range(1, WORKFLOW_RUNS_MAX_BATCH_SIZE + 2))},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 422
+        mock_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_events(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.lifecycle_workflow",
+            handle_id="test-handle-events-654",
+        )
+
+        mock_handle = Mock()
+        mock_handle.describe = AsyncMock(
+            side_effect=[
+                events_desc(WorkflowExecutionStatus.RUNNING),
+                events_desc(WorkflowExecutionStatus.COMPLETED),
+            ]
+        )
+        mock_handle.result = AsyncMock(return_value={"number": 4})
+
+        async def query(name, *args, **kwargs):
+            if name == "get_usage":
+                return USAGE
+            return [{"event": "agent_started", "message": "started"}]
+
+        mock_handle.query = AsyncMock(side_effect=query)
+
+        with patch("web.get_temporal_client") as mock_client, patch(
+            "web.run_events._interval", 0
+        ):
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.get(
+                f"/api/workflow_runs/{workflow_run.id}/events"
+            )
+            assert response["Content-Type"] == "text/event-stream"
+            body = b"".join(
+                [chunk async for chunk in response.streaming_content]
+            ).decode()
+
+        assert "event: status\n" in body
+        assert '"status": "COMPLETED"' in body
+        assert 'event: agent\ndata: {"event": "agent_started"' in body
+        assert body.endswith("event: end\ndata: {}\n\n")
+        # The finished run is not queried for events again.
+        assert [
+            call.args
+            for call in mock_handle.query.await_args_list
+            if call.args[0] == "get_events"
+        ] == [("get_events", 0)]
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_events_retry_failed_query(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.lifecycle_workflow",
+            handle_id="test-handle-events-655",
+        )
+
+        mock_handle = Mock()
+        mock_handle.describe = AsyncMock(
+            side_effect=[
+                events_desc(WorkflowExecutionStatus.RUNNING),
+                events_desc(WorkflowExecutionStatus.RUNNING),
+                events_desc(WorkflowExecutionStatus.COMPLETED),
+            ]
+        )
+        mock_handle.result = AsyncMock(return_value={"number": 4})
+        events = [
+            RPCError("no poller", RPCStatusCode.DEADLINE_EXCEEDED, b""),
+            [{"event": "agent_started", "message": "started"}],
+        ]
+
+        async def query(name, *args, **kwargs):
+            if name == "get_usage":
+                return USAGE
+            result = events.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        mock_handle.query = AsyncMock(side_effect=query)
+
+        with patch("web.get_temporal_client") as mock_client, patch(
+            "web.run_events._interval", 0
+        ):
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.get(
+                f"/api/workflow_runs/{workflow_run.id}/events"
+            )
+            body = b"".join(
+                [chunk async for chunk in response.streaming_content]
+            ).decode()
+
+        assert "event: error" not in body
+        assert 'event: agent\ndata: {"event": "agent_started"' in body
+        assert '"status": "COMPLETED"' in body
+        assert body.endswith("event: end\ndata: {}\n\n")
+        assert events == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_output(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.streaming_workflow",
+            handle_id="test-handle-output-987",
+        )
+
+        mock_handle = Mock()
+        mock_handle.query = AsyncMock(
+            side_effect=[
+                {"chunks": ["Hola", None, "Hello"], "done": False},
+                {"chunks": [" world"], "done": True},
+            ]
+        )
+
+        with patch("web.get_temporal_client") as mock_client, patch(
+            "web.output_events._interval", 0
+        ):
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.get(
+                f"/api/workflow_runs/{workflow_run.id}/output"
+            )
+            body = b"".join(
+                [chunk async for chunk in response.streaming_content]
+            ).decode()
+
+        assert (
+            'event: chunk\ndata: {"text": "Hola"}\n\n'
+            "event: reset\ndata: {}\n\n"
+            'event: chunk\ndata: {"text": "Hello"}\n\n'
+        ) in body
+        assert 'event: chunk\ndata: {"text": " world"}' in body
+        assert body.endswith("event: end\ndata: {}\n\n")
+        assert [call.args for call in mock_handle.query.await_args_list] == [
+            ("get_output", 0),
+            ("get_output", 3),
+        ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_output_after_failed_query(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.streaming_workflow",
+            handle_id="test-handle-output-988",
+        )
+
+        mock_handle = Mock()
+        mock_handle.describe = AsyncMock(
+            side_effect=[
+                events_desc(WorkflowExecutionStatus.RUNNING),
+                events_desc(WorkflowExecutionStatus.COMPLETED),
+            ]
+        )
+        mock_handle.result = AsyncMock(return_value={"response": "Hello"})
+        outputs = [
+            {"chunks": ["Hel"], "done": False},
+            # No worker polls, then the run is gone.
+            RPCError("no poller", RPCStatusCode.DEADLINE_EXCEEDED, b""),
+            RPCError("workflow closed", RPCStatusCode.NOT_FOUND, b""),
+        ]
+
+        async def query(name, *args, **kwargs):
+            if name == "get_usage":
+                return USAGE
+            result = outputs.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        mock_handle.query = AsyncMock(side_effect=query)
+
+        with patch("web.get_temporal_client") as mock_client, patch(
+            "web.output_events._interval", 0
+        ):
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.get(
+                f"/api/workflow_runs/{workflow_run.id}/output"
+            )
+            body = b"".join(
+                [chunk async for chunk in response.streaming_content]
+            ).decode()
+
+        assert "event: error" not in body
+        assert 'event: chunk\ndata: {"text": "Hel"}' in body
+        assert body.count("event: status") == 2
+        assert 'event: status\ndata: {"streaming": true, "done": true}' in body
+        assert body.endswith("event: end\ndata: {}\n\n")
+        assert outputs == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_describe_workflow_run_continued_as_new(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.conversation_workflow",
+            handle_id="test-handle-chain-111",
+        )
+
+        latest = Mock()
+        latest_desc = Mock()
+        latest_desc.id = "test-handle-chain-111"
+        latest_desc.run_id = "run-3"
+        latest_desc.raw_info.first_run_id = "run-1"
+        latest_desc.status = WorkflowExecutionStatus.COMPLETED
+        latest_desc.start_time = datetime(2023, 1, 3, 12, 0, 0, tzinfo=timezone.utc)
+        latest.describe = AsyncMock(return_value=latest_desc)
+        latest.result = AsyncMock(return_value={"turns": 40})
+        latest.query = AsyncMock(return_value=USAGE)
+        first = Mock()
+        first_desc = Mock()
+        first_desc.start_time = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        first.describe = AsyncMock(return_value=first_desc)
+
+        def get_workflow_handle(handle_id, run_id=None):
+            return first if run_id == "run-1" else latest
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(
+                side_effect=get_workflow_handle
+            )
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+            describe_cache.clear()
+            from_row = await async_client.get(f"/api/workflow_runs/{workflow_run.id}")
+
+        data = response.json()
+        assert data["run_id"] == "run-3"
+        assert data["first_run_id"] == "run-1"
+        assert data["created_at"] == "2023-01-01T12:00:00Z"
+        assert data["result_payload"] == {"turns": 40}
+        assert from_row.json() == data
+        # The latest run was described and queried, not the first.
+        latest.describe.assert_awaited_once()
+        latest.query.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_send_workflow_run_message(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.conversation_workflow",
+            handle_id="test-handle-messages-222",
+        )
+        mock_handle = Mock()
+        mock_handle.execute_update = AsyncMock(return_value="Hello there")
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.post(
+                f"/api/workflow_runs/{workflow_run.id}/messages",
+                {"message": "Hi"},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {"reply": "Hello there"}
+        mock_handle.execute_update.assert_awaited_once_with("send_message", "Hi")
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_send_workflow_run_message_rejected(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.conversation_workflow",
+            handle_id="test-handle-messages-333",
+        )
+        mock_handle = Mock()
+        mock_handle.execute_update = AsyncMock(
+            side_effect=WorkflowUpdateFailedError(
+                ApplicationError("The conversation has ended")
+            )
+        )
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.post(
+                f"/api/workflow_runs/{workflow_run.id}/messages",
+                {"message": "Hi"},
+                content_type="application/json",
+            )
+            missing = await async_client.post(
+                "/api/workflow_runs/999999/messages",
+                {"message": "Hi"},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 409
+        assert response.content == b"The conversation has ended"
+        assert missing.status_code == 404
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_end_workflow_run(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.conversation_workflow",
+            handle_id="test-handle-end-444",
+        )
+        mock_handle = Mock()
+        mock_handle.signal = AsyncMock()
+
+        with patch("web.get_temporal_client") as mock_client:
+            mock_temporal_client = AsyncMock()
+            mock_temporal_client.get_workflow_handle = Mock(return_value=mock_handle)
+            mock_client.return_value = mock_temporal_client
+
+            response = await async_client.post(
+                f"/api/workflow_runs/{workflow_run.id}/end"
+            )
+
+        assert response.status_code == 202
+        mock_handle.signal.assert_awaited_once_with("end")
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_unavailable_server_drops_pooled_client(self, async_client):
+        workflow_run = await WorkflowRun.objects.acreate(
+            workflow_path="workflows.conversation_workflow",
+            handle_id="test-handle-unavailable-555",
+        )
+        mock_handle = Mock()
+        mock_handle.signal = AsyncMock(
+            side_effect=RPCError("connection refused", RPCStatusCode.UNAVAILABLE, b"")
+        )
+        broken_client, new_client = Mock(), Mock()
+        broken_client.get_workflow_handle = Mock(return_value=mock_handle)
+        pool = TemporalClientPool(AsyncMock(side_effect=[broken_client, new_client]))
+
+        with patch("web.temporal_clients", pool):
+            response = await async_client.post(
+                f"/api/workflow_runs/{workflow_run.id}/end"
+            )
+            assert await pool.get() is new_client
+
+        assert response.status_code == 409
+        assert pool.stats.invalidations == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_workflow_run_events_not_found(self, async_client):
+        response = await async_client.get("/api/workflow_runs/999999/events")
+        assert response.status_code == 404
+
     @pytest.mark.asyncio
     @pytest.mark.django_db
     async def test_describe_workflow_run_not_found(self, async_client):
@@ -0,0 +1,136 @@
+import dataclasses
+import hashlib
+from unittest.mock import Mock
+
+import pytest
+from temporalio.api.common.v1 import Payload
+from temporalio.client import Client
+from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
+from temporalio.converter import DataConverter
+
+from blob_store import (
+    BLOB_REF_ENCODING,
+    BlobStore,
+    BlobStoreCodec,
+    blob_reference,
+    keep_blob_references,
+)
+from payload_codecs import PayloadCodecPlugin
+
+
+@pytest.fixture(params=[False, True], ids=["read", "mmap"])
+def store(request, tmp_path):
+    return BlobStore(str(tmp_path / "blobs"), use_mmap=request.param)
+
+
+class TestBlobStore:
+    def test_content_addressed(self, store):
+        data = b"x" * 1000
+        digest = store.put(data)
+
+        assert digest == hashlib.sha256(data).hexdigest()
+        assert store.put(data) == digest
+        assert store.get(digest) == data
+        assert store.size(digest) == 1000
+        assert store.path(digest).parent.name == digest[:2]
+        assert list(store.root.rglob("*.tmp")) == []
+
+    def test_iter_chunks(self, store):
+        data = bytes(range(256)) * 10
+        digest = store.put(data)
+
+        chunks = list(store.iter_chunks(digest, chunk_size=1000))
+
+        assert [len(chunk) for chunk in chunks] == [1000, 1000, 560]
+        assert b"".join(chunks) == data
+
+    def test_empty_blob(self, store):
+        digest = store.put(b"")
+
+        assert store.get(digest) == b""
+        assert list(store.iter_chunks(digest)) == []
+
+    def test_rejects_paths_that_are_not_digests(self, store):
+        with pytest.raises(ValueError):
+            store.get("../../etc/passwd")
+
+
+class TestBlobStoreCodec:
+    @pytest.fixture
+    def converter(self, store):
+        return dataclasses.replace(
+            DataConverter.default, payload_codec=BlobStoreCodec(store, threshold=100)
+        )
+
+    @pytest.mark.asyncio
+    async def test_small_payloads_stay_inline(self, converter, store):
+        (payload,) = await converter.encode([{"text": "short"}])
+
+        assert payload.metadata["encoding"] == b"json/plain"
+        assert list(store.root.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_large_payloads_are_offloaded(self, converter, store):
+        value = {"text": "haiku " * 100}
+        (payload,) = await converter.encode([value])
+
+        assert payload.metadata["encoding"] == BLOB_REF_ENCODING
+        assert len(payload.data) < 100
+        assert await converter.decode([payload]) == [value]
+
+    @pytest.mark.asyncio
+    async def test_blob_is_the_payload_data(self, converter, store):
+        value = {"text": "haiku " * 100}
+        (inline,) = await DataConverter.default.encode([value])
+        (payload,) = await converter.encode([value])
+
+        reference = blob_reference(await self.decode_reference(converter, payload))
+
+        assert store.get(reference["$blob"]) == inline.data
+        assert reference["size"] == len(inline.data)
+
+    @staticmethod
+    async def decode_reference(converter, payload):
+        with keep_blob_references():
+            (value,) = await converter.decode([payload])
+        return value
+
+    @pytest.mark.asyncio
+    async def test_metadata_is_restored(self, store):
+        codec = BlobStoreCodec(store, threshold=10)
+        payload = Payload(
+            metadata={"encoding": b"binary/plain", "extra": b"1"}, data=b"y" * 50
+        )
+
+        (encoded,) = await codec.encode([payload])
+        (decoded,) = await codec.decode([encoded])
+
+        assert decoded == payload
+
+    @pytest.mark.asyncio
+    async def test_truncated_blob(self, store):
+        codec = BlobStoreCodec(store, threshold=10)
+        (encoded,) = await codec.encode([Payload(data=b"z" * 50)])
+        digest = hashlib.sha256(b"z" * 50).hexdigest()
+        store.path(digest).write_bytes(b"z" * 10)
+
+        with pytest.raises(ValueError, match="truncated"):
+            await codec.decode([encoded])
+
+    def test_blob_reference(self):
+        assert blob_reference({"$blob": "ab", "size": 2}) == {"$blob": "ab", "size": 2}
+        assert blob_reference({"result": "inline"}) is None
+        assert blob_reference(None) is None
+
+
+def test_codec_plugin_keeps_the_agents_payload_converter(tmp_path):
+    codec = BlobStoreCodec(BlobStore(str(tmp_path)), threshold=100)
+    client = Client(
+        Mock(), plugins=[OpenAIAgentsPlugin(), PayloadCodecPlugin(codec)]
+    )
+
+    assert client.data_converter.payload_codec is codec
+    assert (
+        client.data_converter.payload_converter_class
+        is not DataConverter.default.payload_converter_class
+    )
@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from temporalio.service import RPCError, RPCStatusCode
+
+from client_pool import TemporalClientPool
+
+
+class TestTemporalClientPool:
+    @pytest.mark.asyncio
+    async def test_connects_once_and_reuses(self):
+        client = Mock()
+        connect = AsyncMock(return_value=client)
+        pool = TemporalClientPool(connect)
+
+        assert await pool.get() is client
+        assert await pool.get() is client
+
+        connect.assert_awaited_once()
+        assert pool.stats.connects == 1
+        assert pool.stats.reuses == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_connect(self):
+        client = Mock()
+
+        async def slow_connect():
+            await asyncio.sleep(0.01)
+            return client
+
+        connect = AsyncMock(side_effect=slow_connect)
+        pool = TemporalClientPool(connect)
+
+        clients = await asyncio.gather(*(pool.get() for _ in range(5)))
+
+        assert all(c is client for c in clients)
+        connect.assert_awaited_once()
+        assert pool.stats.reuses == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_connect_backs_off(self):
+        client = Mock()
+        connect = AsyncMock(side_effect=[ConnectionError("down"), client])
+        pool = TemporalClientPool(connect, backoff_seconds=60)
+
+        with pytest.raises(ConnectionError):
+            await pool.get()
+        # Still inside the backoff window: fail fast without reconnecting.
+        with pytest.raises(ConnectionError):
+            await pool.get()
+        assert connect.await_count == 1
+        assert pool.stats.connect_failures == 1
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_backoff(self):
+        client = Mock()
+        connect = AsyncMock(side_effect=[ConnectionError("down"), client])
+        pool = TemporalClientPool(connect, backoff_seconds=0)
+
+        with pytest.raises(ConnectionError):
+            await pool.get()
+        assert await pool.get() is client
+        assert connect.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_and_close(self):
+        connect = AsyncMock(side_effect=[Mock(), Mock(), Mock()])
+        pool = TemporalClientPool(connect)
+
+        first = await pool.get()
+        pool.invalidate()
+        second = await pool.get()
+        assert first is not second
+
+        await pool.close()
+        third = await pool.get()
+        assert third is not second
+        assert pool.stats.connects == 3
+
+    @pytest.mark.asyncio
+    async def test_connection_errors_drop_the_client(self):
+        connect = AsyncMock(side_effect=[Mock(), Mock()])
+        pool = TemporalClientPool(connect)
+
+        first = await pool.get()
+        pool.report_error(RPCError("not found", RPCStatusCode.NOT_FOUND, b""))
+        assert await pool.get() is first
+
+        unavailable = RPCError("connection refused", RPCStatusCode.UNAVAILABLE, b"")
+        pool.report_error(unavailable)
+        # A second caller reporting the same outage does not count again.
+        pool.report_error(unavailable)
+        assert await pool.get() is not first
+        assert pool.stats.invalidations == 1
+        assert connect.await_count == 2
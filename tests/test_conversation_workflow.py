@@ -0,0 +1,168 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from agents import Usage
+from temporalio.client import Client
+from temporalio.contrib.openai_agents import OpenAIAgentsPlugin, TestModelProvider
+from temporalio.worker import Worker
+
+from tests.openai_helper import ResponseBuilders, StaticFakeModel
+from workflows import get_registry
+
+registry = get_registry()
+workflow_info = registry.get_by_import_path("workflows.conversation_workflow")
+
+
+class FakeConversationModel(StaticFakeModel):
+    responses = [
+        ResponseBuilders.output_message("reply 1"),
+        ResponseBuilders.output_message("reply 2"),
+        ResponseBuilders.output_message("reply 3"),
+        ResponseBuilders.output_message("summary of turns 1 and 2"),
+    ]
+
+
+class TestWithLocalWorkflow:
+    @pytest.mark.asyncio
+    async def test_workflow_execution(self, temporal_client):
+        client = Client(
+            **{
+                **temporal_client.config(),
+                "plugins": [
+                    OpenAIAgentsPlugin(
+                        model_provider=TestModelProvider(FakeConversationModel())
+                    )
+                ],
+            }
+        )
+        task_queue = str(uuid.uuid4())
+
+        async with Worker(
+            client, task_queue=task_queue, workflows=[workflow_info.workflow]
+        ):
+            handle = await client.start_workflow(
+                workflow_info.workflow.run,
+                # Small enough that the run continues as new between turns.
+                workflow_info.input(keep_messages=4, max_history_events=20),
+                id=f"conversation-{uuid.uuid4()}",
+                task_queue=task_queue,
+            )
+            replies = [
+                await handle.execute_update("send_message", f"message {turn}")
+                for turn in (1, 2, 3)
+            ]
+            await handle.signal("end")
+            result = await handle.result()
+            first_run = await client.get_workflow_handle(
+                handle.id, run_id=handle.first_execution_run_id
+            ).describe()
+
+        assert replies == ["reply 1", "reply 2", "reply 3"]
+        assert result == workflow_info.output(
+            summary="summary of turns 1 and 2",
+            messages=[
+                {"role": "user", "content": "message 3"},
+                {"role": "assistant", "content": "reply 3"},
+            ],
+            turns=3,
+        )
+        assert first_run.status.name == "CONTINUED_AS_NEW"
+
+
+def fake_run_agent(*outputs: str) -> AsyncMock:
+    async def run_agent(run_usage, agent, input):
+        run_usage.add(Usage(requests=1, total_tokens=10))
+        return SimpleNamespace(final_output=next(replies))
+
+    replies = iter(outputs)
+    return AsyncMock(side_effect=run_agent)
+
+
+class TestConversationWorkflow:
+    @pytest.mark.asyncio
+    async def test_send_message_includes_recent_messages_and_summary(self):
+        workflow = workflow_info.workflow(
+            workflow_info.input(
+                instructions="Be brief.",
+                summary="The user likes owls.",
+                messages=[
+                    {"role": "user", "content": "Hi"},
+                    {"role": "assistant", "content": "Hello"},
+                ],
+                turns=1,
+            )
+        )
+        run_agent = fake_run_agent("Owls are great")
+        with patch("workflows.conversation_workflow.run_agent", run_agent):
+            reply = await workflow.send_message("Tell me about owls")
+
+        assert reply == "Owls are great"
+        _, agent = run_agent.await_args.args
+        assert agent.instructions == (
+            "Be brief.\n\nSummary of the conversation so far:\nThe user likes owls."
+        )
+        assert run_agent.await_args.kwargs["input"] == [
+            {"role": "user", "content": "Hi"},
+            {"role": "assistant", "content": "Hello"},
+            {"role": "user", "content": "Tell me about owls"},
+        ]
+        assert workflow.get_messages()["turns"] == 2
+        assert workflow.get_messages()["messages"][-1] == {
+            "role": "assistant",
+            "content": "Owls are great",
+        }
+
+    @pytest.mark.asyncio
+    async def test_compact_folds_older_messages_into_summary(self):
+        messages = [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}"}
+            for i in range(6)
+        ]
+        workflow = workflow_info.workflow(
+            workflow_info.input(keep_messages=4, summary="Earlier.", messages=messages)
+        )
+        assert workflow._needs_compaction()
+
+        run_agent = fake_run_agent("Shorter.")
+        with patch("workflows.conversation_workflow.run_agent", run_agent):
+            await workflow._compact()
+
+        assert not workflow._needs_compaction()
+        assert workflow.get_messages() == {
+            "summary": "Shorter.",
+            "messages": messages[-2:],
+            "turns": 0,
+        }
+        assert run_agent.await_args.kwargs["input"] == (
+            "Earlier summary:\nEarlier.\n\n"
+            "user: m0\nassistant: m1\nuser: m2\nassistant: m3"
+        )
+        assert workflow.get_usage().requests == 1
+
+    @pytest.mark.asyncio
+    async def test_compaction_does_not_fire_every_turn(self):
+        workflow = workflow_info.workflow(workflow_info.input(keep_messages=4))
+        run_agent = fake_run_agent(*(f"reply {i}" for i in range(12)))
+        compacted = []
+        with patch("workflows.conversation_workflow.run_agent", run_agent):
+            for turn in range(1, 7):
+                await workflow.send_message(f"message {turn}")
+                if workflow._needs_compaction():
+                    await workflow._compact()
+                    compacted.append(turn)
+
+        # Turns add two messages: 6 are compacted down to 2, which leaves
+        # room for another turn before the next compaction.
+        assert compacted == [3, 5]
+        assert len(workflow.get_messages()["messages"]) == 4
+
+    def test_validator_rejects_messages_after_end(self):
+        workflow = workflow_info.workflow(workflow_info.input())
+        workflow.validate_send_message("Hi")
+        with pytest.raises(ValueError):
+            workflow.validate_send_message("  ")
+        workflow.end()
+        with pytest.raises(ValueError):
+            workflow.validate_send_message("Hi")
@@ -0,0 +1,65 @@
+import pytest
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from db_profile import performance_options, sqlite_profile
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": "db.sqlite3",
+        "OPTIONS": {"uri": False},
+    }
+}
+
+
+class TestSqliteProfile:
+    def test_default_profile_leaves_settings_alone(self):
+        assert sqlite_profile(DATABASES, "default") is DATABASES
+
+    def test_performance_profile(self):
+        databases = sqlite_profile(DATABASES, "performance")
+
+        default = databases["default"]
+        assert default["NAME"] == "db.sqlite3"
+        assert default["OPTIONS"]["uri"] is False
+        assert default["OPTIONS"]["transaction_mode"] == "IMMEDIATE"
+        assert "PRAGMA journal_mode=WAL" in default["OPTIONS"]["init_command"]
+        assert default["CONN_MAX_AGE"] is None
+        assert default["CONN_HEALTH_CHECKS"] is True
+        # The settings passed in are not changed.
+        assert "CONN_MAX_AGE" not in DATABASES["default"]
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            sqlite_profile(DATABASES, "fastest")
+
+    def test_pragmas_are_applied_to_new_connections(self, tmp_path, django_db_blocker):
+        connection = DatabaseWrapper(
+            {
+                "NAME": str(tmp_path / "profile.sqlite3"),
+                "OPTIONS": performance_options(
+                    mmap_size=1024 * 1024, busy_timeout_seconds=2
+                ),
+                "AUTOCOMMIT": True,
+                "CONN_MAX_AGE": 0,
+                "CONN_HEALTH_CHECKS": False,
+                "TIME_ZONE": None,
+            }
+        )
+        # A connection of its own, not the test database.
+        try:
+            with django_db_blocker.unblock(), connection.cursor() as cursor:
+                pragmas = {
+                    name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                    for name in ("journal_mode", "synchronous", "mmap_size", "busy_timeout")
+                }
+        finally:
+            connection.close()
+
+        assert pragmas == {
+            "journal_mode": "wal",
+            # NORMAL
+            "synchronous": 1,
+            "mmap_size": 1024 * 1024,
+            "busy_timeout": 2000,
+        }
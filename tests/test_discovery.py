@@ -0,0 +1,176 @@
+import json
+import os
+import sys
+import textwrap
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from workflows import discovery
+from workflows.discovery import discover, load_activities, load_workflows, scan
+
+MODULE = textwrap.dedent(
+    """
+    from dataclasses import dataclass
+
+    from temporalio import activity, workflow
+
+    from workflows.registry import WorkflowInfo
+    from workflows.hello_world_workflow import HelloWorldAgent, hello_world_workflow_info
+
+
+    @dataclass
+    class Input:
+        name: str
+
+
+    @workflow.defn
+    class GreetingWorkflow:
+        @workflow.run
+        async def run(self, input: Input) -> str:
+            return input.name
+
+
+    class PoliteGreetingWorkflow(GreetingWorkflow):
+        pass
+
+
+    greeting_workflow_info = WorkflowInfo(input=Input, output=str, workflow=GreetingWorkflow)
+
+
+    @activity.defn
+    async def greet(name: str) -> str:
+        return name
+
+
+    class GreetingActivities:
+        @activity.defn
+        async def shout(self, name: str) -> str:
+            return name.upper()
+
+        @activity.defn
+        async def whisper(self, name: str) -> str:
+            return name.lower()
+    """
+)
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    name = f"discovered_{uuid.uuid4().hex}"
+    (tmp_path / name).mkdir()
+    (tmp_path / name / "__init__.py").write_text("")
+    (tmp_path / name / "greeting.py").write_text(MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path, name
+    for module in [m for m in sys.modules if m.startswith(name)]:
+        del sys.modules[module]
+
+
+def run_discover(tmp_path, name):
+    return discover(str(tmp_path / "manifest.json"), root=tmp_path, packages=[name])
+
+
+class TestScan:
+    def test_finds_definitions(self, package):
+        tmp_path, name = package
+        manifest = scan(tmp_path, [name])
+
+        module = f"{name}.greeting"
+        assert manifest.workflow_infos == {module: f"{module}:greeting_workflow_info"}
+        # Imported workflows are left to the module that defines them, and
+        # subclasses that are not decorated themselves are not workflows.
+        assert manifest.workflows == [f"{module}:GreetingWorkflow"]
+        assert manifest.activities == [
+            f"{module}:greet",
+            f"{module}:GreetingActivities.shout",
+            f"{module}:GreetingActivities.whisper",
+        ]
+        assert set(manifest.files) == {f"{name}/__init__.py", f"{name}/greeting.py"}
+
+    def test_missing_package_is_skipped(self, tmp_path):
+        assert scan(tmp_path, ["absent"]).files == {}
+
+    def test_load(self, package):
+        tmp_path, name = package
+        manifest = scan(tmp_path, [name])
+
+        (workflow,) = load_workflows(manifest)
+        greet, shout, whisper = load_activities(manifest)
+
+        assert workflow.__name__ == "GreetingWorkflow"
+        assert greet.__name__ == "greet"
+        assert shout.__self__ is whisper.__self__
+
+
+class TestManifest:
+    def test_unchanged_sources_are_not_scanned(self, package):
+        tmp_path, name = package
+        first = run_discover(tmp_path, name)
+
+        with patch.object(discovery, "scan", wraps=discovery.scan) as rescan:
+            second = run_discover(tmp_path, name)
+
+        rescan.assert_not_called()
+        assert second == first
+
+    def test_touched_file_is_compared_by_hash(self, package):
+        tmp_path, name = package
+        run_discover(tmp_path, name)
+        source = tmp_path / name / "greeting.py"
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        with patch.object(discovery, "scan", wraps=discovery.scan) as rescan:
+            run_discover(tmp_path, name)
+        rescan.assert_not_called()
+
+        saved = json.loads((tmp_path / "manifest.json").read_text())
+        assert saved["files"][f"{name}/greeting.py"]["mtime_ns"] == stat.st_mtime_ns + 10**9
+
+    def test_changed_source_is_scanned_again(self, package):
+        tmp_path, name = package
+        run_discover(tmp_path, name)
+        (tmp_path / name / "greeting.py").write_text(
+            MODULE.replace("GreetingWorkflow", "WelcomeWorkflow")
+        )
+        sys.modules.pop(f"{name}.greeting")
+
+        manifest = run_discover(tmp_path, name)
+
+        assert manifest.workflows == [f"{name}.greeting:WelcomeWorkflow"]
+
+    def test_new_file_is_scanned(self, package):
+        tmp_path, name = package
+        run_discover(tmp_path, name)
+        (tmp_path / name / "other.py").write_text(
+            "from temporalio import activity\n\n"
+            "@activity.defn\n"
+            "def ping() -> str:\n"
+            "    return 'pong'\n"
+        )
+
+        manifest = run_discover(tmp_path, name)
+
+        assert f"{name}.other:ping" in manifest.activities
+
+    def test_unreadable_manifest_is_rebuilt(self, package):
+        tmp_path, name = package
+        (tmp_path / "manifest.json").write_text("{not json")
+
+        manifest = run_discover(tmp_path, name)
+
+        assert manifest.workflows == [f"{name}.greeting:GreetingWorkflow"]
+        saved = json.loads((tmp_path / "manifest.json").read_text())
+        assert saved["version"] == discovery.MANIFEST_VERSION
+
+
+def test_workflows_package():
+    manifest = scan()
+
+    assert "workflows.hello_world_workflow" in manifest.workflow_infos
+    assert "workflows.streaming_workflow:StreamingHelloWorldAgent" in manifest.workflows
+    assert manifest.activities == [
+        "workflows.streaming_workflow:StreamingAgentActivities.stream_agent_response"
+    ]
@@ -0,0 +1,344 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from agents import Model, ModelResponse, Usage
+from temporalio.client import Client
+from temporalio.contrib.openai_agents import OpenAIAgentsPlugin, TestModelProvider
+from temporalio.worker import Worker
+
+from tests.openai_helper import ResponseBuilders
+from workflows import get_registry
+from workflows.fan_out_workflow import (
+    FanOutChunkInput,
+    FanOutChunkOutput,
+    FanOutChunkWorkflow,
+    FanOutItemError,
+)
+from workflows.usage import RunUsage
+
+registry = get_registry()
+workflow_info = registry.get_by_import_path("workflows.fan_out_workflow")
+
+
+class EchoFanOutModel(Model):
+    """Answers each question with its own number, whatever order they run in."""
+
+    __test__ = False
+
+    async def get_response(
+        self, system_instructions, input, *args, **kwargs
+    ) -> ModelResponse:
+        if not isinstance(input, str):
+            input = input[-1]["content"]
+        return ResponseBuilders.output_message(input.replace("question", "answer"))
+
+    async def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+class TestWithLocalWorkflow:
+    @pytest.mark.asyncio
+    async def test_workflow_execution(self, temporal_client):
+        client = Client(
+            **{
+                **temporal_client.config(),
+                "plugins": [
+                    OpenAIAgentsPlugin(
+                        model_provider=TestModelProvider(EchoFanOutModel())
+                    )
+                ],
+            }
+        )
+        task_queue = str(uuid.uuid4())
+
+        async with Worker(
+            client,
+            task_queue=task_queue,
+            workflows=[workflow_info.workflow, FanOutChunkWorkflow],
+        ):
+            result = await client.execute_workflow(
+                workflow_info.workflow,
+                workflow_info.input(
+                    inputs=[f"question {i}" for i in range(5)],
+                    max_concurrency=1,
+                    chunk_size=1,
+                    inputs_per_run=2,
+                ),
+                id=f"fan-out-{uuid.uuid4()}",
+                task_queue=task_queue,
+            )
+            results = []
+            for chunk_id in result.chunks:
+                chunk_output = await client.get_workflow_handle_for(
+                    FanOutChunkWorkflow.run, chunk_id
+                ).result()
+                results.extend(chunk_output.results)
+
+        assert len(result.chunks) == 5
+        assert (result.completed, result.failed) == (5, 0)
+        assert results == [f"answer {i}" for i in range(5)]
+
+
+async def wait_condition(condition):
+    while not condition():
+        await asyncio.sleep(0)
+
+
+def fake_run_agent(in_flight: list, peak: list):
+    async def run_agent(run_usage, agent, input):
+        in_flight.append(input)
+        peak[0] = max(peak[0], len(in_flight))
+        # Later inputs finish first.
+        for _ in range(10 - int(input)):
+            await asyncio.sleep(0)
+        in_flight.remove(input)
+        run_usage.add(Usage(requests=1, total_tokens=10))
+        return SimpleNamespace(final_output=f"answer {input}")
+
+    return run_agent
+
+
+class TestFanOutChunkWorkflow:
+    @pytest.fixture(autouse=True)
+    def chunk_workflow(self):
+        with (
+            patch("workflows.fan_out_workflow.workflow.wait_condition", wait_condition),
+            patch(
+                "workflows.fan_out_workflow.workflow.info",
+                return_value=SimpleNamespace(
+                    workflow_id="fan-out-chunk-0", parent=None
+                ),
+            ),
+        ):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order_within_window(self):
+        peak = [0]
+        with patch(
+            "workflows.fan_out_workflow.run_agent", fake_run_agent([], peak)
+        ):
+            workflow = FanOutChunkWorkflow()
+            output = await workflow.run(
+                FanOutChunkInput(
+                    inputs=[str(i) for i in range(6)], offset=0, max_concurrency=2
+                )
+            )
+
+        assert output.results == [f"answer {i}" for i in range(6)]
+        assert output.errors == []
+        assert peak[0] == 2
+        assert workflow.get_progress() == {"completed": 6, "total": 6}
+        assert output.usage.requests == 6
+
+    @pytest.mark.asyncio
+    async def test_records_failed_inputs(self):
+        run_agent = fake_run_agent([], [0])
+
+        async def failing_run_agent(run_usage, agent, input):
+            if input == "1":
+                try:
+                    raise ValueError("no answer")
+                except ValueError as error:
+                    raise RuntimeError("Activity task failed") from error
+            return await run_agent(run_usage, agent, input)
+
+        with patch("workflows.fan_out_workflow.run_agent", failing_run_agent):
+            workflow = FanOutChunkWorkflow()
+            output = await workflow.run(
+                FanOutChunkInput(inputs=["0", "1", "2"], offset=10)
+            )
+
+        assert output.results == ["answer 0", None, "answer 2"]
+        assert output.errors == [FanOutItemError(index=11, error="ValueError: no answer")]
+        assert workflow.get_progress() == {"completed": 3, "total": 3}
+
+    @pytest.mark.asyncio
+    async def test_signals_parent_once_last_input_started(self):
+        in_flight = []
+        parent = SimpleNamespace(workflow_id="fan-out", run_id="run")
+        handle = SimpleNamespace(signal=AsyncMock())
+
+        async def signal(name, offset):
+            # Only the window's worth of inputs is left running.
+            assert len(in_flight) == 2
+            assert in_flight[-1] == "3"
+
+        handle.signal.side_effect = signal
+        with (
+            patch(
+                "workflows.fan_out_workflow.run_agent", fake_run_agent(in_flight, [0])
+            ),
+            patch(
+                "workflows.fan_out_workflow.workflow.info",
+                return_value=SimpleNamespace(
+                    workflow_id="fan-out-chunk-0", parent=parent
+                ),
+            ),
+            patch(
+                "workflows.fan_out_workflow.workflow.get_external_workflow_handle",
+                return_value=handle,
+            ) as get_handle,
+        ):
+            await FanOutChunkWorkflow().run(
+                FanOutChunkInput(
+                    inputs=[str(i) for i in range(4)], offset=4, max_concurrency=2
+                )
+            )
+
+        get_handle.assert_called_once_with("fan-out", run_id="run")
+        handle.signal.assert_awaited_once_with("chunk_draining", 4)
+
+
+class FakeChunks:
+    """
+    Stands in for the chunk workflows: each one signals the fan-out that it
+    is draining as soon as it starts, then runs until `finish` is called.
+    """
+
+    def __init__(self, workflow) -> None:
+        self.workflow = workflow
+        self.started: list[FanOutChunkInput] = []
+        self.finished: dict[int, asyncio.Event] = {}
+
+    @property
+    def running(self) -> list[int]:
+        return [
+            chunk_input.offset
+            for chunk_input in self.started
+            if not self.finished[chunk_input.offset].is_set()
+        ]
+
+    def finish(self, offset: int) -> None:
+        self.finished[offset].set()
+
+    async def execute_child_workflow(self, run, chunk_input, id):
+        assert id == f"fan-out-chunk-{chunk_input.offset}"
+        self.started.append(chunk_input)
+        self.finished[chunk_input.offset] = asyncio.Event()
+        self.workflow.chunk_draining(chunk_input.offset)
+        await self.finished[chunk_input.offset].wait()
+        return FanOutChunkOutput(
+            results=[f"answer {item}" for item in chunk_input.inputs],
+            errors=[FanOutItemError(index=chunk_input.offset, error="failed")],
+            usage=RunUsage(requests=len(chunk_input.inputs)),
+        )
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+class TestFanOutWorkflow:
+    @pytest.fixture
+    def workflow(self):
+        workflow = workflow_info.workflow()
+        chunks = FakeChunks(workflow)
+        with (
+            patch(
+                "workflows.fan_out_workflow.workflow.execute_child_workflow",
+                chunks.execute_child_workflow,
+            ),
+            patch("workflows.fan_out_workflow.workflow.wait_condition", wait_condition),
+            patch(
+                "workflows.fan_out_workflow.workflow.info",
+                return_value=SimpleNamespace(workflow_id="fan-out"),
+            ),
+        ):
+            yield workflow, chunks
+
+    @pytest.mark.asyncio
+    async def test_starts_next_chunk_while_current_one_drains(self, workflow):
+        workflow, chunks = workflow
+        run = asyncio.create_task(
+            workflow.run(
+                workflow_info.input(
+                    inputs=[str(i) for i in range(5)], max_concurrency=2, chunk_size=2
+                )
+            )
+        )
+
+        await settle()
+        # The second chunk starts while the first is still running, but a
+        # third waits for the first to finish.
+        assert chunks.running == [0, 2]
+        chunks.finish(0)
+        await settle()
+        assert chunks.running == [2, 4]
+        chunks.finish(2)
+        chunks.finish(4)
+        result = await run
+
+        assert [chunk_input.inputs for chunk_input in chunks.started] == [
+            ["0", "1"],
+            ["2", "3"],
+            ["4"],
+        ]
+        assert chunks.started[0].max_concurrency == 2
+        assert result == workflow_info.output(
+            chunks=["fan-out-chunk-0", "fan-out-chunk-2", "fan-out-chunk-4"],
+            completed=5,
+            failed=3,
+        )
+        assert workflow.get_progress() == {"completed": 5, "total": 5}
+        assert workflow.get_usage().requests == 5
+
+    @pytest.mark.asyncio
+    async def test_continues_as_new_with_remaining_inputs(self, workflow):
+        workflow, chunks = workflow
+
+        class ContinuedAsNew(Exception):
+            pass
+
+        with patch(
+            "workflows.fan_out_workflow.workflow.continue_as_new",
+            side_effect=ContinuedAsNew,
+        ) as continue_as_new:
+            run = asyncio.create_task(
+                workflow.run(
+                    workflow_info.input(
+                        inputs=[str(i) for i in range(2, 7)],
+                        chunk_size=2,
+                        # Rounded down to whole chunks.
+                        inputs_per_run=5,
+                        offset=2,
+                        failed=1,
+                        usage=RunUsage(requests=2, total_tokens=20),
+                    )
+                )
+            )
+            await settle()
+            assert chunks.running == [2, 4]
+            chunks.finish(2)
+            chunks.finish(4)
+            with pytest.raises(ContinuedAsNew):
+                await run
+
+        assert [chunk_input.offset for chunk_input in chunks.started] == [2, 4]
+        (next_input,) = continue_as_new.call_args.args
+        # Neither the finished inputs nor their results are carried over.
+        assert next_input.inputs == ["6"]
+        assert next_input.offset == 6
+        assert next_input.failed == 3
+        assert next_input.chunk_size == 2
+        assert next_input.usage.requests == 6
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "setting", ["max_concurrency", "chunk_size", "inputs_per_run"]
+    )
+    async def test_rejects_empty_window(self, setting):
+        with pytest.raises(ValueError):
+            await workflow_info.workflow().run(
+                workflow_info.input(inputs=["0"], **{setting: 0})
+            )
+
+    def test_registered(self):
+        assert "workflows.fan_out_workflow" in registry.paths()
+        assert registry.validate_input(
+            "workflows.fan_out_workflow", {"inputs": ["a", "b"], "max_concurrency": 2}
+        ) == workflow_info.input(inputs=["a", "b"], max_concurrency=2)
@@ -0,0 +1,200 @@
+import json
+import sqlite3
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from agents import Usage
+
+from hook_sinks import (
+    EventSinkWriter,
+    JsonlEventSink,
+    SqliteEventSink,
+    event_sink_from_path,
+)
+from workflows.agent_lifecycle_workflow import CustomAgentHooks
+from workflows.hooks import EventRecorder
+from workflows.lifecycle_workflow import ExampleHooks
+
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+
+    def write(self, workflow_id, records):
+        self.batches.append(list(records))
+
+
+def context(requests=0, input_tokens=0, output_tokens=0):
+    return SimpleNamespace(
+        usage=Usage(
+            requests=requests,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+        )
+    )
+
+
+agent = SimpleNamespace(name="Start Agent")
+tool = SimpleNamespace(name="random_number")
+
+
+class TestRecordingHooks:
+    @pytest.mark.asyncio
+    async def test_records_structured_events_with_usage_deltas(self):
+        hooks = ExampleHooks()
+        await hooks.on_agent_start(context(), agent)
+        await hooks.on_tool_start(context(1, 10, 5), agent, tool)
+        await hooks.on_tool_end(context(1, 10, 5), agent, tool, "3")
+        await hooks.on_handoff(
+            context(2, 30, 8), agent, SimpleNamespace(name="Multiply Agent")
+        )
+
+        events = hooks.events
+        assert [e["event"] for e in events] == [
+            "agent_started",
+            "tool_started",
+            "tool_ended",
+            "handoff",
+        ]
+        assert [e["seq"] for e in events] == [1, 2, 3, 4]
+        assert events[1]["tool"] == "random_number"
+        assert events[1]["usage"] == [1, 10, 5, 15]
+        assert events[2]["usage"] == [0, 0, 0, 0]
+        assert events[3] == {
+            "seq": 4,
+            "event": "handoff",
+            "at": events[3]["at"],
+            "usage": [1, 20, 3, 23],
+            "agent": "Start Agent",
+            "to_agent": "Multiply Agent",
+        }
+
+    @pytest.mark.asyncio
+    async def test_agent_hooks_share_a_recorder(self):
+        recorder = EventRecorder()
+        first = CustomAgentHooks("Agent", recorder)
+        second = CustomAgentHooks("Other", recorder)
+        await first.on_start(context(), agent)
+        await second.on_end(context(), agent, 4)
+
+        assert [(e["hooks"], e["event"]) for e in recorder.events] == [
+            ("Agent", "agent_started"),
+            ("Other", "agent_ended"),
+        ]
+        assert recorder.events[1]["output"] == "4"
+
+
+@pytest.fixture
+def writer():
+    # Flushed by the tests themselves.
+    writer = EventSinkWriter(ListSink(), flush_interval=3600)
+    yield writer
+    writer.close()
+
+
+class TestEventRecorder:
+    def test_hands_over_in_batches(self, writer):
+        recorder = EventRecorder(writer=writer, batch_size=2)
+        for _ in range(3):
+            recorder.record("agent_started", Usage(), agent="a")
+        writer.flush()
+        assert [len(batch) for batch in writer.sink.batches] == [2]
+
+        recorder.flush()
+        writer.flush()
+        assert [len(batch) for batch in writer.sink.batches] == [2, 1]
+
+    def test_replay_hands_over_what_was_not_written(self, writer):
+        with (
+            patch("workflows.hooks.workflow.in_workflow", return_value=True),
+            patch("workflows.hooks.workflow.time", return_value=1.0),
+            patch(
+                "workflows.hooks.workflow.info",
+                return_value=SimpleNamespace(workflow_id="wf-1", run_id="run-1"),
+            ),
+        ):
+            recorder = EventRecorder(writer=writer, batch_size=2)
+            for _ in range(3):
+                recorder.record("agent_started", Usage(), agent="a")
+            writer.flush()
+            # The run is evicted before its last record is handed over, and
+            # replays its records on the next activation.
+            replayed = EventRecorder(writer=writer, batch_size=2)
+            for _ in range(4):
+                replayed.record("agent_started", Usage(), agent="a")
+            replayed.flush()
+            writer.flush()
+
+        assert [[r["seq"] for r in batch] for batch in writer.sink.batches] == [
+            [1, 2],
+            [3, 4],
+        ]
+        assert writer.duplicates == 2
+        assert replayed.events[0]["at"] == 1.0
+
+
+class TestEventSinkWriter:
+    def test_writes_each_record_of_a_run_once(self, writer):
+        records = [{"seq": 1}, {"seq": 2}]
+        writer.submit("wf-1", "run-1", records)
+        # A retried workflow task records the same events again.
+        writer.submit("wf-1", "run-1", [*records, {"seq": 3}])
+        writer.submit("wf-1", "run-2", records)
+        writer.flush()
+
+        assert writer.sink.batches == [
+            [{"seq": 1}, {"seq": 2}, {"seq": 3}, {"seq": 1}, {"seq": 2}]
+        ]
+        assert writer.duplicates == 2
+
+    def test_drops_oldest_when_full(self):
+        writer = EventSinkWriter(ListSink(), max_pending=2, flush_interval=3600)
+        writer.submit("wf-1", "run-1", [{"seq": 1}, {"seq": 2}, {"seq": 3}])
+        writer.close()
+
+        assert writer.sink.batches == [[{"seq": 2}, {"seq": 3}]]
+        assert writer.dropped == 1
+
+    def test_thread_writes_full_batches(self):
+        sink = ListSink()
+        writer = EventSinkWriter(sink, batch_size=2, flush_interval=3600)
+        written = threading.Event()
+        sink.write = lambda workflow_id, records: written.set()
+
+        writer.submit("wf-1", "run-1", [{"seq": 1}, {"seq": 2}])
+
+        assert written.wait(5)
+        writer.close()
+
+
+class TestEventSinks:
+    def test_jsonl_sink(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        sink = event_sink_from_path(str(path))
+        assert isinstance(sink, JsonlEventSink)
+
+        sink.write("wf-1", [{"seq": 1, "event": "handoff", "at": 1.0}])
+        sink.write("wf-1", [{"seq": 2, "event": "agent_ended", "at": 2.0}])
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines == [
+            {"workflow_id": "wf-1", "seq": 1, "event": "handoff", "at": 1.0},
+            {"workflow_id": "wf-1", "seq": 2, "event": "agent_ended", "at": 2.0},
+        ]
+
+    def test_sqlite_sink_ignores_rewritten_records(self, tmp_path):
+        path = str(tmp_path / "events.sqlite3")
+        sink = event_sink_from_path(path)
+        assert isinstance(sink, SqliteEventSink)
+
+        records = [{"seq": 1, "event": "handoff", "at": 1.0}]
+        sink.write("wf-1", records)
+        sink.write("wf-1", records)
+        sink.close()
+
+        with sqlite3.connect(path) as db:
+            rows = db.execute("SELECT workflow_id, seq, event FROM agent_events").fetchall()
+        assert rows == [("wf-1", 1, "handoff")]
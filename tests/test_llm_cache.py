@@ -0,0 +1,89 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from agents import Agent, ModelSettings, RunConfig, Runner
+from temporalio.contrib.openai_agents import TestModelProvider
+
+from llm_cache import CachingModelProvider, ResponseCache, response_cache_key
+from tests.openai_helper import ResponseBuilders, StaticFakeModel
+
+
+class CountingFakeModel(StaticFakeModel):
+    calls = 0
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fn = self._respond
+
+    def _respond(self):
+        CountingFakeModel.calls += 1
+        return ResponseBuilders.output_message("cached haiku")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "llm_cache.sqlite3"), max_entries=2)
+    yield cache
+    cache.close()
+
+
+class TestResponseCache:
+    def test_get_and_put(self, cache):
+        assert cache.get("a") is None
+        cache.put("a", b"value")
+
+        assert cache.get("a") == b"value"
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_expired_entries_are_misses(self, cache):
+        cache.put("a", b"value")
+        with patch("llm_cache.time.time", return_value=10**12):
+            assert cache.get("a") is None
+        assert cache.stats.expired == 1
+
+    def test_evicts_least_recently_read(self, cache):
+        now = time.time()
+        with patch("llm_cache.time.time", side_effect=[now - 3, now - 2, now - 1, now]):
+            cache.put("a", b"1")
+            cache.put("b", b"2")
+            cache.get("a")
+            cache.put("c", b"3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert cache.get("c") == b"3"
+        assert cache.stats.evictions == 1
+
+
+class TestResponseCacheKey:
+    def test_key_depends_on_instructions_and_input(self):
+        args = ("gpt", "Be brief.", "hello", ModelSettings(), [], None, [])
+        key = response_cache_key(*args)
+
+        assert key == response_cache_key(*args)
+        assert key != response_cache_key("gpt", "Be long.", "hello", ModelSettings(), [], None, [])
+        assert key != response_cache_key("gpt", "Be brief.", "bye", ModelSettings(), [], None, [])
+        assert key != response_cache_key("other", "Be brief.", "hello", ModelSettings(), [], None, [])
+
+
+class TestCachingModelProvider:
+    @pytest.mark.asyncio
+    async def test_hit_skips_model_call(self, cache):
+        CountingFakeModel.calls = 0
+        provider = CachingModelProvider(
+            cache, model_provider=TestModelProvider(CountingFakeModel())
+        )
+        agent = Agent(name="Assistant", instructions="You only respond in haikus.")
+        run_config = RunConfig(model_provider=provider)
+
+        first = await Runner.run(agent, input="horses", run_config=run_config)
+        second = await Runner.run(agent, input="horses", run_config=run_config)
+        third = await Runner.run(agent, input="boats", run_config=run_config)
+
+        assert first.final_output == second.final_output == "cached haiku"
+        assert third.final_output == "cached haiku"
+        assert CountingFakeModel.calls == 2
+        assert cache.stats.hits == 1
+        assert cache.stats.stores == 2
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from loop_monitor import LAG_BUCKETS, LoopLagMonitor, ensure_loop_monitor, monitors
+
+
+class TestLoopLagMonitor:
+    @pytest.mark.asyncio
+    async def test_records_time_the_loop_was_blocked(self):
+        monitor = LoopLagMonitor("test", interval=0.01, slow_callback=0).start()
+        try:
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)
+            await asyncio.sleep(0.03)
+        finally:
+            monitor.stop()
+
+        assert monitors["test"] is monitor
+        assert monitor.stats.samples >= 2
+        assert monitor.stats.max_seconds >= 0.05
+        assert monitor.stats.mean_seconds <= monitor.stats.max_seconds
+
+    def test_record_updates_stats(self):
+        monitor = LoopLagMonitor("record")
+        monitor.record(0.1)
+        monitor.record(0.3)
+
+        assert monitor.stats.samples == 2
+        assert monitor.stats.last_seconds == 0.3
+        assert monitor.stats.max_seconds == 0.3
+        assert monitor.stats.mean_seconds == pytest.approx(0.2)
+
+    def test_histogram_is_cumulative(self):
+        monitor = LoopLagMonitor("histogram")
+        monitor.record(0.0005)
+        monitor.record(0.02)
+        monitor.record(60)
+
+        histogram = monitor.stats.histogram()
+        assert histogram[0] == (LAG_BUCKETS[0], 1)
+        assert dict(histogram)[0.025] == 2
+        assert dict(histogram)[5.0] == 2
+        assert histogram[-1] == (float("inf"), 3)
+
+    @pytest.mark.asyncio
+    async def test_logs_stack_of_slow_callback(self, caplog):
+        monitor = LoopLagMonitor("slow", interval=0.01, slow_callback=0.05).start()
+        try:
+            await asyncio.sleep(0.02)
+            with caplog.at_level(logging.WARNING, logger="loop_monitor"):
+                time.sleep(0.3)
+                await asyncio.sleep(0.02)
+        finally:
+            monitor.stop()
+
+        assert monitor.stats.slow_callbacks == 1
+        assert "Loop slow blocked for over" in caplog.text
+        assert "test_logs_stack_of_slow_callback" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_ensure_loop_monitor_reuses_the_loop_monitor(self):
+        monitor = ensure_loop_monitor("first")
+        try:
+            assert ensure_loop_monitor("second") is monitor
+            assert monitor.name == "first"
+        finally:
+            monitor.stop()
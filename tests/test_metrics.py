@@ -0,0 +1,97 @@
+import urllib.request
+
+import pytest
+
+import metrics
+from metrics import MetricsRegistry, drain_sdk_metrics, sdk_runtime, serve_metrics
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestMetricsRegistry:
+    def test_counter_and_gauge(self, registry):
+        requests = registry.counter("requests_total", "Requests")
+        requests.inc(route="a")
+        requests.inc(2, route="a")
+        registry.gauge("queue_depth", "Queue depth").set(7)
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="a"} 3' in text
+        assert "queue_depth 7" in text
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+        latency.observe(0.05, rpc="describe")
+        latency.observe(0.5, rpc="describe")
+        latency.observe(5, rpc="describe")
+
+        lines = registry.render().splitlines()
+        assert 'latency_seconds_bucket{rpc="describe",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{rpc="describe",le="1"} 2' in lines
+        assert 'latency_seconds_bucket{rpc="describe",le="+Inf"} 3' in lines
+        assert 'latency_seconds_count{rpc="describe"} 3' in lines
+        assert 'latency_seconds_sum{rpc="describe"} 5.55' in lines
+
+    def test_time_observes_failures(self, registry):
+        latency = registry.histogram("latency_seconds", "Latency")
+        with pytest.raises(RuntimeError):
+            with latency.time(rpc="start_workflow"):
+                raise RuntimeError("unavailable")
+
+        assert latency.count(rpc="start_workflow") == 1
+
+    def test_label_values_are_escaped(self, registry):
+        registry.counter("errors_total", "Errors").inc(message='bad "input"\n')
+
+        assert 'errors_total{message="bad \\"input\\"\\n"} 1' in registry.render()
+
+    def test_collectors_run_before_render(self, registry):
+        registry.add_collector(lambda: registry.gauge("collected", "Collected").set(1))
+
+        assert "collected 1" in registry.render()
+
+    def test_name_reused_with_other_kind(self, registry):
+        registry.counter("things", "Things")
+        with pytest.raises(ValueError):
+            registry.gauge("things", "Things")
+
+
+class TestSdkMetrics:
+    def test_buffered_sdk_metrics_are_drained(self, registry, monkeypatch):
+        monkeypatch.setattr(metrics, "endpoints", ["test"])
+        meter = sdk_runtime().metric_meter
+        meter.create_counter("test_polls", "Polls").add(2, {"task_queue": "q"})
+        meter.create_histogram_float("test_latency", "Latency").record(
+            0.2, {"task_queue": "q"}
+        )
+
+        assert drain_sdk_metrics(registry) >= 2
+        text = registry.render()
+        assert 'test_polls_total{service_name="temporal-core-sdk",task_queue="q"} 2' in text
+        assert 'test_latency_count{service_name="temporal-core-sdk",task_queue="q"} 1' in text
+
+    def test_no_buffer_without_an_endpoint(self, monkeypatch):
+        monkeypatch.setattr(metrics, "endpoints", [])
+
+        assert sdk_runtime() is None
+
+
+class TestServeMetrics:
+    def test_serves_registry(self, monkeypatch):
+        monkeypatch.setattr(metrics, "endpoints", [])
+        metrics.registry.counter("served_total", "Served").inc()
+
+        server = serve_metrics(0, host="127.0.0.1")
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                text = response.read().decode()
+        finally:
+            server.shutdown()
+
+        assert "served_total 1" in text
+        assert metrics.endpoints == [f"127.0.0.1:{port}"]
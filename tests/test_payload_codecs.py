@@ -0,0 +1,150 @@
+import asyncio
+import dataclasses
+import importlib
+import os
+import zlib
+from unittest.mock import patch
+
+import pytest
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import DataConverter
+
+import payload_codecs
+from blob_store import BLOB_REF_ENCODING, BlobStore, BlobStoreCodec
+from payload_codecs import CompositeCodec, CompressionCodec
+
+TRANSCRIPT = {"items": [{"role": "user", "content": "Generate a random number."}] * 50}
+
+
+@pytest.fixture
+def converter():
+    return dataclasses.replace(
+        DataConverter.default, payload_codec=CompressionCodec("zlib", threshold=100)
+    )
+
+
+class TestCompressionCodec:
+    @pytest.mark.asyncio
+    async def test_round_trip(self, converter):
+        (inline,) = await DataConverter.default.encode([TRANSCRIPT])
+        (payload,) = await converter.encode([TRANSCRIPT])
+
+        assert payload.metadata["encoding"] == b"binary/zlib"
+        assert payload.ByteSize() < inline.ByteSize() / 5
+        assert Payload.FromString(zlib.decompress(payload.data)) == inline
+        assert await converter.decode([payload]) == [TRANSCRIPT]
+
+    @pytest.mark.asyncio
+    async def test_small_payloads_are_not_compressed(self, converter):
+        (payload,) = await converter.encode([{"number": 4}])
+
+        assert payload.metadata["encoding"] == b"json/plain"
+
+    @pytest.mark.asyncio
+    async def test_incompressible_payloads_are_kept(self):
+        codec = CompressionCodec("zlib", threshold=10)
+        payload = Payload(metadata={"encoding": b"binary/plain"}, data=bytes(range(256)))
+
+        assert await codec.encode([payload]) == [payload]
+
+    @pytest.mark.asyncio
+    async def test_decodes_uncompressed_payloads(self, converter):
+        # Written before compression was enabled.
+        payloads = await DataConverter.default.encode([TRANSCRIPT])
+
+        assert await converter.decode(payloads) == [TRANSCRIPT]
+
+    @pytest.mark.asyncio
+    async def test_large_calls_run_off_the_event_loop(self):
+        codec = CompressionCodec("zlib", threshold=100, thread_threshold=1000)
+        (small,) = await DataConverter.default.encode([{"number": 4}])
+        # Hex digits still take about half their size once compressed.
+        (large,) = await DataConverter.default.encode([{"key": os.urandom(2000).hex()}])
+
+        with patch(
+            "payload_codecs.asyncio.to_thread", wraps=asyncio.to_thread
+        ) as to_thread:
+            assert await codec.encode([small]) == [small]
+            to_thread.assert_not_called()
+            encoded = await codec.encode([large])
+            assert await codec.decode(encoded) == [large]
+
+        assert [call.args[0].__name__ for call in to_thread.call_args_list] == [
+            "_encode_all",
+            "_decode_all",
+        ]
+
+    def test_unknown_algorithm(self):
+        with pytest.raises(ValueError):
+            CompressionCodec("lz4")
+
+    @pytest.mark.skipif(payload_codecs.zstandard is None, reason="needs zstandard")
+    @pytest.mark.asyncio
+    async def test_zstd(self):
+        codec = CompressionCodec("zstd", threshold=100)
+        (payload,) = await DataConverter.default.encode([TRANSCRIPT])
+
+        (encoded,) = await codec.encode([payload])
+
+        assert encoded.metadata["encoding"] == b"binary/zstd"
+        assert await CompressionCodec("zlib").decode([encoded]) == [payload]
+
+
+class TestCompositeCodec:
+    @pytest.mark.asyncio
+    async def test_offloads_before_compressing(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+        codec = CompositeCodec(
+            [BlobStoreCodec(store, threshold=4000), CompressionCodec(threshold=100)]
+        )
+        converter = dataclasses.replace(DataConverter.default, payload_codec=codec)
+        large = {"items": TRANSCRIPT["items"] * 2}
+
+        offloaded, compressed = await converter.encode([large, TRANSCRIPT])
+
+        assert offloaded.metadata["encoding"] == BLOB_REF_ENCODING
+        assert compressed.metadata["encoding"] == b"binary/zlib"
+        assert await converter.decode([offloaded, compressed]) == [large, TRANSCRIPT]
+
+
+class TestPayloadCodecFromEnv:
+    @pytest.fixture
+    def configure(self, monkeypatch):
+        def configure(**env):
+            for name in (
+                "BLOB_STORE_PATH",
+                "PAYLOAD_COMPRESSION",
+                "PAYLOAD_COMPRESSION_LEVEL",
+            ):
+                monkeypatch.delenv(name, raising=False)
+            for name, value in env.items():
+                monkeypatch.setenv(name, value)
+            return importlib.reload(payload_codecs)
+
+        yield configure
+        monkeypatch.undo()
+        importlib.reload(payload_codecs)
+
+    def test_disabled(self, configure):
+        module = configure()
+
+        assert module.payload_codec() is None
+        assert module.codec_plugins() == []
+
+    def test_compression(self, configure):
+        module = configure(PAYLOAD_COMPRESSION="zlib", PAYLOAD_COMPRESSION_LEVEL="1")
+
+        codec = module.payload_codec()
+
+        assert isinstance(codec, module.CompressionCodec)
+        assert codec.level == 1
+
+    def test_blob_store_and_compression(self, configure, tmp_path):
+        module = configure(BLOB_STORE_PATH=str(tmp_path), PAYLOAD_COMPRESSION="zlib")
+
+        codec = module.payload_codec()
+
+        assert [type(c).__name__ for c in codec.codecs] == [
+            "BlobStoreCodec",
+            "CompressionCodec",
+        ]
@@ -0,0 +1,90 @@
+import importlib
+import sys
+from unittest.mock import call, patch
+
+from dataclasses import dataclass
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from workflows import get_registry
+from workflows.discovery import discover
+from workflows.registry import Registry, WorkflowInfo
+
+
+@dataclass
+class Input:
+    count: int
+
+
+class TestLazyRegistry:
+    def test_lazy_entry_is_imported_on_first_lookup(self):
+        registry = Registry()
+        registry.register_lazy(
+            "workflows.hello_world_workflow",
+            "workflows.hello_world_workflow:hello_world_workflow_info",
+        )
+        registry.freeze()
+
+        with patch(
+            "workflows.registry.importlib.import_module",
+            wraps=importlib.import_module,
+        ) as import_module:
+            first = registry.get_by_import_path("workflows.hello_world_workflow")
+            second = registry.get_by_import_path("workflows.hello_world_workflow")
+
+        assert isinstance(first, WorkflowInfo)
+        assert first is second
+        assert registry.get_if_loaded("workflows.hello_world_workflow") is first
+        # Importing the module may import others through the same function.
+        assert import_module.call_args_list.count(call("workflows.hello_world_workflow")) == 1
+
+    def test_unknown_path(self):
+        with pytest.raises(KeyError):
+            get_registry().get_by_import_path("workflows.missing")
+
+    def test_register_lazy_after_freeze(self):
+        registry = get_registry()
+        with pytest.raises(RuntimeError):
+            registry.register_lazy("workflows.other", "workflows.other:info")
+
+    def test_get_registry_imports_no_workflow_modules(self):
+        workflow_infos = discover().workflow_infos
+        with patch.dict(sys.modules):
+            for path in workflow_infos:
+                sys.modules.pop(path, None)
+            registry = get_registry()
+
+            assert registry.paths() == sorted(workflow_infos)
+            assert registry.get_if_loaded("workflows.hello_world_workflow") is None
+            assert not any(path in sys.modules for path in workflow_infos)
+
+
+class TestInputValidation:
+    def test_validates_payload_into_input(self):
+        registry = get_registry()
+        workflow_input = registry.validate_input(
+            "workflows.hello_world_workflow", {"prompt": "hi"}
+        )
+
+        workflow_info = registry.get_by_import_path("workflows.hello_world_workflow")
+        assert workflow_input == workflow_info.input(prompt="hi")
+
+    @pytest.mark.parametrize(
+        "payload", [{}, {"prompt": 5}, {"prompt": "hi", "unexpected": True}]
+    )
+    def test_rejects_bad_payload(self, payload):
+        with pytest.raises(ValidationError):
+            get_registry().validate_input("workflows.hello_world_workflow", payload)
+
+    def test_validator_is_built_once_per_registration(self):
+        registry = Registry()
+        with patch("workflows.registry.TypeAdapter", wraps=TypeAdapter) as adapter:
+            registry.register(
+                WorkflowInfo(input=Input, output=Input, workflow=Input), key="test"
+            )
+            for _ in range(3):
+                registry.validate_input("test", {"count": "3"})
+
+        adapter.assert_called_once_with(Input)
+        assert registry.validate_input("test", {"count": "3"}) == Input(count=3)
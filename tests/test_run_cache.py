@@ -0,0 +1,31 @@
+from run_cache import LRUCache
+
+
+class TestLRUCache:
+    def test_get_and_put(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert len(cache) == 2
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_zero_size_disables_cache(self):
+        cache = LRUCache(0)
+        cache.put("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+
+from run_events import RunEventHub, RunSnapshot
+
+
+def parse(chunks):
+    events = []
+    for chunk in chunks:
+        if chunk.startswith(":"):
+            continue
+        name, data = chunk.strip().split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+class TestRunEventHub:
+    @pytest.mark.asyncio
+    async def test_streams_status_and_agent_events(self):
+        snapshots = iter(
+            [
+                RunSnapshot(status={"status": "RUNNING"}, events=[{"event": "agent_started"}]),
+                RunSnapshot(status={"status": "RUNNING"}),
+                RunSnapshot(
+                    status={"status": "COMPLETED"},
+                    events=[{"event": "agent_ended"}],
+                    done=True,
+                ),
+            ]
+        )
+        offsets = []
+
+        async def fetch(offset):
+            offsets.append(offset)
+            return next(snapshots)
+
+        hub = RunEventHub(interval=0)
+        chunks = [chunk async for chunk in hub.stream(1, fetch)]
+
+        assert parse(chunks) == [
+            ("status", {"status": "RUNNING"}),
+            ("agent", {"event": "agent_started"}),
+            ("status", {"status": "COMPLETED"}),
+            ("agent", {"event": "agent_ended"}),
+            ("end", {}),
+        ]
+        assert offsets == [0, 1, 1]
+        assert len(hub) == 0
+
+    @pytest.mark.asyncio
+    async def test_subscribers_share_one_watcher(self):
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetch(offset):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return RunSnapshot(status={"status": "COMPLETED"}, done=True)
+
+        hub = RunEventHub(interval=0)
+
+        async def consume():
+            return [chunk async for chunk in hub.stream(1, fetch)]
+
+        consumers = [asyncio.create_task(consume()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert len(hub) == 1
+        release.set()
+        results = await asyncio.gather(*consumers)
+
+        assert calls == 1
+        assert all(parse(chunks)[-1] == ("end", {}) for chunks in results)
+
+    @pytest.mark.asyncio
+    async def test_last_unsubscribe_stops_watcher(self):
+        async def fetch(offset):
+            return RunSnapshot(status={"status": "RUNNING"})
+
+        hub = RunEventHub(interval=60)
+        stream = hub.stream(1, fetch)
+        first = await stream.__anext__()
+        assert parse([first]) == [("status", {"status": "RUNNING"})]
+        assert len(hub) == 1
+
+        await stream.aclose()
+        assert len(hub) == 0
+
+    @pytest.mark.asyncio
+    async def test_fetch_error_ends_stream(self):
+        async def fetch(offset):
+            raise RuntimeError("boom")
+
+        hub = RunEventHub(interval=0)
+        chunks = [chunk async for chunk in hub.stream(1, fetch)]
+
+        assert parse(chunks) == [
+            ("error", {"error": "RuntimeError: boom"}),
+            ("end", {}),
+        ]
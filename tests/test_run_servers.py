@@ -3,7 +3,7 @@ import asyncio
 import argparse
 from unittest.mock import Mock, patch, AsyncMock
 
-from run_servers import parse_args, web_server, interrupt_event
+from run_servers import parse_args, web_server, interrupt_event, WorkerThread
 
 
 class TestArgumentParsing:
@@ -22,6 +22,18 @@ class TestArgumentParsing:
             args = parse_args()
             assert args.host == "192.168.1.100:3000"
 
+    def test_parse_args_worker_processes(self):
+        with patch('sys.argv', ['run_servers.py', '--worker-processes=4']):
+            args = parse_args()
+            assert args.worker_processes == 4
+            assert args.worker_mode == "process"
+
+    def test_parse_args_worker_mode(self):
+        with patch('sys.argv', ['run_servers.py']):
+            assert parse_args().worker_mode == "loop"
+        with patch('sys.argv', ['run_servers.py', '--worker-mode=thread']):
+            assert parse_args().worker_mode == "thread"
+
     def test_parse_args_help_message(self):
         parser = argparse.ArgumentParser(
             description="Run web server and temporal worker",
@@ -74,6 +86,24 @@ class TestWebServer:
                 assert kwargs['port'] == 9000
 
 
+class TestWorkerThread:
+    def test_runs_worker_on_its_own_loop_until_stopped(self):
+        loops = []
+
+        async def fake_worker(settings=None, stop_event=None):
+            loops.append(asyncio.get_running_loop())
+            await stop_event.wait()
+
+        with patch('run_servers.temporal_worker', fake_worker):
+            worker_thread = WorkerThread()
+            worker_thread.start()
+            worker_thread.stop()
+            worker_thread.join(timeout=5)
+
+        assert not worker_thread.is_alive()
+        assert len(loops) == 1
+
+
 class TestMainExecution:
     def test_main_execution_flow(self):
         # Test that the main components can be imported and configured properly
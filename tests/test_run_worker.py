@@ -48,39 +48,34 @@ class TestTemporalWorkerUnit:
 
 class TestImports:
     def test_workflow_imports(self):
-        # Test that all workflow imports are available
+        # The worker registers the workflows discovery finds
+        from workflows.discovery import discover, load_workflows
         from workflows.hello_world_workflow import HelloWorldAgent
         from workflows.agent_lifecycle_workflow import AgentLifecycleWorkflow
-        from workflows.dynamic_system_prompt_workflow import DynamicSystemPromptWorkflow
+        from workflows.conversation_workflow import ConversationWorkflow
+        from workflows.fan_out_workflow import FanOutChunkWorkflow, FanOutWorkflow
         from workflows.lifecycle_workflow import LifecycleWorkflow
-        from workflows.local_image_workflow import LocalImageWorkflow
-        from workflows.non_strict_output_workflow import NonStrictOutputWorkflow
-        from workflows.previous_response_id_workflow import PreviousResponseIdWorkflow
-        from workflows.remote_image_workflow import RemoteImageWorkflow
-        from workflows.tools_workflow import ToolsWorkflow
-        
-        workflows = [
-            HelloWorldAgent, AgentLifecycleWorkflow, DynamicSystemPromptWorkflow,
-            LifecycleWorkflow, LocalImageWorkflow, NonStrictOutputWorkflow,
-            PreviousResponseIdWorkflow, RemoteImageWorkflow, ToolsWorkflow
-        ]
-        
-        for workflow in workflows:
-            assert workflow is not None
-            assert hasattr(workflow, '__name__')
+        from workflows.streaming_workflow import StreamingHelloWorldAgent
+
+        workflows = load_workflows(discover())
+
+        assert set(workflows) == {
+            HelloWorldAgent, AgentLifecycleWorkflow, LifecycleWorkflow,
+            StreamingHelloWorldAgent, FanOutWorkflow, FanOutChunkWorkflow,
+            ConversationWorkflow
+        }
 
     def test_activity_imports(self):
-        # Test that all activity imports are available
-        from activities.get_weather_activity import get_weather
-        from activities.image_activities import read_image_as_base64
-        from activities.math_activities import multiply_by_two, random_number
-        
-        activities = [get_weather, read_image_as_base64, multiply_by_two, random_number]
-        
+        # Activity methods are bound to an instance of their class
+        from workflows.discovery import discover, load_activities
+        from workflows.streaming_workflow import StreamingAgentActivities
+
+        activities = load_activities(discover())
+
+        assert len(activities) == 1
         for activity in activities:
-            assert activity is not None
             assert callable(activity)
-            assert hasattr(activity, '__name__')
+            assert isinstance(activity.__self__, StreamingAgentActivities)
 
     def test_temporal_imports(self):
         # Test Temporal-related imports
@@ -157,4 +152,144 @@ class TestWorkerConfiguration:
         
         # This should match the TEMPORAL_TARGET in web.py
         from web import TEMPORAL_TARGET
-        assert TEMPORAL_TARGET == temporal_target
\ No newline at end of file
+        assert TEMPORAL_TARGET == temporal_target
+
+class TestWorkerSettings:
+    def test_from_env_defaults(self, monkeypatch):
+        from run_worker import WorkerSettings
+
+        for name in ("TEMPORAL_TARGET", "TEMPORAL_TASK_QUEUE", "WORKER_POLLER_AUTOSCALING"):
+            monkeypatch.delenv(name, raising=False)
+        settings = WorkerSettings.from_env()
+
+        assert settings.target == "localhost:7233"
+        assert settings.task_queue == "openai-agents-basic-task-queue-v2"
+        assert settings.max_concurrent_activities is None
+        assert not settings.poller_autoscaling
+
+    def test_from_env_overrides(self, monkeypatch):
+        from run_worker import WorkerSettings
+
+        monkeypatch.setenv("TEMPORAL_TARGET", "temporal:7233")
+        monkeypatch.setenv("TEMPORAL_TASK_QUEUE", "agents")
+        monkeypatch.setenv("WORKER_MAX_CONCURRENT_ACTIVITIES", "200")
+        monkeypatch.setenv("WORKER_POLLER_AUTOSCALING", "true")
+        settings = WorkerSettings.from_env()
+
+        assert settings.target == "temporal:7233"
+        assert settings.task_queue == "agents"
+        assert settings.max_concurrent_activities == 200
+        assert settings.poller_autoscaling
+
+    def test_from_env_keeps_zero(self, monkeypatch):
+        from run_worker import WorkerSettings
+
+        monkeypatch.setenv("WORKER_POLLER_MIN", "0")
+        monkeypatch.delenv("WORKER_POLLER_MAX", raising=False)
+        settings = WorkerSettings.from_env()
+
+        assert settings.poller_min == 0
+        assert settings.poller_max == 100
+
+    def test_parse_args(self):
+        from run_worker import parse_args
+
+        settings = parse_args(
+            [
+                "--task-queue=agents",
+                "--max-concurrent-workflow-tasks=50",
+                "--workflow-pollers=8",
+                "--sticky-schedule-to-start-timeout=2.5",
+                "--activity-executor-size=4",
+                "--processes=0",
+            ]
+        )
+
+        assert settings.task_queue == "agents"
+        assert settings.max_concurrent_workflow_tasks == 50
+        assert settings.workflow_task_pollers == 8
+        assert settings.sticky_queue_schedule_to_start_timeout == 2.5
+        assert settings.activity_executor_size == 4
+        assert settings.processes == 0
+
+    def test_worker_supervisor(self):
+        from run_worker import WorkerSettings, run_worker_process, worker_supervisor
+
+        supervisor = worker_supervisor(
+            WorkerSettings(processes=3, graceful_shutdown_timeout=5)
+        )
+
+        assert supervisor._target is run_worker_process
+        assert len(supervisor._slots) == 3
+        assert supervisor._drain_timeout == 15
+        assert supervisor._pass_index
+
+    def test_worker_options_simple_pollers(self):
+        from datetime import timedelta
+        from temporalio.worker import PollerBehaviorSimpleMaximum
+        from run_worker import WorkerSettings
+
+        settings = WorkerSettings(workflow_task_pollers=8, activity_executor_size=4)
+        executor = settings.activity_executor()
+        options = settings.worker_options(executor)
+        executor.shutdown()
+
+        assert options["workflow_task_poller_behavior"] == PollerBehaviorSimpleMaximum(
+            maximum=8
+        )
+        assert "activity_task_poller_behavior" not in options
+        assert options["activity_executor"] is executor
+        assert executor._max_workers == 4
+        assert options["sticky_queue_schedule_to_start_timeout"] == timedelta(seconds=10)
+
+    @pytest.mark.asyncio
+    async def test_temporal_worker_shuts_down_activity_executor(self):
+        from unittest.mock import AsyncMock, Mock, patch
+        from run_worker import WorkerSettings, temporal_worker
+
+        worker = Mock()
+        worker.run = AsyncMock(side_effect=RuntimeError("stopped"))
+        with patch("run_worker.Client.connect", AsyncMock()), patch(
+            "run_worker.Worker", return_value=worker
+        ) as worker_class:
+            with pytest.raises(RuntimeError):
+                await temporal_worker(WorkerSettings(activity_executor_size=2))
+
+        executor = worker_class.call_args.kwargs["activity_executor"]
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+
+    @pytest.mark.asyncio
+    async def test_temporal_worker_serves_metrics_per_process(self, monkeypatch):
+        from unittest.mock import AsyncMock, Mock, patch
+        import metrics
+        from run_worker import WorkerSettings, temporal_worker
+
+        monkeypatch.setattr(metrics, "endpoints", [])
+        worker = Mock()
+        worker.run = AsyncMock()
+        with patch("run_worker.Client.connect", AsyncMock()) as connect, patch(
+            "run_worker.Worker", return_value=worker
+        ), patch("run_worker.serve_metrics") as serve_metrics:
+            await temporal_worker(WorkerSettings(), process_index=2)
+            serve_metrics.assert_not_called()
+            # Nothing serves the registry, so SDK metrics are not buffered.
+            assert connect.await_args.kwargs["runtime"] is None
+
+            await temporal_worker(WorkerSettings(metrics_port=9000), process_index=2)
+            serve_metrics.assert_called_once_with(9002)
+
+    def test_worker_options_autoscaling(self):
+        from temporalio.worker import PollerBehaviorAutoscaling
+        from run_worker import WorkerSettings
+
+        options = WorkerSettings(
+            poller_autoscaling=True, poller_min=2, poller_max=20, activity_task_pollers=50
+        ).worker_options()
+
+        assert options["workflow_task_poller_behavior"] == PollerBehaviorAutoscaling(
+            minimum=2, maximum=20, initial=5
+        )
+        assert options["activity_task_poller_behavior"] == PollerBehaviorAutoscaling(
+            minimum=2, maximum=20, initial=20
+        )
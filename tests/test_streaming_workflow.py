@@ -0,0 +1,126 @@
+import uuid
+from typing import Type
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from temporalio.client import Client
+from temporalio.contrib.openai_agents import OpenAIAgentsPlugin, TestModelProvider
+from temporalio.testing import ActivityEnvironment
+from temporalio.worker import UnsandboxedWorkflowRunner, Worker
+
+from tests.openai_helper import StreamingFakeModel
+from workflows import get_registry
+from workflows.streaming_workflow import (
+    OutputChunk,
+    StreamAgentInput,
+    StreamingAgentActivities,
+    StreamingHelloWorldAgent,
+)
+from workflows.usage import RunUsage
+
+registry = get_registry()
+workflow_info = registry.get_by_import_path("workflows.streaming_workflow")
+
+
+class FakeStreamingModel(StreamingFakeModel):
+    def __init__(self) -> None:
+        super().__init__(["llm ", "expected ", "output"])
+
+
+def new_openai_temporal_client(
+    temporal_client: Client, test_model_class: Type[StreamingFakeModel]
+) -> Client:
+    new_config = temporal_client.config()
+    new_config["plugins"] = [
+        OpenAIAgentsPlugin(model_provider=TestModelProvider(test_model_class()))
+    ]
+    return Client(**new_config)
+
+
+class TestWithLocalWorkflow:
+    @pytest.mark.asyncio
+    async def test_workflow_execution(self, temporal_client):
+        client = new_openai_temporal_client(temporal_client, FakeStreamingModel)
+        task_queue = str(uuid.uuid4())
+        activities = StreamingAgentActivities(
+            model_provider=TestModelProvider(FakeStreamingModel()),
+            flush_interval=0,
+        )
+
+        async with Worker(
+            client,
+            task_queue=task_queue,
+            workflows=[workflow_info.workflow],
+            activities=[activities.stream_agent_response],
+            workflow_runner=UnsandboxedWorkflowRunner(),
+            debug_mode=True,
+        ):
+            handle = await temporal_client.start_workflow(
+                workflow_info.workflow,
+                workflow_info.input(prompt="Test"),
+                id=f"streaming-{uuid.uuid4()}",
+                task_queue=task_queue,
+            )
+            result = await handle.result()
+            progress = await handle.query(StreamingHelloWorldAgent.get_output)
+
+        assert result == workflow_info.output(response="llm expected output")
+        assert "".join(progress.chunks) == "llm expected output"
+        assert progress.done
+
+
+class TestStreamingAgentActivities:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("flush_interval, signals", [(0, 3), (60, 1)])
+    async def test_stream_agent_response(self, flush_interval, signals):
+        handle = Mock()
+        handle.signal = AsyncMock()
+        client = Mock()
+        client.get_workflow_handle = Mock(return_value=handle)
+        activities = StreamingAgentActivities(
+            model_provider=TestModelProvider(FakeStreamingModel()),
+            flush_interval=flush_interval,
+        )
+
+        result = await ActivityEnvironment(client=client).run(
+            activities.stream_agent_response,
+            StreamAgentInput(workflow_id="wf", prompt="Test", instructions="Be brief."),
+        )
+
+        assert result.response == "llm expected output"
+        assert result.usage.agent_seconds > 0
+        client.get_workflow_handle.assert_called_once_with("wf")
+        assert handle.signal.await_count == signals
+        chunks = [call.args[1] for call in handle.signal.await_args_list]
+        assert "".join(chunk.text for chunk in chunks) == "llm expected output"
+
+
+class TestStreamingHelloWorldAgent:
+    def test_append_output_resets_for_a_retried_attempt(self):
+        workflow = StreamingHelloWorldAgent()
+        workflow.append_output(OutputChunk(attempt=1, text="a"))
+        workflow.append_output(OutputChunk(attempt=2, text="x"))
+        # Late chunks of the failed attempt are dropped.
+        workflow.append_output(OutputChunk(attempt=1, text="b"))
+        workflow.append_output(OutputChunk(attempt=2, text="y"))
+
+        assert workflow.get_output(0).chunks == ["a", None, "x", "y"]
+        assert workflow.get_output(2).chunks == ["x", "y"]
+        assert not workflow.get_output().done
+
+    @pytest.mark.asyncio
+    async def test_run_sends_the_final_response_when_the_stream_was_cut_short(self):
+        workflow = StreamingHelloWorldAgent()
+        workflow.append_output(OutputChunk(attempt=1, text="partial"))
+        output = Mock(response="the whole answer", usage=RunUsage())
+
+        with patch(
+            "workflows.streaming_workflow.workflow.execute_activity_method",
+            AsyncMock(return_value=output),
+        ), patch("workflows.streaming_workflow.workflow.info"):
+            result = await workflow.run(workflow_info.input(prompt="Test"))
+
+        assert result.response == "the whole answer"
+        progress = workflow.get_output()
+        assert progress.chunks == ["partial", None, "the whole answer"]
+        assert progress.done
@@ -0,0 +1,87 @@
+import asyncio
+import signal
+import sys
+import time
+
+import pytest
+
+from supervisor import WorkerSupervisor
+
+
+def serve_until_terminated():
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    while True:
+        time.sleep(0.05)
+
+
+def exit_with_index_when_terminated(index):
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(index))
+    while True:
+        time.sleep(0.05)
+
+
+def ignore_terminate():
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    while True:
+        time.sleep(0.05)
+
+
+def crash():
+    sys.exit(3)
+
+
+async def run_for(supervisor, seconds):
+    stop_event = asyncio.Event()
+    task = asyncio.create_task(supervisor.run(stop_event))
+    await asyncio.sleep(seconds)
+    processes = supervisor.processes
+    stop_event.set()
+    await task
+    return processes
+
+
+class TestWorkerSupervisor:
+    @pytest.mark.asyncio
+    async def test_starts_and_drains_processes(self):
+        supervisor = WorkerSupervisor(
+            serve_until_terminated, processes=2, poll_interval=0.05
+        )
+
+        processes = await run_for(supervisor, 1)
+
+        assert len(processes) == 2
+        assert all(p.exitcode == 0 for p in processes)
+        assert supervisor.restarts == 0
+
+    @pytest.mark.asyncio
+    async def test_passes_slot_index(self):
+        supervisor = WorkerSupervisor(
+            exit_with_index_when_terminated,
+            processes=2,
+            poll_interval=0.05,
+            pass_index=True,
+        )
+
+        processes = await run_for(supervisor, 1)
+
+        assert [p.exitcode for p in processes] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_restarts_crashed_processes(self):
+        supervisor = WorkerSupervisor(
+            crash, processes=1, restart_backoff=0, poll_interval=0.05
+        )
+
+        await run_for(supervisor, 2)
+
+        assert supervisor.restarts >= 1
+
+    @pytest.mark.asyncio
+    async def test_kills_processes_that_do_not_drain(self):
+        supervisor = WorkerSupervisor(
+            ignore_terminate, processes=1, drain_timeout=0.5, poll_interval=0.05
+        )
+
+        processes = await run_for(supervisor, 1)
+
+        assert processes[0].exitcode == -signal.SIGKILL
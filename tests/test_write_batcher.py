@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from django.db import IntegrityError
+
+from web import WorkflowRun
+from write_batcher import WriteBatcher
+
+
+class TestWriteBatcher:
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_concurrent_inserts_share_batches(self):
+        batcher = WriteBatcher(WorkflowRun, max_batch_size=4)
+
+        rows = await asyncio.gather(
+            *(
+                batcher.create(
+                    workflow_path="workflows.hello_world_workflow",
+                    handle_id=f"batcher-{i}",
+                )
+                for i in range(10)
+            )
+        )
+
+        assert [row.handle_id for row in rows] == [f"batcher-{i}" for i in range(10)]
+        assert all(row.pk is not None for row in rows)
+        stored = {
+            handle_id
+            async for handle_id in WorkflowRun.objects.filter(
+                handle_id__startswith="batcher-"
+            ).values_list("handle_id", flat=True)
+        }
+        assert stored == {f"batcher-{i}" for i in range(10)}
+        # All ten are queued before the writer runs: batches of 4, 4 and 2.
+        assert batcher.stats.batches == 3
+        assert batcher.stats.inserts == 10
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db
+    async def test_failed_row_only_fails_its_caller(self):
+        await WorkflowRun.objects.acreate(
+            workflow_path="workflows.hello_world_workflow",
+            handle_id="batcher-duplicate",
+        )
+        batcher = WriteBatcher(WorkflowRun)
+
+        results = await asyncio.gather(
+            *(
+                batcher.create(
+                    workflow_path="workflows.hello_world_workflow",
+                    handle_id=handle_id,
+                )
+                for handle_id in ("batcher-ok-1", "batcher-duplicate", "batcher-ok-2")
+            ),
+            return_exceptions=True,
+        )
+
+        assert results[0].handle_id == "batcher-ok-1"
+        assert isinstance(results[1], IntegrityError)
+        assert results[2].handle_id == "batcher-ok-2"
+        assert batcher.stats.split_batches == 1
+        assert (
+            await WorkflowRun.objects.filter(
+                handle_id__in=["batcher-ok-1", "batcher-ok-2"]
+            ).acount()
+            == 2
+        )
@@ -1,17 +1,44 @@
-from datetime import datetime
+import asyncio
+import base64
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import json
 import logging
 import os
 import sys
-from typing import List, Optional
+import time
+from typing import Any, List, Optional
+from uuid import uuid4
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
-from django.http import HttpResponse
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
 from nanodjango import Django
-from temporalio.client import Client, WorkflowExecutionStatus
-from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
+from pydantic import ValidationError
+from temporalio.client import (
+    Client,
+    WorkflowExecutionStatus,
+    WorkflowHandle,
+    WorkflowQueryFailedError,
+    WorkflowUpdateFailedError,
+)
+from temporalio.service import RPCError
 
-from workflows.hello_world_workflow import hello_world_workflow_info
+from blob_store import BlobStore, blob_reference, keep_blob_references
+from client_pool import TemporalClientPool
+from db_profile import sqlite_profile
+from loop_monitor import ensure_loop_monitor
+from metrics import add_endpoint, registry as metrics_registry, sdk_runtime
+from payload_codecs import codec_plugins, get_blob_store
+from run_cache import LRUCache
+from run_events import RunEvent, RunEventHub, RunSnapshot
 from workflows import get_registry
+from workflows.registry import WorkflowInfo
+from write_batcher import WriteBatcher
 
 # Set up logging for async diagnostics
 logging.basicConfig(
@@ -19,23 +46,200 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     stream=sys.stdout,
 )
+logger = logging.getLogger(__name__)
 
 
 # --- Temporal client  ---------------------------------
 TEMPORAL_TARGET = os.getenv("TEMPORAL_TARGET", "localhost:7233")
 TASK_QUEUE = os.getenv("TEMPORAL_TASK_QUEUE", "openai-agents-basic-task-queue-v2")
 POLL_INTERVAL_SECONDS = int(os.getenv("POLL_INTERVAL_SECONDS", "30"))
+EVENTS_POLL_INTERVAL_SECONDS = float(os.getenv("EVENTS_POLL_INTERVAL_SECONDS", "1"))
+OUTPUT_POLL_INTERVAL_SECONDS = float(os.getenv("OUTPUT_POLL_INTERVAL_SECONDS", "0.2"))
+BATCH_START_CONCURRENCY = int(os.getenv("BATCH_START_CONCURRENCY", "20"))
+DESCRIBE_CACHE_SIZE = int(os.getenv("DESCRIBE_CACHE_SIZE", "1024"))
+DESCRIBE_CONCURRENCY = int(os.getenv("DESCRIBE_CONCURRENCY", "20"))
+WORKFLOW_RUNS_PAGE_SIZE = int(os.getenv("WORKFLOW_RUNS_PAGE_SIZE", "100"))
+WORKFLOW_RUNS_MAX_PAGE_SIZE = int(os.getenv("WORKFLOW_RUNS_MAX_PAGE_SIZE", "1000"))
+# Most items in one batch start or batch describe; each costs a Temporal RPC.
+WORKFLOW_RUNS_MAX_BATCH_SIZE = int(os.getenv("WORKFLOW_RUNS_MAX_BATCH_SIZE", "100"))
+USAGE_QUERY_TIMEOUT_SECONDS = float(os.getenv("USAGE_QUERY_TIMEOUT_SECONDS", "5"))
+USAGE_RETRY_INTERVAL_SECONDS = float(os.getenv("USAGE_RETRY_INTERVAL_SECONDS", "60"))
+# Group the WorkflowRun inserts of concurrent POSTs into shared transactions.
+WORKFLOW_RUN_BATCH_WRITES = os.getenv("WORKFLOW_RUN_BATCH_WRITES", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+WORKFLOW_RUN_WRITE_BATCH_SIZE = int(os.getenv("WORKFLOW_RUN_WRITE_BATCH_SIZE", "100"))
+# Optional prices, in any currency, for the cost column of usage reports.
+INPUT_TOKEN_COST_PER_MILLION = os.getenv("INPUT_TOKEN_COST_PER_MILLION")
+OUTPUT_TOKEN_COST_PER_MILLION = os.getenv("OUTPUT_TOKEN_COST_PER_MILLION")
+TEMPORAL_CONNECT_BACKOFF_SECONDS = float(
+    os.getenv("TEMPORAL_CONNECT_BACKOFF_SECONDS", "0.5")
+)
+TEMPORAL_CONNECT_MAX_BACKOFF_SECONDS = float(
+    os.getenv("TEMPORAL_CONNECT_MAX_BACKOFF_SECONDS", "30")
+)
+
+
+async def connect_temporal_client() -> Client:
+    # Imported here since it pulls in the agents SDK, which the web process
+    # does not need until it talks to Temporal.
+    from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
+
+    return await Client.connect(
+        TEMPORAL_TARGET,
+        plugins=[OpenAIAgentsPlugin(), *codec_plugins()],
+        runtime=sdk_runtime(),
+    )
+
+
+temporal_clients = TemporalClientPool(
+    connect_temporal_client,
+    backoff_seconds=TEMPORAL_CONNECT_BACKOFF_SECONDS,
+    max_backoff_seconds=TEMPORAL_CONNECT_MAX_BACKOFF_SECONDS,
+)
 
 
 async def get_temporal_client() -> Client:
-    return await Client.connect(TEMPORAL_TARGET, plugins=[OpenAIAgentsPlugin()])
+    return await temporal_clients.get()
 
 
 # --- Django app setup -----------------------------------------------------------
 
+def loop_monitor_middleware(get_response):
+    """
+    Start the event loop monitor on the loop serving requests. It is the
+    innermost middleware so that it runs on that loop whenever the view is
+    async, even when an outer middleware is sync only.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            ensure_loop_monitor("web")
+            return await get_response(request)
+
+        return markcoroutinefunction(middleware)
+    return get_response
+
+
+loop_monitor_middleware.sync_capable = True
+loop_monitor_middleware.async_capable = True
+
+
+# --- Metrics ----------------------------------------------------------------------
+
+request_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Time until the response headers are ready, by route",
+)
+temporal_rpc_seconds = metrics_registry.histogram(
+    "temporal_client_rpc_duration_seconds",
+    "Duration of Temporal client calls made by the web app",
+)
+
+
+@contextmanager
+def temporal_rpc(rpc: str):
+    """
+    Time a Temporal client call. A call that failed on a broken connection
+    drops the pooled client, so the next request reconnects.
+    """
+    with temporal_rpc_seconds.time(rpc=rpc):
+        try:
+            yield
+        except RPCError as e:
+            temporal_clients.report_error(e)
+            raise
+
+
+runs_started = metrics_registry.counter(
+    "workflow_runs_started_total", "Workflow runs started, by workflow path"
+)
+# Only runs someone described after they finished; the worker's
+# temporal_workflow_completed_total counts every completion.
+runs_seen_finished = metrics_registry.counter(
+    "workflow_runs_seen_finished_total",
+    "Workflow runs first described in a terminal status, by workflow path and status",
+)
+
+
+def _observe_request(request, response, started: float) -> None:
+    match = request.resolver_match
+    request_seconds.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=match.route if match is not None else "unmatched",
+        status=response.status_code,
+    )
+
+
+def metrics_middleware(get_response):
+    """Record the latency of every request against its route pattern."""
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            started = time.perf_counter()
+            response = await get_response(request)
+            _observe_request(request, response, started)
+            return response
+
+        return markcoroutinefunction(middleware)
+
+    def middleware(request):
+        started = time.perf_counter()
+        response = get_response(request)
+        _observe_request(request, response, started)
+        return response
+
+    return middleware
+
+
+metrics_middleware.sync_capable = True
+metrics_middleware.async_capable = True
+
+
+def _collect_web_stats() -> None:
+    pool = temporal_clients.stats
+    metrics_registry.counter(
+        "temporal_client_pool_connects_total", "Temporal client connects"
+    ).set(pool.connects)
+    metrics_registry.counter(
+        "temporal_client_pool_connect_failures_total", "Failed Temporal client connects"
+    ).set(pool.connect_failures)
+    metrics_registry.counter(
+        "temporal_client_pool_reuses_total", "Requests served by a pooled client"
+    ).set(pool.reuses)
+    metrics_registry.counter(
+        "temporal_client_pool_invalidations_total",
+        "Pooled clients dropped after a call failed on a broken connection",
+    ).set(pool.invalidations)
+    metrics_registry.counter(
+        "describe_cache_hits_total", "Describe cache hits"
+    ).set(describe_cache.hits)
+    metrics_registry.counter(
+        "describe_cache_misses_total", "Describe cache misses"
+    ).set(describe_cache.misses)
+    metrics_registry.gauge(
+        "describe_cache_entries", "Runs in the describe cache"
+    ).set(len(describe_cache))
+    metrics_registry.counter(
+        "workflow_run_batched_inserts_total", "WorkflowRun rows written by the write batcher"
+    ).set(workflow_run_writer.stats.inserts)
+    metrics_registry.counter(
+        "workflow_run_insert_batches_total", "Transactions of the write batcher"
+    ).set(workflow_run_writer.stats.batches)
+
+
+metrics_registry.add_collector(_collect_web_stats)
+
+
 app = Django(
     ADMIN_URL="wall-garden/",
+    MIDDLEWARE=lambda middleware: middleware
+    + ["web.metrics_middleware", "web.loop_monitor_middleware"],
     ALLOWED_HOSTS=["*"],
+    DATABASES=sqlite_profile,
     DEBUG=True,
     NINJA_DEFAULT_THROTTLE_RATES={"anon": "5/minute"},
 )
@@ -44,6 +248,17 @@ app = Django(
 registry = get_registry()
 
 
+async def get_workflow_info(workflow_path: str) -> WorkflowInfo:
+    workflow_info = registry.get_if_loaded(workflow_path)
+    if workflow_info is None:
+        # The first lookup imports the workflow module, which takes long
+        # enough to stall every other request if done on the event loop.
+        workflow_info = await asyncio.to_thread(
+            registry.get_by_import_path, workflow_path
+        )
+    return workflow_info
+
+
 @app.admin(
     list_display=("workflow_path", "handle_id", "created_at"),
     list_filter=("workflow_path", "handle_id"),
@@ -52,9 +267,37 @@ class WorkflowRun(models.Model):
     workflow_path = models.CharField(max_length=255, db_index=True)
     handle_id = models.CharField(max_length=255, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Filled in once the run reaches a terminal state, after which Temporal
+    # is no longer asked about it.
+    status = models.CharField(max_length=32, blank=True, default="")
+    # The last run; runs that continued as new are a chain that started
+    # with first_run_id at started_at.
+    run_id = models.CharField(max_length=255, blank=True, default="")
+    first_run_id = models.CharField(max_length=255, blank=True, default="")
+    started_at = models.DateTimeField(null=True, blank=True)
+    result_payload = models.JSONField(null=True, blank=True)
+    # {"sha256", "size"} of a result kept in the blob store instead.
+    result_blob = models.JSONField(null=True, blank=True)
+    # Model usage summed over the run, from its get_usage query; null for
+    # runs that are not finished or do not report usage.
+    requests = models.IntegerField(null=True, blank=True)
+    input_tokens = models.IntegerField(null=True, blank=True)
+    output_tokens = models.IntegerField(null=True, blank=True)
+    total_tokens = models.IntegerField(null=True, blank=True)
+    agent_seconds = models.FloatField(null=True, blank=True)
+    # Set when the run finished but its usage could not be queried yet, e.g.
+    # while no worker was polling; the first describe after it asks again.
+    usage_retry_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = [("workflow_path", "handle_id")]
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["workflow_path", "created_at", "id"]),
+        ]
+
+
+workflow_run_writer = WriteBatcher(WorkflowRun, WORKFLOW_RUN_WRITE_BATCH_SIZE)
 
 
 class WorkflowRunInput(app.ninja.Schema):
@@ -69,13 +312,77 @@ class WorkflowRunOutput(app.ninja.Schema):
     created_at: datetime
 
 
+class WorkflowRunBatchInput(app.ninja.Schema):
+    items: List[WorkflowRunInput] = app.ninja.Field(
+        ..., max_length=WORKFLOW_RUNS_MAX_BATCH_SIZE
+    )
+    concurrency: Optional[int] = app.ninja.Field(None, ge=1)
+
+
+class WorkflowRunBatchItemOutput(app.ninja.Schema):
+    index: int
+    workflow_run: Optional[WorkflowRunOutput] = None
+    error: Optional[str] = None
+
+
+class WorkflowRunUsage(app.ninja.Schema):
+    requests: int
+    input_tokens: int
+    output_tokens: int
+    total_tokens: int
+    agent_seconds: float
+
+
+class WorkflowRunResultBlob(app.ninja.Schema):
+    sha256: str
+    size: int
+
+
 class WorkflowRunDescribeOutput(app.ninja.Schema):
     workflow_path: str
     handle_id: str
+    # The current or last run, and the first run of the chain when the
+    # workflow continued as new; created_at is when the chain started.
     run_id: str
+    first_run_id: str
     status: str
     result_payload: Optional[dict]
     created_at: datetime
+    usage: Optional[WorkflowRunUsage] = None
+    # Set instead of result_payload for results offloaded to the blob
+    # store; they are served by GET /workflow_runs/{id}/result.
+    result_blob: Optional[WorkflowRunResultBlob] = None
+
+
+class WorkflowRunUsageBucketOutput(app.ninja.Schema):
+    workflow_path: str
+    bucket: datetime
+    runs: int
+    requests: int
+    input_tokens: int
+    output_tokens: int
+    total_tokens: int
+    agent_seconds: float
+    cost: Optional[float] = None
+
+
+class WorkflowRunDescribeBatchInput(app.ninja.Schema):
+    ids: List[int] = app.ninja.Field(..., max_length=WORKFLOW_RUNS_MAX_BATCH_SIZE)
+    concurrency: Optional[int] = app.ninja.Field(None, ge=1)
+
+
+class WorkflowRunDescribeBatchItemOutput(app.ninja.Schema):
+    id: int
+    workflow_run: Optional[WorkflowRunDescribeOutput] = None
+    error: Optional[str] = None
+
+
+class WorkflowRunMessageInput(app.ninja.Schema):
+    message: str
+
+
+class WorkflowRunMessageOutput(app.ninja.Schema):
+    reply: str
 
 
 @app.route("/")
@@ -83,50 +390,731 @@ async def index(request):
     return app.render(request, "index.html", {"title": "Home"})
 
 
+@app.route("/metrics")
+async def metrics(request):
+    return HttpResponse(
+        metrics_registry.render(), content_type="text/plain; version=0.0.4"
+    )
+
+
+add_endpoint("web /metrics")
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
+
+
+async def stream_workflow_runs(queryset):
+    yield "["
+    first = True
+    async for row in queryset.aiterator(chunk_size=WORKFLOW_RUNS_PAGE_SIZE):
+        item = json.dumps(
+            WorkflowRunOutput(**row).dict(), cls=DjangoJSONEncoder
+        )
+        yield item if first else f",{item}"
+        first = False
+    yield "]"
+
+
 @app.api.get(
     "/workflow_runs", response=List[WorkflowRunOutput], url_name="workflow_runs"
 )
-def get_workflow_runs(request):
-    return WorkflowRun.objects.all()
+async def get_workflow_runs(
+    request,
+    cursor: Optional[str] = None,
+    limit: int = app.ninja.Query(
+        WORKFLOW_RUNS_PAGE_SIZE, ge=1, le=WORKFLOW_RUNS_MAX_PAGE_SIZE
+    ),
+    workflow_path: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    """
+    Page through workflow runs ordered by `(created_at, id)`.
+
+    The page is streamed as a JSON list; when more rows follow, the opaque
+    cursor for the next page is returned in the `X-Next-Cursor` header.
+    """
+    queryset = WorkflowRun.objects.order_by("created_at", "id")
+    if workflow_path is not None:
+        queryset = queryset.filter(workflow_path=workflow_path)
+    if created_after is not None:
+        queryset = queryset.filter(created_at__gte=created_after)
+    if created_before is not None:
+        queryset = queryset.filter(created_at__lt=created_before)
+    if cursor is not None:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            return HttpResponse("Invalid cursor", status=400)
+        queryset = queryset.filter(
+            Q(created_at__gt=cursor_created_at)
+            | Q(created_at=cursor_created_at, id__gt=cursor_id)
+        )
+
+    # The last key of this page doubles as the next cursor, but only if at
+    # least one row follows it.
+    boundary = [
+        key
+        async for key in queryset.values_list("created_at", "id")[limit - 1 : limit + 1]
+    ]
+    response = StreamingHttpResponse(
+        stream_workflow_runs(
+            queryset.values("id", "workflow_path", "handle_id", "created_at")[:limit]
+        ),
+        content_type="application/json",
+    )
+    if len(boundary) == 2:
+        response["X-Next-Cursor"] = encode_cursor(*boundary[0])
+    return response
+
+
+def new_workflow_id(workflow_path: str) -> str:
+    # The random suffix keeps ids unique when a burst starts the same
+    # workflow several times within one clock tick.
+    return f"{workflow_path}-{datetime.utcnow().isoformat()}-{uuid4().hex[:8]}"
+
+
+async def build_workflow_input(
+    workflow_run: WorkflowRunInput,
+) -> tuple[WorkflowInfo, Any]:
+    """
+    Resolve the workflow and validate its payload, without any Temporal
+    call. Raises KeyError for an unknown workflow path and
+    `pydantic.ValidationError` for a bad payload.
+    """
+    workflow_info = await get_workflow_info(workflow_run.workflow_path)
+    workflow_input = registry.validate_input(
+        workflow_run.workflow_path, workflow_run.payload
+    )
+    return workflow_info, workflow_input
 
 
-@app.api.post("/workflow_runs", url_name="create_workflow_run")
+def invalid_payload_detail(e: Exception) -> list[dict]:
+    if isinstance(e, KeyError):
+        return [
+            {
+                "type": "unknown_workflow",
+                "loc": ["workflow_path"],
+                "msg": f"{e.args[0]}",
+            }
+        ]
+    return [
+        {"type": error["type"], "loc": ["payload", *error["loc"]], "msg": error["msg"]}
+        for error in e.errors(include_url=False)
+    ]
+
+
+async def start_workflow_run(
+    client: Client,
+    workflow_path: str,
+    workflow_info: WorkflowInfo,
+    workflow_input: Any,
+) -> WorkflowHandle:
+    with temporal_rpc("start_workflow"):
+        handle = await client.start_workflow(
+            workflow_info.workflow.run,
+            workflow_input,
+            id=new_workflow_id(workflow_path),
+            task_queue=TASK_QUEUE,
+        )
+    runs_started.inc(workflow_path=workflow_path)
+    return handle
+
+
+@app.api.post(
+    "/workflow_runs",
+    response={200: WorkflowRunOutput, 422: dict},
+    url_name="create_workflow_run",
+)
 async def create_workflow_run(request, workflow_run: WorkflowRunInput):
+    try:
+        workflow_info, workflow_input = await build_workflow_input(workflow_run)
+    except (KeyError, ValidationError) as e:
+        return 422, {"detail": invalid_payload_detail(e)}
     client = await get_temporal_client()
-    workflow_info = registry.get_by_import_path(workflow_run.workflow_path)
-    workflow_input = workflow_info.input(**workflow_run.payload)
-    handle = await client.start_workflow(
-        workflow_info.workflow.run,
-        workflow_input,
-        id=f"{workflow_run.workflow_path}-{datetime.utcnow().isoformat()}",
-        task_queue=TASK_QUEUE,
-    )
-    rec_workflow_run = await WorkflowRun.objects.acreate(
+    handle = await start_workflow_run(
+        client, workflow_run.workflow_path, workflow_info, workflow_input
+    )
+    create = (
+        workflow_run_writer.create
+        if WORKFLOW_RUN_BATCH_WRITES
+        else WorkflowRun.objects.acreate
+    )
+    rec_workflow_run = await create(
         workflow_path=workflow_run.workflow_path,
         handle_id=handle.id,
     )
     return WorkflowRunOutput.from_orm(rec_workflow_run)
 
 
-@app.api.get("/workflow_runs/{id}", url_name="describe_workflow_run")
-async def describe_workflow_run(request, id: str):
+@app.api.post(
+    "/workflow_runs/batch",
+    response=List[WorkflowRunBatchItemOutput],
+    url_name="create_workflow_runs_batch",
+)
+async def create_workflow_runs_batch(request, batch: WorkflowRunBatchInput):
+    # Bad items are rejected up front and never cost a Temporal call.
+    prepared = []
+    for item in batch.items:
+        try:
+            prepared.append(await build_workflow_input(item))
+        except (KeyError, ValidationError) as e:
+            prepared.append(e)
+
+    if all(isinstance(result, Exception) for result in prepared):
+        started = prepared
+    else:
+        client = await get_temporal_client()
+        semaphore = asyncio.Semaphore(batch.concurrency or BATCH_START_CONCURRENCY)
+
+        async def start(workflow_run: WorkflowRunInput, result):
+            if isinstance(result, Exception):
+                return result
+            async with semaphore:
+                try:
+                    return await start_workflow_run(
+                        client, workflow_run.workflow_path, *result
+                    )
+                except Exception as e:
+                    return e
+
+        started = await asyncio.gather(
+            *(start(item, result) for item, result in zip(batch.items, prepared))
+        )
+
+    records = {
+        index: WorkflowRun(workflow_path=item.workflow_path, handle_id=result.id)
+        for index, (item, result) in enumerate(zip(batch.items, started))
+        if not isinstance(result, Exception)
+    }
+    errors = {
+        index: f"{type(result).__name__}: {result}"
+        for index, result in enumerate(started)
+        if isinstance(result, Exception)
+    }
     try:
-        workflow_run = await WorkflowRun.objects.aget(id=id)
-    except WorkflowRun.DoesNotExist:
-        return HttpResponse("Not Found", status=404)
+        # SQLite returns the primary keys of bulk inserted rows, so the
+        # records can be serialized straight away.
+        await WorkflowRun.objects.abulk_create(records.values())
+    except Exception as e:
+        # The workflows run either way; keep the rows that can be written.
+        logger.warning(
+            "Inserting %d started workflow runs failed, inserting them one by one: %s",
+            len(records),
+            e,
+        )
+        for index, record in list(records.items()):
+            record.pk = None
+            try:
+                await record.asave(force_insert=True)
+            except Exception as row_error:
+                del records[index]
+                errors[index] = (
+                    f"Workflow {record.handle_id} started but was not recorded: "
+                    f"{type(row_error).__name__}: {row_error}"
+                )
+
+    return [
+        WorkflowRunBatchItemOutput(index=index, error=errors[index])
+        if index in errors
+        else WorkflowRunBatchItemOutput(
+            index=index, workflow_run=WorkflowRunOutput.from_orm(records[index])
+        )
+        for index in range(len(started))
+    ]
+
+
+TERMINAL_STATUSES = frozenset(
+    status.name
+    for status in (
+        WorkflowExecutionStatus.COMPLETED,
+        WorkflowExecutionStatus.FAILED,
+        WorkflowExecutionStatus.CANCELED,
+        WorkflowExecutionStatus.TERMINATED,
+        WorkflowExecutionStatus.TIMED_OUT,
+    )
+)
+
+describe_cache: LRUCache[tuple[str, str], WorkflowRunDescribeOutput] = LRUCache(
+    DESCRIBE_CACHE_SIZE
+)
+
+
+async def fetch_run_usage(
+    handle: WorkflowHandle,
+) -> tuple[Optional[WorkflowRunUsage], bool]:
+    """The usage of a finished run, and whether that answer is final."""
+    try:
+        with temporal_rpc("query"):
+            usage = await handle.query(
+                "get_usage", rpc_timeout=timedelta(seconds=USAGE_QUERY_TIMEOUT_SECONDS)
+            )
+    except WorkflowQueryFailedError:
+        # Workflows without a get_usage query do not report usage.
+        return None, True
+    except RPCError:
+        # A finished run can only be queried while a worker is polling.
+        return None, False
+    return WorkflowRunUsage(**usage), True
+
+
+def usage_fields(usage: Optional[WorkflowRunUsage], final: bool) -> dict:
+    values = usage.dict() if usage is not None else {}
+    return {
+        "requests": values.get("requests"),
+        "input_tokens": values.get("input_tokens"),
+        "output_tokens": values.get("output_tokens"),
+        "total_tokens": values.get("total_tokens"),
+        "agent_seconds": values.get("agent_seconds"),
+        "usage_retry_at": (
+            None
+            if final
+            else timezone.now() + timedelta(seconds=USAGE_RETRY_INTERVAL_SECONDS)
+        ),
+    }
+
+
+async def describe_run(workflow_run: WorkflowRun) -> WorkflowRunDescribeOutput:
+    cache_key = (workflow_run.workflow_path, workflow_run.handle_id)
+    cached = describe_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    if workflow_run.status in TERMINAL_STATUSES:
+        output = WorkflowRunDescribeOutput(
+            handle_id=workflow_run.handle_id,
+            workflow_path=workflow_run.workflow_path,
+            run_id=workflow_run.run_id,
+            first_run_id=workflow_run.first_run_id or workflow_run.run_id,
+            status=workflow_run.status,
+            result_payload=workflow_run.result_payload,
+            result_blob=workflow_run.result_blob,
+            created_at=workflow_run.started_at,
+            usage=(
+                None
+                if workflow_run.total_tokens is None
+                else WorkflowRunUsage(
+                    requests=workflow_run.requests,
+                    input_tokens=workflow_run.input_tokens,
+                    output_tokens=workflow_run.output_tokens,
+                    total_tokens=workflow_run.total_tokens,
+                    agent_seconds=workflow_run.agent_seconds,
+                )
+            ),
+        )
+        if workflow_run.usage_retry_at is not None:
+            # Until the retry is due, describes answer without the usage
+            # rather than wait on a query that no worker may answer.
+            if timezone.now() < workflow_run.usage_retry_at:
+                return output
+            client = await get_temporal_client()
+            output.usage, final = await fetch_run_usage(
+                client.get_workflow_handle(
+                    workflow_run.handle_id, run_id=workflow_run.run_id
+                )
+            )
+            await WorkflowRun.objects.filter(id=workflow_run.id).aupdate(
+                **usage_fields(output.usage, final)
+            )
+            if not final:
+                return output
+        describe_cache.put(cache_key, output)
+        return output
+
     client = await get_temporal_client()
+    # Without a run id, the handle follows continue-as-new to the latest run.
     handle = client.get_workflow_handle(workflow_run.handle_id)
-    desc = await handle.describe()
+    with temporal_rpc("describe"):
+        desc = await handle.describe()
+    first_run_id = desc.raw_info.first_run_id or desc.run_id
+    started_at = desc.start_time
+    if first_run_id != desc.run_id:
+        with temporal_rpc("describe"):
+            first_desc = await client.get_workflow_handle(
+                workflow_run.handle_id, run_id=first_run_id
+            ).describe()
+        started_at = first_desc.start_time
 
+    result_blob = None
     if desc.status == WorkflowExecutionStatus.COMPLETED:
-        result_payload = await handle.result()
+        # Large results stay in the blob store until they are asked for.
+        with temporal_rpc("result"), keep_blob_references():
+            result_payload = await handle.result()
+        reference = blob_reference(result_payload)
+        if reference is not None:
+            result_payload = None
+            result_blob = WorkflowRunResultBlob(
+                sha256=reference["$blob"], size=reference["size"]
+            )
     else:
         result_payload = None
-    return WorkflowRunDescribeOutput(
+    output = WorkflowRunDescribeOutput(
         handle_id=desc.id,
         workflow_path=workflow_run.workflow_path,
         run_id=desc.run_id,
+        first_run_id=first_run_id,
         status=desc.status.name,
         result_payload=result_payload,
-        created_at=desc.start_time,
+        result_blob=result_blob,
+        created_at=started_at,
+    )
+    if output.status in TERMINAL_STATUSES:
+        output.usage, final = await fetch_run_usage(handle)
+        await WorkflowRun.objects.filter(id=workflow_run.id).aupdate(
+            status=output.status,
+            run_id=output.run_id,
+            first_run_id=output.first_run_id,
+            started_at=output.created_at,
+            result_payload=output.result_payload,
+            result_blob=output.result_blob.dict() if output.result_blob else None,
+            **usage_fields(output.usage, final),
+        )
+        runs_seen_finished.inc(
+            workflow_path=workflow_run.workflow_path, status=output.status
+        )
+        # Until the usage is known, the next describe asks for it again.
+        if final:
+            describe_cache.put(cache_key, output)
+    return output
+
+
+@app.api.post(
+    "/workflow_runs/describe",
+    response=List[WorkflowRunDescribeBatchItemOutput],
+    url_name="describe_workflow_runs_batch",
+)
+async def describe_workflow_runs_batch(request, batch: WorkflowRunDescribeBatchInput):
+    workflow_runs = {
+        workflow_run.id: workflow_run
+        async for workflow_run in WorkflowRun.objects.filter(id__in=batch.ids)
+    }
+    semaphore = asyncio.Semaphore(batch.concurrency or DESCRIBE_CONCURRENCY)
+
+    async def describe(id: int) -> WorkflowRunDescribeBatchItemOutput:
+        workflow_run = workflow_runs.get(id)
+        if workflow_run is None:
+            return WorkflowRunDescribeBatchItemOutput(id=id, error="Not Found")
+        async with semaphore:
+            try:
+                output = await describe_run(workflow_run)
+            except Exception as e:
+                return WorkflowRunDescribeBatchItemOutput(
+                    id=id, error=f"{type(e).__name__}: {e}"
+                )
+        return WorkflowRunDescribeBatchItemOutput(id=id, workflow_run=output)
+
+    return await asyncio.gather(*(describe(id) for id in batch.ids))
+
+
+run_events = RunEventHub(interval=EVENTS_POLL_INTERVAL_SECONDS)
+
+
+async def fetch_run_snapshot(workflow_run: WorkflowRun, offset: int) -> RunSnapshot:
+    output = await describe_run(workflow_run)
+    done = output.status in TERMINAL_STATUSES
+    events = []
+    # Finished runs are not queried: no worker may be left to answer.
+    if not done:
+        client = await get_temporal_client()
+        handle = client.get_workflow_handle(workflow_run.handle_id)
+        try:
+            with temporal_rpc("query"):
+                events = await handle.query("get_events", offset)
+        except WorkflowQueryFailedError:
+            # Workflows without hooks do not expose agent events.
+            pass
+        except RPCError:
+            # The run closed since the describe, or no worker answered in
+            # time; the next poll asks again.
+            pass
+    return RunSnapshot(status=output.dict(), events=events, done=done)
+
+
+def _token_cost(input_tokens: int, output_tokens: int) -> Optional[float]:
+    if INPUT_TOKEN_COST_PER_MILLION is None and OUTPUT_TOKEN_COST_PER_MILLION is None:
+        return None
+    return (
+        input_tokens * float(INPUT_TOKEN_COST_PER_MILLION or 0)
+        + output_tokens * float(OUTPUT_TOKEN_COST_PER_MILLION or 0)
+    ) / 1_000_000
+
+
+USAGE_BUCKETS = {"hour": TruncHour, "day": TruncDay}
+
+
+@app.api.get(
+    "/workflow_runs/usage",
+    response={200: List[WorkflowRunUsageBucketOutput], 400: str},
+    url_name="workflow_runs_usage",
+)
+async def workflow_runs_usage(
+    request,
+    bucket: str = "day",
+    workflow_path: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    """
+    Model usage of finished runs, summed per workflow path and per hour or
+    day of their creation.
+    """
+    trunc = USAGE_BUCKETS.get(bucket)
+    if trunc is None:
+        return 400, f"bucket must be one of {', '.join(USAGE_BUCKETS)}"
+    queryset = WorkflowRun.objects.filter(total_tokens__isnull=False)
+    if workflow_path is not None:
+        queryset = queryset.filter(workflow_path=workflow_path)
+    if created_after is not None:
+        queryset = queryset.filter(created_at__gte=created_after)
+    if created_before is not None:
+        queryset = queryset.filter(created_at__lt=created_before)
+    rows = (
+        queryset.annotate(bucket=trunc("created_at"))
+        .values("workflow_path", "bucket")
+        .annotate(
+            runs=Count("id"),
+            requests=Sum("requests"),
+            input_tokens=Sum("input_tokens"),
+            output_tokens=Sum("output_tokens"),
+            total_tokens=Sum("total_tokens"),
+            agent_seconds=Sum("agent_seconds"),
+        )
+        .order_by("bucket", "-total_tokens", "workflow_path")
+    )
+    return 200, [
+        WorkflowRunUsageBucketOutput(
+            **row, cost=_token_cost(row["input_tokens"], row["output_tokens"])
+        )
+        async for row in rows
+    ]
+
+
+@app.api.get("/workflow_runs/{id}/events", url_name="workflow_run_events")
+async def workflow_run_events(request, id: str):
+    """
+    Stream status changes and agent hook events of a run as server-sent
+    events. All subscribers of a run share one upstream watcher.
+    """
+    try:
+        workflow_run = await WorkflowRun.objects.aget(id=id)
+    except WorkflowRun.DoesNotExist:
+        return HttpResponse("Not Found", status=404)
+
+    async def fetch(offset: int) -> RunSnapshot:
+        return await fetch_run_snapshot(workflow_run, offset)
+
+    response = StreamingHttpResponse(
+        run_events.stream(workflow_run.id, fetch),
+        content_type="text/event-stream",
     )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+output_events = RunEventHub(interval=OUTPUT_POLL_INTERVAL_SECONDS, event="chunk")
+
+
+async def fetch_output_snapshot(
+    workflow_run: WorkflowRun, offset: int, last_status: Optional[dict] = None
+) -> RunSnapshot:
+    client = await get_temporal_client()
+    handle = client.get_workflow_handle(workflow_run.handle_id)
+    try:
+        with temporal_rpc("query"):
+            progress = await handle.query("get_output", offset)
+    except WorkflowQueryFailedError:
+        # Only streaming workflows expose partial output.
+        return RunSnapshot(status={"streaming": False, "done": True}, done=True)
+    except RPCError:
+        # The run closed, or no worker answered in time. Keep the last
+        # known state until the describe says the run is over; its result
+        # holds the complete answer.
+        done = (await describe_run(workflow_run)).status in TERMINAL_STATUSES
+        status = {**(last_status or {"streaming": True}), "done": done}
+        return RunSnapshot(status=status, done=done)
+    return RunSnapshot(
+        status={"streaming": True, "done": progress["done"]},
+        # A retried model call streams its answer again, after a reset.
+        events=[
+            RunEvent("reset", {}) if chunk is None else {"text": chunk}
+            for chunk in progress["chunks"]
+        ],
+        done=progress["done"],
+    )
+
+
+@app.api.get("/workflow_runs/{id}/output", url_name="workflow_run_output")
+async def workflow_run_output(request, id: str):
+    """
+    Stream the partial model output of a streaming workflow run as
+    server-sent `chunk` events, as soon as the worker relays it.
+    """
+    try:
+        workflow_run = await WorkflowRun.objects.aget(id=id)
+    except WorkflowRun.DoesNotExist:
+        return HttpResponse("Not Found", status=404)
+
+    last_status = None
+
+    async def fetch(offset: int) -> RunSnapshot:
+        nonlocal last_status
+        snapshot = await fetch_output_snapshot(workflow_run, offset, last_status)
+        last_status = snapshot.status
+        return snapshot
+
+    response = StreamingHttpResponse(
+        output_events.stream(workflow_run.id, fetch),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def stream_blob(store: BlobStore, digest: str):
+    chunks = store.iter_chunks(digest)
+    try:
+        while True:
+            # Reads happen off the event loop, one chunk at a time.
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        chunks.close()
+
+
+@app.api.get("/workflow_runs/{id}/result", url_name="workflow_run_result")
+async def workflow_run_result(request, id: str):
+    """
+    The result of a completed run as JSON. Results offloaded to the blob
+    store are streamed from it, without loading them into memory.
+    """
+    try:
+        workflow_run = await WorkflowRun.objects.aget(id=id)
+    except WorkflowRun.DoesNotExist:
+        return HttpResponse("Not Found", status=404)
+    output = await describe_run(workflow_run)
+    if output.status != WorkflowExecutionStatus.COMPLETED.name:
+        return HttpResponse(f"Run is {output.status}", status=409)
+    if output.result_blob is None:
+        return HttpResponse(
+            json.dumps(output.result_payload, cls=DjangoJSONEncoder),
+            content_type="application/json",
+        )
+    store = get_blob_store()
+    if store is None:
+        # Blob references stay in the database after the store is disabled.
+        return HttpResponse("Blob store is not configured", status=404)
+    response = StreamingHttpResponse(
+        stream_blob(store, output.result_blob.sha256), content_type="application/json"
+    )
+    response["Content-Length"] = str(output.result_blob.size)
+    return response
+
+
+@app.api.get("/workflow_runs/{id}/results", url_name="workflow_run_fan_out_results")
+async def workflow_run_fan_out_results(request, id: str):
+    """
+    The results of a completed fan-out run, one per input in order,
+    gathered from its chunk workflows, and the errors of failed inputs.
+    """
+    try:
+        workflow_run = await WorkflowRun.objects.aget(id=id)
+    except WorkflowRun.DoesNotExist:
+        return HttpResponse("Not Found", status=404)
+    if workflow_run.workflow_path != "workflows.fan_out_workflow":
+        return HttpResponse("Not a fan-out run", status=404)
+    output = await describe_run(workflow_run)
+    if output.status != WorkflowExecutionStatus.COMPLETED.name:
+        return HttpResponse(f"Run is {output.status}", status=409)
+    client = await get_temporal_client()
+    fan_out = output.result_payload
+    if fan_out is None:
+        # The list of chunks of a very long fan-out went to the blob store.
+        with temporal_rpc("result"):
+            fan_out = await client.get_workflow_handle(workflow_run.handle_id).result()
+    semaphore = asyncio.Semaphore(DESCRIBE_CONCURRENCY)
+
+    async def chunk_result(chunk_id: str) -> dict:
+        async with semaphore:
+            with temporal_rpc("result"):
+                return await client.get_workflow_handle(chunk_id).result()
+
+    chunks = await asyncio.gather(
+        *(chunk_result(chunk_id) for chunk_id in fan_out["chunks"])
+    )
+    return HttpResponse(
+        json.dumps(
+            {
+                "results": [result for chunk in chunks for result in chunk["results"]],
+                "errors": [error for chunk in chunks for error in chunk["errors"]],
+            },
+            cls=DjangoJSONEncoder,
+        ),
+        content_type="application/json",
+    )
+
+
+@app.api.post(
+    "/workflow_runs/{id}/messages",
+    response=WorkflowRunMessageOutput,
+    url_name="workflow_run_messages",
+)
+async def send_workflow_run_message(request, id: str, message: WorkflowRunMessageInput):
+    """
+    Take a turn in a conversation run: send a message and wait for the
+    agent's reply.
+    """
+    try:
+        workflow_run = await WorkflowRun.objects.aget(id=id)
+    except WorkflowRun.DoesNotExist:
+        return HttpResponse("Not Found", status=404)
+    client = await get_temporal_client()
+    handle = client.get_workflow_handle(workflow_run.handle_id)
+    try:
+        with temporal_rpc("update"):
+            reply = await handle.execute_update("send_message", message.message)
+    except WorkflowUpdateFailedError as e:
+        # Rejected, e.g. because the conversation has ended.
+        return HttpResponse(str(e.cause or e), status=409)
+    except RPCError as e:
+        # The run is closed or does not take messages.
+        return HttpResponse(e.message, status=409)
+    return WorkflowRunMessageOutput(reply=reply)
+
+
+@app.api.post("/workflow_runs/{id}/end", url_name="workflow_run_end")
+async def end_workflow_run(request, id: str):
+    """End a conversation run; it completes once turns in progress have replied."""
+    try:
+        workflow_run = await WorkflowRun.objects.aget(id=id)
+    except WorkflowRun.DoesNotExist:
+        return HttpResponse("Not Found", status=404)
+    client = await get_temporal_client()
+    handle = client.get_workflow_handle(workflow_run.handle_id)
+    try:
+        with temporal_rpc("signal"):
+            await handle.signal("end")
+    except RPCError as e:
+        return HttpResponse(e.message, status=409)
+    return HttpResponse(status=202)
+
+
+@app.api.get("/workflow_runs/{id}", url_name="describe_workflow_run")
+async def describe_workflow_run(request, id: str):
+    try:
+        workflow_run = await WorkflowRun.objects.aget(id=id)
+    except WorkflowRun.DoesNotExist:
+        return HttpResponse("Not Found", status=404)
+    return await describe_run(workflow_run)
@@ -1,12 +1,15 @@
 from .registry import Registry
-from .hello_world_workflow import hello_world_workflow_info
-from .lifecycle_workflow import lifecycle_workflow_info
-from .agent_lifecycle_workflow import agent_lifecycle_workflow_info
+
 
 def get_registry() -> Registry:
+    # Imported here rather than at the top: the workflow sandbox re-imports
+    # this package for every workflow, and discovery touches the filesystem.
+    from .discovery import discover
+
+    # Workflow modules import the agents SDK, so they are only imported when
+    # a workflow is first looked up; the manifest says where each one is.
     registry = Registry()
-    registry.register(hello_world_workflow_info)
-    registry.register(lifecycle_workflow_info)
-    registry.register(agent_lifecycle_workflow_info)
+    for path, target in discover().workflow_infos.items():
+        registry.register_lazy(path, target)
     registry.freeze()
-    return registry
\ No newline at end of file
+    return registry
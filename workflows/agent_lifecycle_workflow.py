@@ -5,57 +5,48 @@ from agents import (
     Agent,
     AgentHooks,
     RunContextWrapper,
-    Runner,
     function_tool,
 )
 from pydantic import BaseModel
 from temporalio import workflow
 
+from .hooks import EventRecorder, RecordingHooks
 from .registry import WorkflowInfo
+from .usage import RunUsage, run_agent
 
 
-class CustomAgentHooks(AgentHooks):
-    def __init__(self, display_name: str):
-        self.event_counter = 0
+class CustomAgentHooks(RecordingHooks, AgentHooks):
+    def __init__(self, display_name: str, recorder: EventRecorder | None = None):
+        super().__init__(recorder)
         self.display_name = display_name
 
+    def _record(
+        self, event: str, context: RunContextWrapper, agent: Agent, **fields
+    ) -> None:
+        super()._record(event, context, agent, hooks=self.display_name, **fields)
+
     async def on_start(self, context: RunContextWrapper, agent: Agent) -> None:
-        self.event_counter += 1
-        print(
-            f"### ({self.display_name}) {self.event_counter}: Agent {agent.name} started"
-        )
+        self._record("agent_started", context, agent)
 
     async def on_end(
         self, context: RunContextWrapper, agent: Agent, output: Any
     ) -> None:
-        self.event_counter += 1
-        print(
-            f"### ({self.display_name}) {self.event_counter}: Agent {agent.name} ended with output {output}"
-        )
+        self._record("agent_ended", context, agent, output=str(output))
 
     async def on_handoff(
         self, context: RunContextWrapper, agent: Agent, source: Agent
     ) -> None:
-        self.event_counter += 1
-        print(
-            f"### ({self.display_name}) {self.event_counter}: Agent {source.name} handed off to {agent.name}"
-        )
+        self._record("handoff", context, source, to_agent=agent.name)
 
     async def on_tool_start(
         self, context: RunContextWrapper, agent: Agent, tool
     ) -> None:
-        self.event_counter += 1
-        print(
-            f"### ({self.display_name}) {self.event_counter}: Agent {agent.name} started tool {tool.name}"
-        )
+        self._record("tool_started", context, agent, tool=tool.name)
 
     async def on_tool_end(
         self, context: RunContextWrapper, agent: Agent, tool, result: str
     ) -> None:
-        self.event_counter += 1
-        print(
-            f"### ({self.display_name}) {self.event_counter}: Agent {agent.name} ended tool {tool.name} with result {result}"
-        )
+        self._record("tool_ended", context, agent, tool=tool.name, result=result)
 
 
 @function_tool
@@ -81,6 +72,18 @@ class FinalResult(BaseModel):
 
 @workflow.defn
 class AgentLifecycleWorkflow:
+    def __init__(self) -> None:
+        self.recorder = EventRecorder()
+        self.usage = RunUsage()
+
+    @workflow.query
+    def get_events(self, offset: int = 0) -> list[dict]:
+        return self.recorder.events[offset:]
+
+    @workflow.query
+    def get_usage(self) -> RunUsage:
+        return self.usage
+
     @workflow.run
     async def run(self, workflow_input: WorkflowInput) -> FinalResult:
         multiply_agent = Agent(
@@ -88,7 +91,7 @@ class AgentLifecycleWorkflow:
             instructions="Multiply the number by 2 and then return the final result.",
             tools=[multiply_by_two],
             output_type=FinalResult,
-            hooks=CustomAgentHooks(display_name="Agent"),
+            hooks=CustomAgentHooks(display_name="Agent", recorder=self.recorder),
         )
 
         start_agent = Agent(
@@ -97,16 +100,20 @@ class AgentLifecycleWorkflow:
             tools=[random_number],
             output_type=FinalResult,
             handoffs=[multiply_agent],
-            hooks=CustomAgentHooks(display_name="Agent"),
+            hooks=CustomAgentHooks(display_name="Agent", recorder=self.recorder),
         )
 
-        result = await Runner.run(
-            start_agent,
-            # hooks=hooks,
-            input=f"Generate a random number between 0 and {workflow_input.max_number}.",
-        )
+        try:
+            result = await run_agent(
+                self.usage,
+                start_agent,
+                # hooks=hooks,
+                input=f"Generate a random number between 0 and {workflow_input.max_number}.",
+            )
+        finally:
+            # Only queues the records; the worker writes them on its own thread.
+            self.recorder.flush()
 
-        print("Done!")
         return result.final_output
 
 
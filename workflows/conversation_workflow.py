@@ -0,0 +1,165 @@
+import asyncio
+import dataclasses
+from dataclasses import dataclass, field
+
+from agents import Agent
+from temporalio import workflow
+
+from .registry import WorkflowInfo
+from .usage import RunUsage, run_agent
+
+SUMMARIZER_INSTRUCTIONS = (
+    "Summarize the conversation below for the assistant that continues it. "
+    "Keep every fact, decision, preference and open question; drop small talk."
+)
+
+
+@dataclass
+class ConversationWorkflowInput:
+    instructions: str = "You are a helpful assistant."
+    # Most messages kept word for word. Once there are more, the older ones
+    # are folded into the summary until half as many are left.
+    keep_messages: int = 10
+    # The run continues as new once its history has this many events or
+    # bytes, or when the server suggests it.
+    max_history_events: int = 2000
+    max_history_bytes: int = 2 * 1024 * 1024
+    # Carried over from the previous run when continuing as new.
+    summary: str = ""
+    messages: list[dict] = field(default_factory=list)
+    turns: int = 0
+    usage: RunUsage = field(default_factory=RunUsage)
+
+
+@dataclass
+class ConversationWorkflowOutput:
+    summary: str
+    messages: list[dict]
+    turns: int
+
+
+@workflow.defn
+class ConversationWorkflow:
+    """
+    A conversation with an agent that stays open until it is ended. Each
+    `send_message` update is one turn and returns the agent's reply.
+
+    At most `keep_messages` messages are kept as they are. Past that, a
+    summarizer agent folds the older ones into a running summary until
+    `keep_messages // 2` are left, so the next few turns need no compaction.
+    The agent gets the summary with its instructions. The summary and the
+    recent messages are all a run carries over when it continues as new.
+    """
+
+    # Updates may arrive before the run starts, so the state is set up here.
+    @workflow.init
+    def __init__(self, workflow_input: ConversationWorkflowInput) -> None:
+        self.settings = workflow_input
+        self.summary = workflow_input.summary
+        self.messages = list(workflow_input.messages)
+        self.turns = workflow_input.turns
+        self.usage = RunUsage()
+        self.usage.add_run_usage(workflow_input.usage)
+        self.ended = False
+        # Turns run one at a time, and never while the state is compacted.
+        self.lock = asyncio.Lock()
+
+    @workflow.query
+    def get_usage(self) -> RunUsage:
+        return self.usage
+
+    @workflow.query
+    def get_messages(self) -> dict:
+        return {"summary": self.summary, "messages": self.messages, "turns": self.turns}
+
+    @workflow.signal
+    def end(self) -> None:
+        self.ended = True
+
+    @workflow.update
+    async def send_message(self, message: str) -> str:
+        async with self.lock:
+            agent = Agent(name="Assistant", instructions=self._instructions())
+            result = await run_agent(
+                self.usage,
+                agent,
+                input=[*self.messages, {"role": "user", "content": message}],
+            )
+            reply = str(result.final_output)
+            self.messages += [
+                {"role": "user", "content": message},
+                {"role": "assistant", "content": reply},
+            ]
+            self.turns += 1
+            return reply
+
+    @send_message.validator
+    def validate_send_message(self, message: str) -> None:
+        if self.ended:
+            raise ValueError("The conversation has ended")
+        if not message.strip():
+            raise ValueError("The message is empty")
+
+    def _instructions(self) -> str:
+        if not self.summary:
+            return self.settings.instructions
+        return (
+            f"{self.settings.instructions}\n\n"
+            f"Summary of the conversation so far:\n{self.summary}"
+        )
+
+    def _needs_compaction(self) -> bool:
+        return len(self.messages) > self.settings.keep_messages
+
+    async def _compact(self) -> None:
+        cut = len(self.messages) - self.settings.keep_messages // 2
+        older, self.messages = self.messages[:cut], self.messages[cut:]
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in older)
+        if self.summary:
+            transcript = f"Earlier summary:\n{self.summary}\n\n{transcript}"
+        summarizer = Agent(name="Summarizer", instructions=SUMMARIZER_INSTRUCTIONS)
+        result = await run_agent(self.usage, summarizer, input=transcript)
+        self.summary = str(result.final_output)
+
+    def _history_full(self) -> bool:
+        info = workflow.info()
+        return (
+            info.is_continue_as_new_suggested()
+            or info.get_current_history_length() >= self.settings.max_history_events
+            or info.get_current_history_size() >= self.settings.max_history_bytes
+        )
+
+    @workflow.run
+    async def run(
+        self, workflow_input: ConversationWorkflowInput
+    ) -> ConversationWorkflowOutput:
+        while True:
+            await workflow.wait_condition(
+                lambda: self.ended or self._needs_compaction() or self._history_full()
+            )
+            if self._needs_compaction() and not self.ended:
+                async with self.lock:
+                    await self._compact()
+                continue
+            # Let turns in progress reply before the run closes.
+            await workflow.wait_condition(workflow.all_handlers_finished)
+            if self.ended:
+                return ConversationWorkflowOutput(
+                    summary=self.summary, messages=self.messages, turns=self.turns
+                )
+            workflow.continue_as_new(
+                dataclasses.replace(
+                    workflow_input,
+                    summary=self.summary,
+                    messages=self.messages,
+                    turns=self.turns,
+                    usage=self.usage,
+                )
+            )
+
+
+conversation_workflow_info = WorkflowInfo(
+    input=ConversationWorkflowInput,
+    output=ConversationWorkflowOutput,
+    workflow=ConversationWorkflow,
+)
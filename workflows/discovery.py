@@ -0,0 +1,227 @@
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .registry import Registry, WorkflowInfo
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+PACKAGES = ("workflows", "activities")
+MANIFEST_PATH = os.getenv(
+    "WORKFLOW_MANIFEST_PATH", str(PROJECT_ROOT / ".workflow_manifest.json")
+)
+MANIFEST_VERSION = 1
+
+# The attributes @workflow.defn and @activity.defn set on what they decorate,
+# read the way temporalio's own contrib packages read them. The SDK's
+# _Definition classes that wrap them are private; pyproject.toml pins the
+# SDK version these names were checked against.
+WORKFLOW_DEFINITION_ATTRIBUTE = "__temporal_workflow_definition"
+ACTIVITY_DEFINITION_ATTRIBUTE = "__temporal_activity_definition"
+
+
+@dataclass
+class Manifest:
+    """
+    What discovery found in the scanned packages, as import targets
+    ("module:attribute" or "module:Class.method") that are only imported
+    when they are used.
+    """
+
+    # Relative source path -> {"mtime_ns", "size", "sha256"}.
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Registry import path -> target of its WorkflowInfo.
+    workflow_infos: Dict[str, str] = field(default_factory=dict)
+    workflows: List[str] = field(default_factory=list)
+    activities: List[str] = field(default_factory=list)
+
+
+def _source_files(root: Path, packages: Sequence[str]) -> Dict[str, Path]:
+    files = {}
+    for package in packages:
+        for directory, dirnames, filenames in os.walk(root / package):
+            dirnames[:] = [name for name in dirnames if name != "__pycache__"]
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    path = Path(directory, filename)
+                    files[path.relative_to(root).as_posix()] = path
+    return dict(sorted(files.items()))
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _fingerprint(path: Path) -> Dict[str, Any]:
+    stat = path.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": _sha256(path)}
+
+
+def _is_fresh(manifest: Manifest, files: Dict[str, Path]) -> bool:
+    """
+    Whether the sources are the ones `manifest` was built from. Files whose
+    mtime and size are unchanged are not read; touched files are compared
+    by hash, and their new stats are stored in `manifest`.
+    """
+    if manifest.files.keys() != files.keys():
+        return False
+    for name, path in files.items():
+        recorded = manifest.files[name]
+        stat = path.stat()
+        if (stat.st_mtime_ns, stat.st_size) == (recorded["mtime_ns"], recorded["size"]):
+            continue
+        if stat.st_size != recorded["size"] or _sha256(path) != recorded["sha256"]:
+            return False
+        recorded["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def _module_name(relative_path: str) -> str:
+    parts = relative_path[: -len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _is_workflow(cls: type) -> bool:
+    # Subclasses inherit the attribute; only the decorated class counts.
+    return WORKFLOW_DEFINITION_ATTRIBUTE in vars(cls)
+
+
+def _is_activity(obj: Any) -> bool:
+    return callable(obj) and hasattr(obj, ACTIVITY_DEFINITION_ATTRIBUTE)
+
+
+def _scan_module(module_name: str, manifest: Manifest) -> None:
+    module = importlib.import_module(module_name)
+    for name, obj in vars(module).items():
+        if isinstance(obj, WorkflowInfo):
+            if obj.workflow.__module__ == module_name:
+                path = Registry.import_path_of(obj.workflow)
+                manifest.workflow_infos[path] = f"{module_name}:{name}"
+            continue
+        if getattr(obj, "__module__", None) != module_name:
+            # Imported from elsewhere; found where it is defined.
+            continue
+        if inspect.isclass(obj):
+            if _is_workflow(obj):
+                manifest.workflows.append(f"{module_name}:{name}")
+                continue
+            for attribute, member in vars(obj).items():
+                if _is_activity(member):
+                    manifest.activities.append(f"{module_name}:{name}.{attribute}")
+        elif _is_activity(obj):
+            manifest.activities.append(f"{module_name}:{name}")
+
+
+def scan(
+    root: Path = PROJECT_ROOT, packages: Sequence[str] = PACKAGES
+) -> Manifest:
+    """Import every module of `packages` and collect what it defines."""
+    files = _source_files(root, packages)
+    manifest = Manifest(files={name: _fingerprint(path) for name, path in files.items()})
+    for name in files:
+        _scan_module(_module_name(name), manifest)
+    return manifest
+
+
+def load_manifest(path: str) -> Optional[Manifest]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.pop("version", None) != MANIFEST_VERSION:
+        return None
+    try:
+        return Manifest(**data)
+    except TypeError:
+        return None
+
+
+def save_manifest(manifest: Manifest, path: str) -> None:
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, **asdict(manifest)}, f, indent=1)
+        # Concurrent startups each write a whole manifest; the last one wins.
+        os.replace(temporary, path)
+    except OSError as e:
+        logger.warning("Could not write workflow manifest %s: %s", path, e)
+
+
+def discover(
+    manifest_path: Optional[str] = None,
+    root: Path = PROJECT_ROOT,
+    packages: Sequence[str] = PACKAGES,
+) -> Manifest:
+    """
+    The manifest of the workflows and activities in `packages`.
+
+    It is read from `manifest_path` when no source file changed since it was
+    written, so startups skip importing every module. Otherwise the packages
+    are scanned again and the manifest rewritten.
+    """
+    manifest_path = manifest_path or MANIFEST_PATH
+    files = _source_files(root, packages)
+    manifest = load_manifest(manifest_path)
+    if manifest is not None:
+        recorded_stats = json.dumps(manifest.files, sort_keys=True)
+        if _is_fresh(manifest, files):
+            if json.dumps(manifest.files, sort_keys=True) != recorded_stats:
+                save_manifest(manifest, manifest_path)
+            return manifest
+    logger.info("Scanning %s for workflows and activities", ", ".join(packages))
+    manifest = scan(root, packages)
+    save_manifest(manifest, manifest_path)
+    return manifest
+
+
+def _resolve(target: str) -> Any:
+    module_name, _, attribute = target.partition(":")
+    obj = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def load_workflows(manifest: Manifest) -> List[type]:
+    return [_resolve(target) for target in manifest.workflows]
+
+
+def load_activities(manifest: Manifest) -> List[Callable]:
+    """
+    The activity functions of `manifest`. Activities defined as methods are
+    bound to one instance of their class, created without arguments.
+    """
+    instances: Dict[str, Any] = {}
+    activities = []
+    for target in manifest.activities:
+        module_name, _, attribute = target.partition(":")
+        class_name, _, method = attribute.rpartition(".")
+        if not class_name:
+            activities.append(_resolve(target))
+            continue
+        class_target = f"{module_name}:{class_name}"
+        if class_target not in instances:
+            instances[class_target] = _resolve(class_target)()
+        activities.append(getattr(instances[class_target], method))
+    return activities
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    manifest = scan()
+    save_manifest(manifest, MANIFEST_PATH)
+    print(
+        f"Wrote {MANIFEST_PATH}: {len(manifest.workflows)} workflows, "
+        f"{len(manifest.workflow_infos)} workflow infos, "
+        f"{len(manifest.activities)} activities"
+    )
@@ -0,0 +1,263 @@
+import asyncio
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from agents import Agent
+from temporalio import workflow
+
+from .registry import WorkflowInfo
+from .usage import RunUsage, run_agent
+
+
+@dataclass
+class FanOutItemError:
+    # Index of the failed input across the whole fan-out.
+    index: int
+    error: str
+
+
+@dataclass
+class FanOutChunkInput:
+    inputs: list[Any]
+    # Index of the first of `inputs` across the whole fan-out.
+    offset: int
+    instructions: str = "You are a helpful assistant."
+    child_workflow: Optional[str] = None
+    max_concurrency: int = 10
+
+
+@dataclass
+class FanOutChunkOutput:
+    # One result per input, in order; None where the input failed.
+    results: list[Any]
+    errors: list[FanOutItemError] = field(default_factory=list)
+    usage: RunUsage = field(default_factory=RunUsage)
+
+
+@dataclass
+class FanOutWorkflowInput:
+    # Prompts for the agent, or the inputs of the child workflows.
+    inputs: list[Any]
+    instructions: str = "You are a helpful assistant."
+    # Type of a workflow to run once per input, e.g. "LifecycleWorkflow",
+    # instead of running the agent.
+    child_workflow: Optional[str] = None
+    # Most agent runs or child workflows in flight at once in one chunk.
+    max_concurrency: int = 10
+    # Inputs handled by one FanOutChunkWorkflow.
+    chunk_size: int = 25
+    # Inputs handed to chunks by one run before it continues as new, in
+    # whole chunks; this bounds the chunk results in the history of a run.
+    inputs_per_run: int = 100
+    # Carried over from the previous run when continuing as new: `inputs`
+    # then holds only the inputs that are left, and `offset` counts the
+    # ones before them.
+    offset: int = 0
+    failed: int = 0
+    usage: RunUsage = field(default_factory=RunUsage)
+
+
+@dataclass
+class FanOutWorkflowOutput:
+    # Ids of the FanOutChunkWorkflows holding the results, in input order;
+    # GET /api/workflow_runs/{id}/results gathers them.
+    chunks: list[str]
+    completed: int
+    failed: int
+
+
+def chunk_workflow_id(workflow_id: str, offset: int) -> str:
+    return f"{workflow_id}-chunk-{offset}"
+
+
+def _describe(error: BaseException) -> str:
+    # Temporal wraps what went wrong in ActivityError or ChildWorkflowError.
+    while error.__cause__ is not None:
+        error = error.__cause__
+    return f"{type(error).__name__}: {error}"
+
+
+@workflow.defn
+class FanOutChunkWorkflow:
+    """
+    Runs the agent, or the child workflow, on one chunk of a fan-out's
+    inputs, at most `max_concurrency` at a time. An input that fails is
+    recorded as an error and does not stop the others.
+
+    Once its last input has started, the chunk signals the fan-out, which
+    starts the next chunk while this one finishes.
+    """
+
+    def __init__(self) -> None:
+        self.usage = RunUsage()
+        self.started = 0
+        self.completed = 0
+        self.total = 0
+
+    @workflow.query
+    def get_usage(self) -> RunUsage:
+        return self.usage
+
+    @workflow.query
+    def get_progress(self) -> dict:
+        return {"completed": self.completed, "total": self.total}
+
+    @workflow.run
+    async def run(self, chunk_input: FanOutChunkInput) -> FanOutChunkOutput:
+        self.total = len(chunk_input.inputs)
+        agent = Agent(name="Fan-out Agent", instructions=chunk_input.instructions)
+        window = asyncio.Semaphore(chunk_input.max_concurrency)
+
+        async def run_one(index: int, item: Any) -> Any:
+            async with window:
+                self.started += 1
+                try:
+                    if chunk_input.child_workflow is not None:
+                        return await workflow.execute_child_workflow(
+                            chunk_input.child_workflow,
+                            item,
+                            # Indexes count across the fan-out, so ids stay unique.
+                            id=f"{workflow.info().workflow_id}-{index}",
+                        )
+                    return (await run_agent(self.usage, agent, input=item)).final_output
+                finally:
+                    self.completed += 1
+
+        outcomes = asyncio.gather(
+            *(
+                run_one(chunk_input.offset + i, item)
+                for i, item in enumerate(chunk_input.inputs)
+            ),
+            return_exceptions=True,
+        )
+        await workflow.wait_condition(lambda: self.started == self.total)
+        parent = workflow.info().parent
+        if parent is not None:
+            await workflow.get_external_workflow_handle(
+                parent.workflow_id, run_id=parent.run_id
+            ).signal("chunk_draining", chunk_input.offset)
+
+        output = FanOutChunkOutput(results=[], usage=self.usage)
+        for i, outcome in enumerate(await outcomes):
+            if not isinstance(outcome, BaseException):
+                output.results.append(outcome)
+                continue
+            if not isinstance(outcome, Exception):
+                # Cancellation of the chunk itself.
+                raise outcome
+            output.results.append(None)
+            output.errors.append(
+                FanOutItemError(index=chunk_input.offset + i, error=_describe(outcome))
+            )
+        return output
+
+
+@workflow.defn
+class FanOutWorkflow:
+    """
+    Runs the same agent, or the same child workflow, on every one of a list
+    of inputs, `chunk_size` inputs per FanOutChunkWorkflow child.
+
+    The next chunk starts as soon as the current one has started its last
+    input, so at most two chunks are in flight and the window does not
+    drain between them. A run continues as new after `inputs_per_run`
+    inputs, once its chunks have finished. Results stay in the chunk
+    workflows; the output lists their ids.
+    """
+
+    def __init__(self) -> None:
+        self.usage = RunUsage()
+        self.completed = 0
+        self.failed = 0
+        self.total = 0
+        self.draining: set[int] = set()
+
+    @workflow.query
+    def get_usage(self) -> RunUsage:
+        return self.usage
+
+    @workflow.query
+    def get_progress(self) -> dict:
+        return {"completed": self.completed, "total": self.total}
+
+    @workflow.signal
+    def chunk_draining(self, offset: int) -> None:
+        self.draining.add(offset)
+
+    @workflow.run
+    async def run(self, workflow_input: FanOutWorkflowInput) -> FanOutWorkflowOutput:
+        if (
+            workflow_input.max_concurrency < 1
+            or workflow_input.chunk_size < 1
+            or workflow_input.inputs_per_run < 1
+        ):
+            raise ValueError(
+                "max_concurrency, chunk_size and inputs_per_run must be at least 1"
+            )
+        self.usage.add_run_usage(workflow_input.usage)
+        self.completed = workflow_input.offset
+        self.failed = workflow_input.failed
+        self.total = workflow_input.offset + len(workflow_input.inputs)
+        workflow_id = workflow.info().workflow_id
+
+        async def run_chunk(start: int, inputs: list[Any]) -> None:
+            output = await workflow.execute_child_workflow(
+                FanOutChunkWorkflow.run,
+                FanOutChunkInput(
+                    inputs=inputs,
+                    offset=start,
+                    instructions=workflow_input.instructions,
+                    child_workflow=workflow_input.child_workflow,
+                    max_concurrency=workflow_input.max_concurrency,
+                ),
+                id=chunk_workflow_id(workflow_id, start),
+            )
+            self.usage.add_run_usage(output.usage)
+            self.completed += len(inputs)
+            self.failed += len(output.errors)
+
+        # Whole chunks per run keep every chunk offset a multiple of
+        # chunk_size, which is how the output names them.
+        chunk_size = workflow_input.chunk_size
+        per_run = max(workflow_input.inputs_per_run // chunk_size, 1) * chunk_size
+        inputs = workflow_input.inputs[:per_run]
+        chunks: list[tuple[int, asyncio.Task]] = []
+        for i in range(0, len(inputs), chunk_size):
+            if chunks:
+                previous_offset, previous = chunks[-1]
+                await workflow.wait_condition(
+                    lambda: (previous_offset in self.draining or previous.done())
+                    and (len(chunks) < 2 or chunks[-2][1].done())
+                )
+            start = workflow_input.offset + i
+            chunk = inputs[i : i + chunk_size]
+            chunks.append((start, asyncio.create_task(run_chunk(start, chunk))))
+        await asyncio.gather(*(task for _, task in chunks))
+
+        remaining = workflow_input.inputs[len(inputs) :]
+        if remaining:
+            workflow.continue_as_new(
+                dataclasses.replace(
+                    workflow_input,
+                    inputs=remaining,
+                    offset=self.completed,
+                    failed=self.failed,
+                    usage=self.usage,
+                )
+            )
+        return FanOutWorkflowOutput(
+            chunks=[
+                chunk_workflow_id(workflow_id, start)
+                for start in range(0, self.completed, chunk_size)
+            ],
+            completed=self.completed,
+            failed=self.failed,
+        )
+
+
+fan_out_workflow_info = WorkflowInfo(
+    input=FanOutWorkflowInput,
+    output=FanOutWorkflowOutput,
+    workflow=FanOutWorkflow,
+)
@@ -1,11 +1,12 @@
 from dataclasses import dataclass
 
-from agents import Agent, Runner, RunConfig
+from agents import Agent, RunConfig
 from agents.models.openai_provider import OpenAIProvider
 from temporalio import workflow
 from agents.models.interface import ModelProvider
 
 from workflows.registry import WorkflowInfo
+from workflows.usage import RunUsage, run_agent
 
 
 @dataclass
@@ -20,6 +21,13 @@ class HelloWorldWorkflowOutput:
 
 @workflow.defn
 class HelloWorldAgent:
+    def __init__(self) -> None:
+        self.usage = RunUsage()
+
+    @workflow.query
+    def get_usage(self) -> RunUsage:
+        return self.usage
+
     @staticmethod
     async def get_model_provider() -> ModelProvider:
         print("Getting model provider")
@@ -35,8 +43,8 @@ class HelloWorldAgent:
         )
         model_provider = await HelloWorldAgent.get_model_provider()
         run_config = RunConfig(model_provider=model_provider)
-        result = await Runner.run(
-            agent, input=workflow_input.prompt, run_config=run_config
+        result = await run_agent(
+            self.usage, agent, input=workflow_input.prompt, run_config=run_config
         )
         return HelloWorldWorkflowOutput(response=result.final_output)
 
@@ -0,0 +1,99 @@
+import time
+from typing import Optional
+
+from agents import Agent, RunContextWrapper, Usage
+from temporalio import workflow
+
+# Passed through so the writer configured by the worker is shared with the
+# sandboxed copies of this module.
+with workflow.unsafe.imports_passed_through():
+    from hook_sinks import EventSinkWriter, get_event_writer
+
+
+class EventRecorder:
+    """
+    Collects agent lifecycle events as compact structured records.
+
+    Every record is kept in `events`, which backs the workflows' `get_events`
+    query. New records are also handed to the worker's `EventSinkWriter`
+    `batch_size` at a time, which writes them to the event sink from its
+    own thread, so the workflow itself does no I/O.
+
+    Records are handed over during workflow replay too. A run evicted from
+    the worker cache, or moved to another worker, replays the records it
+    had not handed over yet; the writer skips the ones it already wrote,
+    by run and `seq`.
+    """
+
+    def __init__(
+        self,
+        events: Optional[list[dict]] = None,
+        writer: Optional[EventSinkWriter] = None,
+        batch_size: int = 100,
+    ) -> None:
+        self.events = events if events is not None else []
+        self._writer = writer
+        self._pending: list[dict] = []
+        self._batch_size = batch_size
+        self._usage = Usage()
+
+    def _usage_delta(self, usage: Usage) -> list[int]:
+        previous = self._usage
+        self._usage = Usage(
+            requests=usage.requests,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            total_tokens=usage.total_tokens,
+        )
+        return [
+            usage.requests - previous.requests,
+            usage.input_tokens - previous.input_tokens,
+            usage.output_tokens - previous.output_tokens,
+            usage.total_tokens - previous.total_tokens,
+        ]
+
+    def record(self, event: str, usage: Usage, **fields) -> None:
+        in_workflow = workflow.in_workflow()
+        record = {
+            "seq": len(self.events) + 1,
+            "event": event,
+            "at": workflow.time() if in_workflow else time.time(),
+            # requests, input tokens, output tokens, total tokens
+            "usage": self._usage_delta(usage),
+            **fields,
+        }
+        self.events.append(record)
+        self._pending.append(record)
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand the pending records to the writer; it never blocks."""
+        writer = self._writer or get_event_writer()
+        records, self._pending = self._pending, []
+        if writer is None or not records:
+            return
+        if workflow.in_workflow():
+            info = workflow.info()
+            writer.submit(info.workflow_id, info.run_id, records)
+        else:
+            writer.submit("", "", records)
+
+
+class RecordingHooks:
+    """
+    Base class for run and agent hooks that record their events in an
+    `EventRecorder` instead of printing them.
+    """
+
+    def __init__(self, recorder: Optional[EventRecorder] = None) -> None:
+        self.recorder = recorder if recorder is not None else EventRecorder()
+
+    @property
+    def events(self) -> list[dict]:
+        return self.recorder.events
+
+    def _record(
+        self, event: str, context: RunContextWrapper, agent: Agent, **fields
+    ) -> None:
+        self.recorder.record(event, context.usage, agent=agent.name, **fields)
@@ -5,61 +5,40 @@ from agents import (
     Agent,
     RunContextWrapper,
     RunHooks,
-    Runner,
     Tool,
-    Usage,
     function_tool,
 )
 from pydantic import BaseModel
 from temporalio import workflow
 
+from .hooks import EventRecorder, RecordingHooks
 from .registry import WorkflowInfo
+from .usage import RunUsage, run_agent
 
 
-class ExampleHooks(RunHooks):
-    def __init__(self):
-        self.event_counter = 0
-
-    def _usage_to_str(self, usage: Usage) -> str:
-        return f"{usage.requests} requests, {usage.input_tokens} input tokens, {usage.output_tokens} output tokens, {usage.total_tokens} total tokens"
-
+class ExampleHooks(RecordingHooks, RunHooks):
     async def on_agent_start(self, context: RunContextWrapper, agent: Agent) -> None:
-        self.event_counter += 1
-        print(
-            f"### {self.event_counter}: Agent {agent.name} started. Usage: {self._usage_to_str(context.usage)}"
-        )
+        self._record("agent_started", context, agent)
 
     async def on_agent_end(
         self, context: RunContextWrapper, agent: Agent, output: Any
     ) -> None:
-        self.event_counter += 1
-        print(
-            f"### {self.event_counter}: Agent {agent.name} ended with output {output}. Usage: {self._usage_to_str(context.usage)}"
-        )
+        self._record("agent_ended", context, agent, output=str(output))
 
     async def on_tool_start(
         self, context: RunContextWrapper, agent: Agent, tool: Tool
     ) -> None:
-        self.event_counter += 1
-        print(
-            f"### {self.event_counter}: Tool {tool.name} started. Usage: {self._usage_to_str(context.usage)}"
-        )
+        self._record("tool_started", context, agent, tool=tool.name)
 
     async def on_tool_end(
         self, context: RunContextWrapper, agent: Agent, tool: Tool, result: str
     ) -> None:
-        self.event_counter += 1
-        print(
-            f"### {self.event_counter}: Tool {tool.name} ended with result {result}. Usage: {self._usage_to_str(context.usage)}"
-        )
+        self._record("tool_ended", context, agent, tool=tool.name, result=result)
 
     async def on_handoff(
         self, context: RunContextWrapper, from_agent: Agent, to_agent: Agent
     ) -> None:
-        self.event_counter += 1
-        print(
-            f"### {self.event_counter}: Handoff from {from_agent.name} to {to_agent.name}. Usage: {self._usage_to_str(context.usage)}"
-        )
+        self._record("handoff", context, from_agent, to_agent=to_agent.name)
 
 
 @function_tool
@@ -85,9 +64,21 @@ class FinalResult(BaseModel):
 
 @workflow.defn
 class LifecycleWorkflow:
+    def __init__(self) -> None:
+        self.recorder = EventRecorder()
+        self.usage = RunUsage()
+
+    @workflow.query
+    def get_events(self, offset: int = 0) -> list[dict]:
+        return self.recorder.events[offset:]
+
+    @workflow.query
+    def get_usage(self) -> RunUsage:
+        return self.usage
+
     @workflow.run
     async def run(self, workflow_input: WorkflowInput) -> FinalResult:
-        hooks = ExampleHooks()
+        hooks = ExampleHooks(self.recorder)
 
         multiply_agent = Agent(
             name="Multiply Agent",
@@ -104,13 +95,17 @@ class LifecycleWorkflow:
             handoffs=[multiply_agent],
         )
 
-        result = await Runner.run(
-            start_agent,
-            hooks=hooks,
-            input=f"Generate a random number between 0 and {workflow_input.max_number}.",
-        )
+        try:
+            result = await run_agent(
+                self.usage,
+                start_agent,
+                hooks=hooks,
+                input=f"Generate a random number between 0 and {workflow_input.max_number}.",
+            )
+        finally:
+            # Only queues the records; the worker writes them on its own thread.
+            self.recorder.flush()
 
-        print("Done!")
         return result.final_output
 
 
@@ -1,5 +1,9 @@
+import dataclasses
+import importlib
 from dataclasses import dataclass
-from typing import Any, Dict, Type
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import TypeAdapter, ValidationError
 
 
 @dataclass
@@ -9,9 +13,44 @@ class WorkflowInfo:
     workflow: Type[Any]
 
 
+class InputValidator:
+    """
+    Validates a JSON payload into a workflow input type. Building the
+    pydantic schema is the expensive part, so it is done once per type.
+
+    Dataclass inputs reject unknown fields, like calling the class with
+    them would.
+    """
+
+    def __init__(self, input_type: Type[Any]) -> None:
+        self.input_type = input_type
+        self._adapter = TypeAdapter(input_type)
+        self._fields = (
+            frozenset(field.name for field in dataclasses.fields(input_type))
+            if dataclasses.is_dataclass(input_type)
+            else None
+        )
+
+    def validate(self, payload: Dict[str, Any]) -> Any:
+        if self._fields is not None:
+            unexpected = payload.keys() - self._fields
+            if unexpected:
+                raise ValidationError.from_exception_data(
+                    self.input_type.__name__,
+                    [
+                        {"type": "extra_forbidden", "loc": (name,), "input": payload[name]}
+                        for name in sorted(unexpected)
+                    ],
+                )
+        return self._adapter.validate_python(payload)
+
+
 class Registry:
     def __init__(self) -> None:
         self._by_path: Dict[str, WorkflowInfo] = {}
+        self._validators: Dict[str, InputValidator] = {}
+        # Import path -> "module:attribute" of a WorkflowInfo not imported yet.
+        self._lazy: Dict[str, str] = {}
         self._frozen = False
 
     @staticmethod
@@ -24,15 +63,55 @@ class Registry:
         if self._frozen:
             raise RuntimeError("Registry is frozen; cannot register new workflows.")
         k = key or self.import_path_of(workflow_info.workflow)
-        self._by_path[k] = workflow_info
+        self._lazy.pop(k, None)
+        self._add(k, workflow_info)
         return workflow_info
 
+    def _add(self, path: str, workflow_info: WorkflowInfo) -> None:
+        self._validators[path] = InputValidator(workflow_info.input)
+        self._by_path[path] = workflow_info
+
+    def register_lazy(self, path: str, target: str) -> None:
+        """
+        Register the WorkflowInfo at `target` ("module:attribute") under
+        `path` without importing it; the module is imported the first time
+        the path is looked up.
+        """
+        if self._frozen:
+            raise RuntimeError("Registry is frozen; cannot register new workflows.")
+        self._by_path.pop(path, None)
+        self._validators.pop(path, None)
+        self._lazy[path] = target
+
+    def paths(self) -> List[str]:
+        return sorted(self._by_path.keys() | self._lazy.keys())
+
     def freeze(self) -> None:
         self._frozen = True
 
+    def get_if_loaded(self, path: str) -> Optional[WorkflowInfo]:
+        """The WorkflowInfo under `path` if it needs no import, else None."""
+        return self._by_path.get(path)
+
     def get_by_import_path(self, path: str) -> WorkflowInfo:
         workflow_info = self._by_path.get(path)
         if workflow_info is not None:
             return workflow_info
-        else:
+        target = self._lazy.get(path)
+        if target is None:
             raise KeyError(f"{path!r} is not registered")
+        module_name, _, attribute = target.partition(":")
+        workflow_info = getattr(importlib.import_module(module_name), attribute)
+        self._add(path, workflow_info)
+        return workflow_info
+
+    def validate_input(self, path: str, payload: Dict[str, Any]) -> Any:
+        """
+        Build the input of the workflow under `path` from a JSON payload,
+        raising `pydantic.ValidationError` when it does not fit.
+        """
+        validator = self._validators.get(path)
+        if validator is None:
+            self.get_by_import_path(path)
+            validator = self._validators[path]
+        return validator.validate(payload)
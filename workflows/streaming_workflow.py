@@ -0,0 +1,174 @@
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+
+from agents import Agent, RunConfig, Runner
+from agents.models.interface import ModelProvider
+from openai.types.responses import ResponseTextDeltaEvent
+from temporalio import activity, workflow
+
+from workflows.registry import WorkflowInfo
+from workflows.usage import RunUsage
+
+
+@dataclass
+class StreamingWorkflowInput:
+    prompt: str
+    instructions: str = "You only respond in haikus."
+
+
+@dataclass
+class StreamingWorkflowOutput:
+    response: str
+
+
+@dataclass
+class StreamAgentInput:
+    workflow_id: str
+    prompt: str
+    instructions: str
+
+
+@dataclass
+class StreamAgentOutput:
+    response: str
+    usage: RunUsage
+
+
+@dataclass
+class OutputChunk:
+    attempt: int
+    text: str
+
+
+@dataclass
+class OutputProgress:
+    # None marks a reset: the text before it is dropped, and the chunks
+    # after it stream the answer again from the start.
+    chunks: list[Optional[str]]
+    done: bool
+
+
+class StreamingAgentActivities:
+    """
+    Runs the agent with a streamed model response outside the workflow,
+    since Temporal workflows cannot stream model calls themselves.
+
+    Text deltas are buffered and signalled back to the calling workflow
+    every `flush_interval` seconds, which bounds the number of history
+    events a long answer adds.
+    """
+
+    def __init__(
+        self,
+        model_provider: Optional[ModelProvider] = None,
+        flush_interval: float = 0.25,
+    ) -> None:
+        self._model_provider = model_provider
+        self._flush_interval = flush_interval
+
+    @activity.defn
+    async def stream_agent_response(
+        self, stream_input: StreamAgentInput
+    ) -> StreamAgentOutput:
+        started = time.monotonic()
+        agent = Agent(name="Assistant", instructions=stream_input.instructions)
+        run_config = (
+            RunConfig(model_provider=self._model_provider)
+            if self._model_provider is not None
+            else None
+        )
+        result = Runner.run_streamed(
+            agent, input=stream_input.prompt, run_config=run_config
+        )
+        handle = activity.client().get_workflow_handle(stream_input.workflow_id)
+        attempt = activity.info().attempt
+        buffer: list[str] = []
+        flushed_at = time.monotonic()
+
+        async def flush() -> None:
+            nonlocal flushed_at
+            if buffer:
+                await handle.signal(
+                    StreamingHelloWorldAgent.append_output,
+                    OutputChunk(attempt=attempt, text="".join(buffer)),
+                )
+                buffer.clear()
+            flushed_at = time.monotonic()
+
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(
+                event.data, ResponseTextDeltaEvent
+            ):
+                buffer.append(event.data.delta)
+                if time.monotonic() - flushed_at >= self._flush_interval:
+                    await flush()
+        await flush()
+        usage = RunUsage()
+        usage.add(result.context_wrapper.usage, time.monotonic() - started)
+        return StreamAgentOutput(response=str(result.final_output), usage=usage)
+
+
+@workflow.defn
+class StreamingHelloWorldAgent:
+    def __init__(self) -> None:
+        self.chunks: list[Optional[str]] = []
+        self.done = False
+        self._attempt: Optional[int] = None
+        # The text streamed by `_attempt` since the last reset.
+        self._streamed: list[str] = []
+        self.usage = RunUsage()
+
+    def _reset(self) -> None:
+        if self._streamed:
+            self.chunks.append(None)
+            self._streamed = []
+
+    @workflow.signal
+    def append_output(self, chunk: OutputChunk) -> None:
+        # Chunks of an attempt that has since been retried are stale.
+        if self.done or (self._attempt is not None and chunk.attempt < self._attempt):
+            return
+        if chunk.attempt != self._attempt:
+            # A retried activity streams a new answer from the start.
+            self._reset()
+            self._attempt = chunk.attempt
+        self.chunks.append(chunk.text)
+        self._streamed.append(chunk.text)
+
+    @workflow.query
+    def get_output(self, offset: int = 0) -> OutputProgress:
+        return OutputProgress(chunks=self.chunks[offset:], done=self.done)
+
+    @workflow.query
+    def get_usage(self) -> RunUsage:
+        return self.usage
+
+    @workflow.run
+    async def run(
+        self, workflow_input: StreamingWorkflowInput
+    ) -> StreamingWorkflowOutput:
+        output = await workflow.execute_activity_method(
+            StreamingAgentActivities.stream_agent_response,
+            StreamAgentInput(
+                workflow_id=workflow.info().workflow_id,
+                prompt=workflow_input.prompt,
+                instructions=workflow_input.instructions,
+            ),
+            start_to_close_timeout=timedelta(minutes=5),
+        )
+        self.usage.add_run_usage(output.usage)
+        if "".join(self._streamed) != output.response:
+            # The attempt that succeeded did not stream all of its answer.
+            self._reset()
+            self.chunks.append(output.response)
+        self.done = True
+        return StreamingWorkflowOutput(response=output.response)
+
+
+streaming_workflow_info = WorkflowInfo(
+    input=StreamingWorkflowInput,
+    output=StreamingWorkflowOutput,
+    workflow=StreamingHelloWorldAgent,
+)
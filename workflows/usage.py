@@ -0,0 +1,44 @@
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from agents import Runner, Usage
+from temporalio import workflow
+
+
+@dataclass
+class RunUsage:
+    """Model usage of a workflow run, summed over all of its agent runs."""
+
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    # Time spent in agent runs, model calls and tools included.
+    agent_seconds: float = 0.0
+
+    def add(self, usage: Usage, seconds: float = 0.0) -> None:
+        self.requests += usage.requests
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.total_tokens += usage.total_tokens
+        self.agent_seconds += seconds
+
+    def add_run_usage(self, other: "RunUsage") -> None:
+        self.requests += other.requests
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.total_tokens += other.total_tokens
+        self.agent_seconds += other.agent_seconds
+
+
+def _now() -> float:
+    return workflow.time() if workflow.in_workflow() else time.monotonic()
+
+
+async def run_agent(run_usage: RunUsage, *args: Any, **kwargs: Any) -> Any:
+    """`Runner.run` that adds the usage and duration of the run to `run_usage`."""
+    started = _now()
+    result = await Runner.run(*args, **kwargs)
+    run_usage.add(result.context_wrapper.usage, _now() - started)
+    return result
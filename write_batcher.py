@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import Generic, List, Tuple, Type, TypeVar
+
+from django.db import models
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=models.Model)
+
+
+@dataclass
+class WriteBatcherStats:
+    inserts: int = 0
+    batches: int = 0
+    # Batches that failed as a whole and were retried one row at a time.
+    split_batches: int = 0
+
+
+@dataclass
+class _LoopState:
+    pending: List[Tuple[models.Model, asyncio.Future]] = field(default_factory=list)
+    writer: "asyncio.Task | None" = None
+
+
+class WriteBatcher(Generic[M]):
+    """
+    Group commit of concurrent inserts of one model.
+
+    `create` queues the row and waits until it is written. One writer per
+    event loop inserts whatever is queued with a single `bulk_create`, up to
+    `max_batch_size` rows. Rows queued while that write is in progress go
+    into the next one. A lone insert is written straight away, and under a
+    burst of inserts each transaction carries many rows, so there is one
+    commit and one fsync per batch instead of one per row.
+
+    When a batch fails, for example on a unique constraint, its rows are
+    inserted one by one, so only the callers of the offending rows get the
+    error.
+    """
+
+    def __init__(self, model: Type[M], max_batch_size: int = 100) -> None:
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.stats = WriteBatcherStats()
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def create(self, **fields) -> M:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState()
+        future = loop.create_future()
+        state.pending.append((self.model(**fields), future))
+        if state.writer is None or state.writer.done():
+            state.writer = loop.create_task(self._write(state))
+        return await future
+
+    async def _write(self, state: _LoopState) -> None:
+        while state.pending:
+            batch = state.pending[: self.max_batch_size]
+            del state.pending[: self.max_batch_size]
+            try:
+                await self.model.objects.abulk_create([row for row, _ in batch])
+            except Exception as e:
+                logger.warning(
+                    "Batch of %d %s inserts failed, inserting them one by one: %s",
+                    len(batch),
+                    self.model.__name__,
+                    e,
+                )
+                self.stats.split_batches += 1
+                for row, future in batch:
+                    try:
+                        await row.asave(force_insert=True)
+                    except Exception as row_error:
+                        if not future.done():
+                            future.set_exception(row_error)
+                    else:
+                        self._done(row, future)
+                continue
+            self.stats.batches += 1
+            for row, future in batch:
+                self._done(row, future)
+
+    def _done(self, row: models.Model, future: asyncio.Future) -> None:
+        self.stats.inserts += 1
+        # The caller may have been cancelled while the row was written.
+        if not future.done():
+            future.set_result(row)